@@ -2,7 +2,6 @@
 
 from alembic import op
 import sqlalchemy as sa
-from sqlalchemy.dialects import sqlite
 
 revision = "0001_initial"
 down_revision = None
@@ -34,7 +33,7 @@ def upgrade() -> None:
         sa.Column("id", sa.Integer(), primary_key=True),
         sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
         sa.Column("updated_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
-        sa.Column("kind", sa.Enum("none", "daily", "weekly", "monthly", "custom", name="repeatkind"), nullable=False),
+        sa.Column("kind", sa.Enum("NONE", "DAILY", "WEEKLY", "MONTHLY", "CUSTOM", name="repeatkind"), nullable=False),
         sa.Column("interval", sa.Integer(), nullable=False, server_default="1"),
         sa.Column("custom_interval_minutes", sa.Integer(), nullable=True),
         sa.Column("weekday_mask", sa.JSON(), nullable=True),
@@ -51,7 +50,7 @@ def upgrade() -> None:
         sa.Column("title", sa.String(length=255), nullable=False),
         sa.Column("description", sa.String(length=1024), nullable=True),
         sa.Column("scheduled_at", sa.DateTime(timezone=True), nullable=False),
-        sa.Column("status", sa.Enum("active", "snoozed", "closed", name="reminderstatus"), nullable=False, server_default="active"),
+        sa.Column("status", sa.Enum("ACTIVE", "SNOOZED", "CLOSED", name="reminderstatus"), nullable=False, server_default="ACTIVE"),
         sa.Column("snooze_until", sa.DateTime(timezone=True), nullable=True),
     )
 
@@ -63,7 +62,7 @@ def upgrade() -> None:
         sa.Column("reminder_id", sa.Integer(), sa.ForeignKey("reminder.id", ondelete="CASCADE"), nullable=False),
         sa.Column("scheduled_for", sa.DateTime(timezone=True), nullable=False),
         sa.Column("processed_at", sa.DateTime(timezone=True), nullable=True),
-        sa.Column("status", sa.Enum("sent", "skipped", "failed", name="remindereventstatus"), nullable=False),
+        sa.Column("status", sa.Enum("SENT", "SKIPPED", "FAILED", name="remindereventstatus"), nullable=False),
         sa.Column("error_message", sa.String(length=1024), nullable=True),
     )
 
@@ -74,3 +73,5 @@ def downgrade() -> None:
     op.drop_table("reminderrule")
     op.drop_index("ix_user_telegram_id", table_name="user")
     op.drop_table("user")
+    for name in ("remindereventstatus", "reminderstatus", "repeatkind"):
+        sa.Enum(name=name).drop(op.get_bind(), checkfirst=True)
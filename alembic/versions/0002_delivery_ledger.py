@@ -0,0 +1,27 @@
+﻿from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002_delivery_ledger"
+down_revision = "0001_initial"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "reminderdelivery",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column("reminder_id", sa.Integer(), sa.ForeignKey("reminder.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("occurrence_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("status", sa.Enum("CLAIMED", "SENT", "FAILED", name="deliverystatus"), nullable=False),
+        sa.UniqueConstraint("reminder_id", "occurrence_at", name="uq_reminderdelivery_reminder_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("reminderdelivery")
+    sa.Enum(name="deliverystatus").drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,29 @@
+﻿from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003_hot_query_indexes"
+down_revision = "0002_delivery_ledger"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_reminder_status_scheduled_at", "reminder", ["status", "scheduled_at"])
+    op.create_index("ix_reminder_user_id_scheduled_at", "reminder", ["user_id", "scheduled_at"])
+    op.create_index(
+        "ix_reminder_active_scheduled_at",
+        "reminder",
+        ["scheduled_at"],
+        postgresql_where=sa.text("status = 'ACTIVE'"),
+        sqlite_where=sa.text("status = 'ACTIVE'"),
+    )
+    op.create_index("ix_reminderlog_reminder_id_scheduled_for", "reminderlog", ["reminder_id", "scheduled_for"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_reminderlog_reminder_id_scheduled_for", table_name="reminderlog")
+    op.drop_index("ix_reminder_active_scheduled_at", table_name="reminder")
+    op.drop_index("ix_reminder_user_id_scheduled_at", table_name="reminder")
+    op.drop_index("ix_reminder_status_scheduled_at", table_name="reminder")
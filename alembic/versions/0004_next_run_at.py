@@ -0,0 +1,112 @@
+﻿from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+# Расчёт срабатываний берётся из кода приложения, а не заморожен в миграции:
+# повторный прогон на другой версии кода заполнит next_run_at по её правилам.
+# Для колонки это безопасно — ReminderService пересчитывает её при каждом
+# перепланировании, — но при изменении сигнатур ниже миграцию нужно поправить.
+from reminderbot.domain.recurrence import RecurrenceRule
+from reminderbot.domain.recurrence_batch import compute_next_runs
+from reminderbot.infrastructure.db.models import RepeatKind
+
+revision = "0004_next_run_at"
+down_revision = "0003_hot_query_indexes"
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH = 1000
+
+reminder = sa.table(
+    "reminder",
+    sa.column("id", sa.Integer),
+    sa.column("user_id", sa.Integer),
+    sa.column("rule_id", sa.Integer),
+    sa.column("scheduled_at", sa.DateTime(timezone=True)),
+    sa.column("snooze_until", sa.DateTime(timezone=True)),
+    sa.column("status", sa.String),
+    sa.column("next_run_at", sa.DateTime(timezone=True)),
+)
+user = sa.table("user", sa.column("id", sa.Integer), sa.column("timezone", sa.String))
+rule = sa.table(
+    "reminderrule",
+    sa.column("id", sa.Integer),
+    sa.column("kind", sa.String),
+    sa.column("interval", sa.Integer),
+    sa.column("custom_interval_minutes", sa.Integer),
+    sa.column("weekday_mask", sa.JSON),
+    sa.column("monthday", sa.Integer),
+)
+
+
+def upgrade() -> None:
+    op.add_column("reminder", sa.Column("next_run_at", sa.DateTime(timezone=True), nullable=True))
+    op.create_index("ix_reminder_next_run_at", "reminder", ["next_run_at"])
+    _backfill()
+
+
+def downgrade() -> None:
+    op.drop_index("ix_reminder_next_run_at", table_name="reminder")
+    with op.batch_alter_table("reminder") as batch:
+        batch.drop_column("next_run_at")
+
+
+def _backfill() -> None:
+    """Заполняет next_run_at пакетным расчётом, как это делал бы ReminderService.
+
+    Строки читаются пачками по ``BACKFILL_BATCH`` по ключу ``id``, поэтому
+    память не зависит от размера таблицы, а между пачками на соединении нет
+    открытого курсора по обновляемой таблице.
+    """
+
+    bind = op.get_bind()
+    now = datetime.now(timezone.utc)
+    stmt = (
+        sa.select(
+            reminder.c.id,
+            reminder.c.scheduled_at,
+            reminder.c.snooze_until,
+            user.c.timezone,
+            rule.c.kind,
+            rule.c.interval,
+            rule.c.custom_interval_minutes,
+            rule.c.weekday_mask,
+            rule.c.monthday,
+        )
+        .select_from(reminder.join(user, user.c.id == reminder.c.user_id).outerjoin(rule, rule.c.id == reminder.c.rule_id))
+        .where(sa.func.upper(sa.cast(reminder.c.status, sa.String)) != "CLOSED")
+        .order_by(reminder.c.id)
+        .limit(BACKFILL_BATCH)
+    )
+    update = reminder.update().where(reminder.c.id == sa.bindparam("reminder_id")).values(next_run_at=sa.bindparam("value"))
+    last_id = 0
+    while True:
+        batch = bind.execute(stmt.where(reminder.c.id > last_id)).all()
+        if not batch:
+            return
+        items = [(row.scheduled_at, row.snooze_until, _rule(row), row.timezone or "UTC") for row in batch]
+        values = [
+            {"reminder_id": row.id, "value": next_run.astimezone(timezone.utc) if next_run else None}
+            for row, next_run in zip(batch, compute_next_runs(items, now))
+        ]
+        bind.execute(update, values)
+        last_id = batch[-1].id
+
+
+def _rule(row) -> RecurrenceRule | None:
+    if row.kind is None:
+        return None
+    # В старых базах встречаются и имена, и значения перечисления
+    kind = RepeatKind[row.kind.upper()]
+    if kind == RepeatKind.NONE:
+        return None
+    return RecurrenceRule(
+        kind=kind,
+        interval=row.interval or 1,
+        custom_interval_minutes=row.custom_interval_minutes,
+        weekday_mask=tuple(row.weekday_mask or ()),
+        monthday=row.monthday,
+    )
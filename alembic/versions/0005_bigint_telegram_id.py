@@ -0,0 +1,20 @@
+﻿from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005_bigint_telegram_id"
+down_revision = "0004_next_run_at"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Telegram id не помещаются в int4; в SQLite INTEGER и так 64-битный
+    if op.get_bind().dialect.name == "postgresql":
+        op.alter_column("user", "telegram_id", type_=sa.BigInteger(), existing_type=sa.Integer(), existing_nullable=False)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.alter_column("user", "telegram_id", type_=sa.Integer(), existing_type=sa.BigInteger(), existing_nullable=False)
@@ -0,0 +1,29 @@
+﻿from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006_fsm_storage"
+down_revision = "0005_bigint_telegram_id"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "fsmrecord",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column("key", sa.String(length=255), nullable=False),
+        sa.Column("state", sa.String(length=255), nullable=True),
+        sa.Column("data", sa.JSON(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.UniqueConstraint("key", name="uq_fsmrecord_key"),
+    )
+    op.create_index("ix_fsmrecord_expires_at", "fsmrecord", ["expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_fsmrecord_expires_at", table_name="fsmrecord")
+    op.drop_table("fsmrecord")
@@ -0,0 +1,16 @@
+﻿from __future__ import annotations
+
+from alembic import op
+
+revision = "0007_delivery_ledger_retention"
+down_revision = "0006_fsm_storage"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_reminderdelivery_occurrence_at", "reminderdelivery", ["occurrence_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_reminderdelivery_occurrence_at", table_name="reminderdelivery")
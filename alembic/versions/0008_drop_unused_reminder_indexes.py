@@ -0,0 +1,27 @@
+﻿from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008_drop_unused_reminder_indexes"
+down_revision = "0007_delivery_ledger_retention"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Планировщик выбирает по next_run_at, список — по user_id, scheduled_at:
+    # индексы по статусу только удорожают каждую смену статуса
+    op.drop_index("ix_reminder_active_scheduled_at", table_name="reminder")
+    op.drop_index("ix_reminder_status_scheduled_at", table_name="reminder")
+
+
+def downgrade() -> None:
+    op.create_index("ix_reminder_status_scheduled_at", "reminder", ["status", "scheduled_at"])
+    op.create_index(
+        "ix_reminder_active_scheduled_at",
+        "reminder",
+        ["scheduled_at"],
+        postgresql_where=sa.text("status = 'ACTIVE'"),
+        sqlite_where=sa.text("status = 'ACTIVE'"),
+    )
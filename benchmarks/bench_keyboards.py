@@ -0,0 +1,62 @@
+"""Стоимость клавиатур на один ответ обработчика: сборка заново и кэш.
+
+Набор повторяет путь создания напоминания: главное меню, календарь с
+листанием месяцев, часы, минуты и повтор — для трёх локалей.
+
+Запуск: ``python -m benchmarks.bench_keyboards --rounds 300``
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+
+from reminderbot.app.keyboards import common
+from reminderbot.app.keyboards.cache import keyboard_cache
+from reminderbot.app.utils import calendar
+from reminderbot.presentation.localization import Localizer
+
+LOCALES = ("ru", "en", "uk")
+
+
+def uncached(i18n: Localizer, locale: str, step: int) -> None:
+    common._build_main_menu(i18n, locale)
+    calendar._build_calendar(i18n, locale, 2030, step % 12 + 1)
+    calendar._build_hours()
+    calendar._build_minutes(step % 24)
+    common._build_repeat(i18n, locale)
+
+
+def cached(i18n: Localizer, locale: str, step: int) -> None:
+    common.main_menu_kb(i18n, locale)
+    calendar.calendar_keyboard(i18n, locale, 2030, step % 12 + 1)
+    calendar.hours_keyboard()
+    calendar.minutes_keyboard(step % 24)
+    common.repeat_keyboard(i18n, locale)
+
+
+def measure(label: str, render, i18n: Localizer, rounds: int) -> float:
+    started = time.perf_counter()
+    for step in range(rounds):
+        render(i18n, LOCALES[step % len(LOCALES)], step)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<12} {elapsed:8.3f} с  {elapsed / rounds * 1e6:8.1f} мкс/ответ")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=300)
+    args = parser.parse_args()
+
+    i18n = Localizer(Path("reminderbot/presentation/locales"), "ru")
+    keyboard_cache.clear()
+    before = measure("сборка", uncached, i18n, args.rounds)
+    after = measure("кэш", cached, i18n, args.rounds)
+    print(f"Кэш: {keyboard_cache.stats()}")
+    print(f"Ускорение: x{before / after:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Сравнение пакетного расчёта следующих срабатываний с поштучным.
+
+Запуск: ``python -m benchmarks.bench_recurrence_batch --count 1000000``
+(нужен numpy: ``pip install .[perf]``).
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from reminderbot.domain.recurrence import RecurrenceRule
+from reminderbot.domain.recurrence_batch import KIND_CODES, RuleArrays, compute_next_runs, next_fire_epochs
+from reminderbot.infrastructure.db.models import RepeatKind
+
+TIMEZONES = ["UTC", "Europe/Moscow", "Europe/Berlin", "America/New_York", "Asia/Kolkata"]
+KINDS = [RepeatKind.DAILY, RepeatKind.WEEKLY, RepeatKind.MONTHLY, RepeatKind.CUSTOM]
+
+
+def synthetic_items(count: int, now: datetime, seed: int = 0):
+    rng = random.Random(seed)
+    zones = {name: ZoneInfo(name) for name in TIMEZONES}
+    items = []
+    for _ in range(count):
+        tz_name = rng.choice(TIMEZONES)
+        base = (now - timedelta(minutes=rng.randint(0, 3 * 365 * 1440))).astimezone(zones[tz_name])
+        kind = rng.choice(KINDS)
+        rule = RecurrenceRule(
+            kind,
+            interval=rng.randint(1, 3),
+            custom_interval_minutes=rng.choice([15, 60, 90, 1440]),
+            weekday_mask=tuple(rng.sample(range(7), rng.randint(0, 3))),
+            monthday=rng.choice([None, 1, 15, 31]),
+        )
+        items.append((base.replace(second=0, microsecond=0), None, rule, tz_name))
+    return items
+
+
+def to_arrays(items) -> RuleArrays:
+    count = len(items)
+    return RuleArrays(
+        base=np.fromiter((item[0].timestamp() for item in items), dtype=np.float64, count=count),
+        kind=np.fromiter((KIND_CODES[item[2].kind] for item in items), dtype=np.int8, count=count),
+        interval=np.fromiter((item[2].interval for item in items), dtype=np.int64, count=count),
+        custom_minutes=np.fromiter((item[2].custom_interval_minutes or 0 for item in items), dtype=np.int64, count=count),
+        weekday_mask=np.fromiter(
+            (sum(1 << day for day in set(item[2].weekday_mask)) for item in items), dtype=np.int64, count=count
+        ),
+        monthday=np.fromiter((item[2].monthday or 0 for item in items), dtype=np.int64, count=count),
+        tz_offset=np.fromiter((item[0].utcoffset().total_seconds() for item in items), dtype=np.int64, count=count),
+    )
+
+
+def per_object(items, now: datetime):
+    results = []
+    for scheduled, _, rule, tz_name in items:
+        reference = now.astimezone(ZoneInfo(tz_name))
+        results.append(scheduled if scheduled > reference else rule.next_after(scheduled, reference))
+    return results
+
+
+def measure(label: str, func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28} {elapsed:8.3f} с")
+    return result, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    items = synthetic_items(args.count, now, args.seed)
+    arrays = to_arrays(items)
+    print(f"Правил: {args.count}")
+
+    expected, scalar_time = measure("поштучно (next_after)", per_object, items, now)
+    actual, batch_time = measure("compute_next_runs", compute_next_runs, items, now)
+    _, kernel_time = measure("next_fire_epochs (ядро)", next_fire_epochs, arrays, now.timestamp())
+    mismatches = sum(1 for left, right in zip(expected, actual) if left != right)
+    print(f"Расхождений: {mismatches}")
+    print(f"Ускорение: x{scalar_time / batch_time:.1f} (с подготовкой), x{scalar_time / kernel_time:.1f} (ядро)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Пропускная способность бота и веба на общей SQLite: профиль по умолчанию и WAL.
+
+Два процесса, как контейнеры ``bot`` и ``web`` из docker-compose, работают с
+одним файлом БД: «бот» в несколько задач пишет (перепланирует напоминание и
+добавляет строку журнала), «веб» читает карточки напоминаний.
+
+Запуск: ``python -m benchmarks.bench_sqlite_profile --seconds 5``
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from sqlalchemy import update
+from sqlalchemy.exc import OperationalError
+
+os.environ.setdefault("BOT_TOKEN", "benchmark")
+
+from reminderbot.config import Settings  # noqa: E402
+from reminderbot.infrastructure.db.base import Base  # noqa: E402
+from reminderbot.infrastructure.db.models import Reminder, ReminderEventStatus, ReminderLog, User  # noqa: E402
+from reminderbot.infrastructure.db.session import create_engine, create_session_factory  # noqa: E402
+from reminderbot.infrastructure.repos.reminders import ReminderRepository  # noqa: E402
+
+REMINDERS = 2000
+
+
+async def prepare(url: str, tuned: bool) -> None:
+    engine = create_engine(url, Settings(SQLITE_TUNED=tuned))
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = create_session_factory(engine)
+    now = datetime.now(timezone.utc)
+    async with factory() as session:
+        user = User(telegram_id=1)
+        session.add(user)
+        await session.flush()
+        session.add_all(
+            Reminder(user_id=user.id, title=f"R{index}", scheduled_at=now, next_run_at=now) for index in range(REMINDERS)
+        )
+        await session.commit()
+    await engine.dispose()
+
+
+async def bot_worker(factory, deadline: float, counters: dict[str, int]) -> None:
+    while time.monotonic() < deadline:
+        reminder_id = random.randint(1, REMINDERS)
+        now = datetime.now(timezone.utc)
+        try:
+            async with factory() as session:
+                await session.execute(
+                    update(Reminder).where(Reminder.id == reminder_id).values(next_run_at=now + timedelta(days=1))
+                )
+                session.add(
+                    ReminderLog(reminder_id=reminder_id, scheduled_for=now, processed_at=now, status=ReminderEventStatus.SENT)
+                )
+                await session.commit()
+            counters["ops"] += 1
+        except OperationalError:
+            counters["locked"] += 1
+
+
+async def web_worker(factory, deadline: float, counters: dict[str, int]) -> None:
+    while time.monotonic() < deadline:
+        try:
+            async with factory() as session:
+                await ReminderRepository(session).get_by_id(random.randint(1, REMINDERS))
+            counters["ops"] += 1
+        except OperationalError:
+            counters["locked"] += 1
+
+
+async def run_role(role: str, url: str, tuned: bool, seconds: float, tasks: int) -> dict[str, int]:
+    engine = create_engine(url, Settings(SQLITE_TUNED=tuned))
+    factory = create_session_factory(engine)
+    counters = {"ops": 0, "locked": 0}
+    worker = bot_worker if role == "bot" else web_worker
+    deadline = time.monotonic() + seconds
+    await asyncio.gather(*(worker(factory, deadline, counters) for _ in range(tasks)))
+    await engine.dispose()
+    return counters
+
+
+def role_process(role: str, url: str, tuned: bool, seconds: float, tasks: int, results) -> None:
+    results[role] = asyncio.run(run_role(role, url, tuned, seconds, tasks))
+
+
+def measure(directory: Path, tuned: bool, seconds: float, tasks: int) -> None:
+    url = f"sqlite+aiosqlite:///{directory / ('tuned.db' if tuned else 'default.db')}"
+    asyncio.run(prepare(url, tuned))
+    with multiprocessing.Manager() as manager:
+        results = manager.dict()
+        processes = [
+            multiprocessing.Process(target=role_process, args=(role, url, tuned, seconds, tasks, results))
+            for role in ("bot", "web")
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        label = "WAL + прагмы + пул" if tuned else "по умолчанию"
+        for role in ("bot", "web"):
+            counters = results[role]
+            print(f"{label:<20} {role:<4} {counters['ops'] / seconds:9.1f} оп/с   ошибок блокировки: {counters['locked']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--tasks", type=int, default=4, help="конкурентных задач в каждом процессе")
+    parser.add_argument("--dir", default=None, help="каталог для файлов БД (по умолчанию — временный; tmpfs скрывает цену fsync)")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+        for tuned in (False, True):
+            measure(Path(directory), tuned, args.seconds, args.tasks)
+
+
+if __name__ == "__main__":
+    main()
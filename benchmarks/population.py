@@ -0,0 +1,159 @@
+"""Синтетическая популяция пользователей и напоминаний для бенчмарков.
+
+Правила повтора всех видов, пять часовых поясов, три языка. Сроки
+``next_run_at`` равномерно разбросаны на неделю вперёд, поэтому в горизонт
+планировщика (6 ч по умолчанию) попадает около 4 % напоминаний.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from sqlalchemy import insert
+
+os.environ.setdefault("BOT_TOKEN", "benchmark")
+
+from reminderbot.config import Settings  # noqa: E402
+from reminderbot.infrastructure.db.base import Base  # noqa: E402
+from reminderbot.infrastructure.db.models import Reminder, ReminderRule, ReminderStatus, RepeatKind, User  # noqa: E402
+from reminderbot.infrastructure.db.session import create_engine  # noqa: E402
+
+TIMEZONES = ["UTC", "Europe/Moscow", "Europe/Berlin", "America/New_York", "Asia/Kolkata"]
+LANGUAGES = ["ru", "en", "uk"]
+KINDS = [RepeatKind.NONE, RepeatKind.DAILY, RepeatKind.WEEKLY, RepeatKind.MONTHLY, RepeatKind.CUSTOM]
+CHUNK = 5000
+
+
+@dataclass
+class SyntheticUser:
+    id: int
+    telegram_id: int
+    timezone: str
+    language: str
+    quiet_hours_start: Any = None
+    quiet_hours_end: Any = None
+
+
+@dataclass
+class SyntheticRule:
+    kind: RepeatKind
+    interval: int
+    custom_interval_minutes: Optional[int]
+    weekday_mask: Optional[list[int]]
+    monthday: Optional[int]
+
+
+@dataclass
+class SyntheticReminder:
+    """Поля напоминания, которые читают планировщик и рендерер, без ORM."""
+
+    id: int
+    user_id: int
+    user: SyntheticUser
+    rule: Optional[SyntheticRule]
+    title: str
+    description: Optional[str]
+    scheduled_at: datetime
+    next_run_at: Optional[datetime]
+    snooze_until: Optional[datetime]
+    status: ReminderStatus
+
+
+def synthetic_users(count: int, seed: int = 0) -> list[SyntheticUser]:
+    rng = random.Random(seed)
+    return [
+        SyntheticUser(id=index + 1, telegram_id=10**9 + index, timezone=rng.choice(TIMEZONES), language=rng.choice(LANGUAGES))
+        for index in range(count)
+    ]
+
+
+def synthetic_reminders(
+    count: int,
+    users: list[SyntheticUser],
+    now: datetime,
+    seed: int = 0,
+) -> Iterator[SyntheticReminder]:
+    rng = random.Random(seed + 1)
+    for index in range(count):
+        kind = rng.choice(KINDS)
+        rule = None
+        if kind != RepeatKind.NONE:
+            rule = SyntheticRule(
+                kind=kind,
+                interval=rng.randint(1, 3),
+                custom_interval_minutes=rng.choice([15, 60, 90, 1440]) if kind == RepeatKind.CUSTOM else None,
+                weekday_mask=rng.sample(range(7), rng.randint(1, 3)) if kind == RepeatKind.WEEKLY else None,
+                monthday=rng.choice([None, 1, 15, 31]) if kind == RepeatKind.MONTHLY else None,
+            )
+        status = rng.choices([ReminderStatus.ACTIVE, ReminderStatus.SNOOZED, ReminderStatus.CLOSED], [90, 5, 5])[0]
+        next_run = now + timedelta(seconds=rng.randint(0, 7 * 86_400)) if status != ReminderStatus.CLOSED else None
+        user = users[rng.randrange(len(users))]
+        yield SyntheticReminder(
+            id=index + 1,
+            user_id=user.id,
+            user=user,
+            rule=rule,
+            title=f"Напоминание {index}",
+            description=rng.choice([None, "Описание"]),
+            scheduled_at=(now - timedelta(minutes=rng.randint(0, 365 * 1440))).replace(second=0, microsecond=0),
+            next_run_at=next_run,
+            snooze_until=next_run if status == ReminderStatus.SNOOZED else None,
+            status=status,
+        )
+
+
+async def write_population(path: Path, users: int, reminders: int, seed: int = 0) -> datetime:
+    """Создаёт файл SQLite со схемой приложения и популяцией; возвращает момент «сейчас»."""
+
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    engine = create_engine(f"sqlite+aiosqlite:///{path}", Settings())
+    population = synthetic_users(users, seed)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        for start in range(0, users, CHUNK):
+            await conn.execute(
+                insert(User),
+                [
+                    {"id": user.id, "telegram_id": user.telegram_id, "timezone": user.timezone, "language": user.language}
+                    for user in population[start : start + CHUNK]
+                ],
+            )
+        rule_id = 0
+        rules: list[dict[str, Any]] = []
+        rows: list[dict[str, Any]] = []
+        for reminder in synthetic_reminders(reminders, population, now, seed):
+            if reminder.rule is not None:
+                rule_id += 1
+                rules.append({"id": rule_id, **vars(reminder.rule)})
+            rows.append(
+                {
+                    "id": reminder.id,
+                    "user_id": reminder.user_id,
+                    "rule_id": rule_id if reminder.rule is not None else None,
+                    "title": reminder.title,
+                    "description": reminder.description,
+                    "scheduled_at": reminder.scheduled_at,
+                    "next_run_at": reminder.next_run_at,
+                    "snooze_until": reminder.snooze_until,
+                    "status": reminder.status,
+                }
+            )
+            if len(rows) >= CHUNK:
+                await _flush(conn, rules, rows)
+        await _flush(conn, rules, rows)
+    await engine.dispose()
+    return now
+
+
+async def _flush(conn, rules: list[dict[str, Any]], rows: list[dict[str, Any]]) -> None:
+    if rules:
+        await conn.execute(insert(ReminderRule), rules)
+    if rows:
+        await conn.execute(insert(Reminder), rows)
+    rules.clear()
+    rows.clear()
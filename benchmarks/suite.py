@@ -0,0 +1,285 @@
+"""Набор бенчмарков горячих путей: планировщик, правила повтора, рассылка, тексты.
+
+Для каждого размера популяции (пользователей и напоминаний поровну) строится
+файл SQLite со смешанными правилами повтора и часовыми поясами, после чего
+замеряются:
+
+* ``resync`` — пересборка очереди планировщика в пределах горизонта, время и
+  пик памяти; ``resync_full`` — то же без горизонта, вся популяция в памяти;
+* ``next_from_rule`` — расчёт следующего срабатывания по правилу, поштучно;
+* ``fanout`` — задержка рассылки одной «минуты» через диспетчер планировщика
+  до заглушки бота;
+* ``translate`` и ``render_reminder`` — пропускная способность локализации.
+
+Результаты пишутся в JSON вместе с коммитом, чтобы сравнивать их между
+коммитами: ``--compare`` печатает отношения к прошлому прогону и завершается
+с кодом 1, если какой-то замер замедлился больше допуска.
+
+Запуск: ``python -m benchmarks.suite --sizes 10000 100000 --output bench.json``
+(сравнение: ``--compare bench-main.json --tolerance 0.2``).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from sqlalchemy import select
+
+from benchmarks.population import synthetic_reminders, synthetic_users, write_population
+from reminderbot.config import Settings
+from reminderbot.domain.services.reminders import ReminderService
+from reminderbot.infrastructure.db.models import Reminder, ReminderStatus
+from reminderbot.infrastructure.db.session import create_engine, create_session_factory
+from reminderbot.infrastructure.scheduler.jobs import init_job_context
+from reminderbot.infrastructure.scheduler.service import ReminderScheduler
+from reminderbot.presentation.localization import Localizer
+from reminderbot.presentation.messages import ReminderRenderer
+
+LOCALES = Path("reminderbot/presentation/locales")
+# Синтетических объектов для CPU-замеров хватает и без миллиона
+CPU_SAMPLE = 200_000
+
+
+@dataclass
+class Result:
+    name: str
+    size: int
+    seconds: float
+    ops: int
+    peak_mib: Optional[float] = None
+    extra: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def ops_per_sec(self) -> float:
+        return self.ops / self.seconds if self.seconds else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "ops_per_sec": round(self.ops_per_sec, 1)}
+
+
+class StubBot:
+    """Заглушка ``Bot``: запоминает момент каждой отправки."""
+
+    def __init__(self) -> None:
+        self.sent_at: list[float] = []
+
+    async def send_message(self, chat_id: int, text: str, **kwargs: Any) -> None:
+        self.sent_at.append(time.perf_counter())
+
+
+def make_renderer() -> ReminderRenderer:
+    return ReminderRenderer(Localizer(LOCALES, "ru"))
+
+
+def best_of(repeat: int, run: Callable[[], float]) -> float:
+    return min(run() for _ in range(max(repeat, 1)))
+
+
+async def bench_resync(db: Path, size: int, repeat: int = 3, full: bool = False) -> Result:
+    """Пересборка очереди; ``full`` — без горизонта, в память попадают все срабатывания."""
+
+    settings = Settings(SCHEDULER_HORIZON_HOURS=0) if full else Settings()
+    engine = create_engine(f"sqlite+aiosqlite:///{db}", settings)
+    factory = create_session_factory(engine)
+    timings = []
+    scheduler = None
+    for _ in range(max(repeat, 1)):
+        scheduler = ReminderScheduler(settings, factory, bot=None, renderer=None)  # type: ignore[arg-type]
+        started = time.perf_counter()
+        await scheduler.resync()
+        timings.append(time.perf_counter() - started)
+    # Отдельный прогон под tracemalloc: он сам замедляет выделения памяти
+    tracemalloc.start()
+    await ReminderScheduler(settings, factory, bot=None, renderer=None).resync()  # type: ignore[arg-type]
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    await engine.dispose()
+    queued = len(scheduler.queue) if scheduler is not None else 0
+    name = "resync_full" if full else "resync"
+    return Result(name, size, min(timings), queued, peak_mib=round(peak / 2**20, 2), extra={"queued": queued})
+
+
+def bench_next_from_rule(size: int, repeat: int = 3) -> Result:
+    now = datetime.now(timezone.utc)
+    count = min(size, CPU_SAMPLE)
+    reminders = [
+        reminder
+        for reminder in synthetic_reminders(count, synthetic_users(max(count // 10, 1)), now)
+        if reminder.rule is not None
+    ]
+    service = ReminderService(None, None, None, None, None, None)  # type: ignore[arg-type]
+
+    def run() -> float:
+        started = time.perf_counter()
+        for reminder in reminders:
+            service._next_from_rule(reminder, now)  # type: ignore[arg-type]
+        return time.perf_counter() - started
+
+    return Result("next_from_rule", size, best_of(repeat, run), len(reminders))
+
+
+async def bench_fanout(db: Path, size: int, fanout: int, workdir: Path) -> Result:
+    """Одна «минута» из ``fanout`` напоминаний через ``ReminderScheduler._dispatch``."""
+
+    copy = workdir / f"fanout-{size}.db"
+    shutil.copyfile(db, copy)
+    engine = create_engine(f"sqlite+aiosqlite:///{copy}", Settings())
+    factory = create_session_factory(engine)
+    async with factory() as session:
+        rows = (
+            await session.execute(
+                select(Reminder.id, Reminder.next_run_at)
+                .where(Reminder.status != ReminderStatus.CLOSED, Reminder.next_run_at.is_not(None))
+                .order_by(Reminder.next_run_at)
+                .limit(fanout)
+            )
+        ).all()
+    due = [(reminder_id, next_run_at.replace(tzinfo=timezone.utc).timestamp()) for reminder_id, next_run_at in rows]
+    bot = StubBot()
+    renderer = make_renderer()
+    scheduler = ReminderScheduler(Settings(), factory, bot, renderer)  # type: ignore[arg-type]
+    init_job_context(session_factory=factory, bot=bot, renderer=renderer, scheduler=scheduler)  # type: ignore[arg-type]
+    started = time.perf_counter()
+    await scheduler._dispatch(due)
+    elapsed = time.perf_counter() - started
+    await engine.dispose()
+    copy.unlink()
+    latencies = sorted(sent - started for sent in bot.sent_at)
+    extra = {"sent": len(latencies)}
+    if latencies:
+        extra["p50_ms"] = round(latencies[len(latencies) // 2] * 1000, 2)
+        extra["p99_ms"] = round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 2)
+    return Result("fanout", size, elapsed, len(due), extra=extra)
+
+
+def bench_translate(size: int, repeat: int = 3) -> Result:
+    localizer = Localizer(LOCALES, "ru")
+    count = min(size, CPU_SAMPLE)
+    locales = ("ru", "en", "uk")
+
+    def run() -> float:
+        started = time.perf_counter()
+        for index in range(count):
+            localizer.translate(
+                "reminder.notify",
+                locales[index % 3],
+                title="Напоминание",
+                description="",
+                time="01.01.2030 09:00",
+            )
+        return time.perf_counter() - started
+
+    return Result("translate", size, best_of(repeat, run), count)
+
+
+def bench_render(size: int, repeat: int = 3) -> Result:
+    renderer = make_renderer()
+    count = min(size, CPU_SAMPLE)
+    reminders = list(synthetic_reminders(count, synthetic_users(max(count // 10, 1)), datetime.now(timezone.utc)))
+
+    def run() -> float:
+        started = time.perf_counter()
+        for reminder in reminders:
+            renderer.render_reminder(reminder)  # type: ignore[arg-type]
+        return time.perf_counter() - started
+
+    return Result("render_reminder", size, best_of(repeat, run), count)
+
+
+async def run_size(size: int, workdir: Path, fanout: int, repeat: int) -> list[Result]:
+    db = workdir / f"population-{size}.db"
+    started = time.perf_counter()
+    await write_population(db, size, size)
+    print(f"Популяция {size}: {time.perf_counter() - started:.1f} с")
+    results = [
+        await bench_resync(db, size, repeat),
+        await bench_resync(db, size, repeat, full=True),
+        bench_next_from_rule(size, repeat),
+        await bench_fanout(db, size, fanout, workdir),
+        bench_translate(size, repeat),
+        bench_render(size, repeat),
+    ]
+    db.unlink()
+    return results
+
+
+def report(results: list[Result]) -> None:
+    for result in results:
+        peak = f"  пик {result.peak_mib:7.1f} МиБ" if result.peak_mib is not None else ""
+        print(
+            f"{result.name:<16} {result.size:>8}  {result.seconds:8.3f} с  "
+            f"{result.ops_per_sec:12.0f} оп/с{peak}  {result.extra or ''}"
+        )
+
+
+def current_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: list[dict[str, Any]], baseline_path: Path, tolerance: float) -> bool:
+    """Печатает отношение времени к прошлому прогону; ``False`` — есть регрессия."""
+
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    previous = {(item["name"], item["size"]): item for item in baseline["results"]}
+    ok = True
+    print(f"Сравнение с {baseline.get('commit') or baseline_path}:")
+    for item in current:
+        old = previous.get((item["name"], item["size"]))
+        if old is None or not old["seconds"]:
+            continue
+        ratio = item["seconds"] / old["seconds"]
+        regressed = ratio > 1 + tolerance
+        ok = ok and not regressed
+        mark = "  РЕГРЕССИЯ" if regressed else ""
+        print(f"{item['name']:<16} {item['size']:>8}  x{ratio:5.2f}{mark}")
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000])
+    parser.add_argument("--fanout", type=int, default=1000, help="напоминаний в одной «минуте»")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=Path, default=Path("bench.json"))
+    parser.add_argument("--compare", type=Path, help="JSON прошлого прогона")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="допустимое замедление, доля")
+    args = parser.parse_args()
+
+    results: list[Result] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            results.extend(asyncio.run(run_size(size, Path(tmp), args.fanout, args.repeat)))
+    report(results)
+    payload = {
+        "commit": current_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": [result.as_dict() for result in results],
+    }
+    args.output.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"Результаты записаны в {args.output}")
+    if args.compare is not None and not compare(payload["results"], args.compare, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
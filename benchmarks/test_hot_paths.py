@@ -0,0 +1,60 @@
+"""Те же замеры, что в ``benchmarks.suite``, под pytest-benchmark.
+
+Запуск: ``python -m pytest benchmarks --benchmark-json bench.json``
+(нужен ``pip install .[bench]``; размер популяции — ``BENCH_SIZE``).
+"""
+
+import asyncio
+import os
+from datetime import datetime, timezone
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from benchmarks import suite  # noqa: E402
+from benchmarks.population import synthetic_reminders, synthetic_users, write_population  # noqa: E402
+from reminderbot.config import Settings  # noqa: E402
+from reminderbot.domain.services.reminders import ReminderService  # noqa: E402
+from reminderbot.infrastructure.db.session import create_engine, create_session_factory  # noqa: E402
+from reminderbot.infrastructure.scheduler.service import ReminderScheduler  # noqa: E402
+
+SIZE = int(os.getenv("BENCH_SIZE", "10000"))
+
+
+@pytest.fixture(scope="module")
+def population(tmp_path_factory):
+    path = tmp_path_factory.mktemp("bench") / "population.db"
+    asyncio.run(write_population(path, SIZE, SIZE))
+    return path
+
+
+@pytest.fixture(scope="module")
+def reminders():
+    return list(synthetic_reminders(min(SIZE, suite.CPU_SAMPLE), synthetic_users(max(SIZE // 10, 1)), datetime.now(timezone.utc)))
+
+
+def test_resync(benchmark, population):
+    async def resync():
+        engine = create_engine(f"sqlite+aiosqlite:///{population}", Settings())
+        await ReminderScheduler(Settings(), create_session_factory(engine), bot=None, renderer=None).resync()
+        await engine.dispose()
+
+    benchmark.pedantic(lambda: asyncio.run(resync()), rounds=5)
+
+
+def test_next_from_rule(benchmark, reminders):
+    service = ReminderService(None, None, None, None, None, None)
+    now = datetime.now(timezone.utc)
+    recurring = [reminder for reminder in reminders if reminder.rule is not None]
+    benchmark(lambda: [service._next_from_rule(reminder, now) for reminder in recurring])
+
+
+def test_fanout(benchmark, population, tmp_path):
+    result = benchmark.pedantic(lambda: asyncio.run(suite.bench_fanout(population, SIZE, 200, tmp_path)), rounds=3)
+    assert result.extra["sent"] == result.ops
+
+
+def test_render_reminder(benchmark, reminders):
+    renderer = suite.make_renderer()
+    benchmark(lambda: [renderer.render_reminder(reminder) for reminder in reminders])
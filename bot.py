@@ -1,5 +1,6 @@
 ﻿import asyncio
 import logging
+from datetime import timedelta
 
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
@@ -7,18 +8,25 @@ from aiogram.enums import ParseMode
 from aiogram.fsm.storage.memory import MemoryStorage
 
 from reminderbot.app.handlers import build_router
+from reminderbot.app.intents import IntentIndex, IntentMiddleware
+from reminderbot.app.keyboards.cache import keyboard_cache
 from reminderbot.app.middlewares.db import DatabaseSessionMiddleware
 from reminderbot.app.middlewares.localization import LocalizationMiddleware
 from reminderbot.app.middlewares.services import ServiceMiddleware
 from reminderbot.config import get_settings
+from reminderbot.domain.profile_cache import ProfileCache
 from reminderbot.infrastructure.db.base import Base
 from reminderbot.infrastructure.db.session import create_engine, create_session_factory
+from reminderbot.infrastructure.delivery.queue import DeliveryQueue
+from reminderbot.infrastructure.fsm_storage import DatabaseStorage
+from reminderbot.infrastructure.repos.log_writer import ReminderLogWriter
 from reminderbot.infrastructure.scheduler.service import ReminderScheduler
 from reminderbot.infrastructure.scheduler.jobs import init_job_context
 from reminderbot.presentation.localization import Localizer
 from reminderbot.presentation.messages import ReminderRenderer
 from reminderbot.app.utils.commands_setup import setup_bot_commands
 from reminderbot.app.middlewares.user_locale import UserLocaleMiddleware
+from reminderbot.app.webhook import run_webhook
 
 
 async def main() -> None:
@@ -29,7 +37,7 @@ async def main() -> None:
         format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
     )
 
-    engine = create_engine(settings.database_url)
+    engine = create_engine(settings.database_url, settings)
     session_factory = create_session_factory(engine)
 
     async with engine.begin() as conn:
@@ -39,33 +47,99 @@ async def main() -> None:
         token=settings.bot_token,
         default=DefaultBotProperties(parse_mode=ParseMode.HTML),
     )
-    dp = Dispatcher(storage=MemoryStorage())
-
+    if settings.fsm_storage == "database":
+        storage = DatabaseStorage(
+            session_factory,
+            cache_size=settings.fsm_cache_size,
+            cache_ttl=settings.fsm_cache_ttl_seconds,
+            flush_interval=settings.fsm_flush_ms / 1000,
+            state_ttl=timedelta(hours=settings.fsm_state_ttl_hours),
+        )
+        storage.start()
+    else:
+        storage = MemoryStorage()
+    dp = Dispatcher(storage=storage)
+
+    profile_cache = ProfileCache(settings.profile_cache_size, settings.profile_cache_ttl_seconds)
     localizer = Localizer(settings.locale_dir, settings.default_locale)
+    for locale, keys in localizer.missing_keys().items():
+        logging.getLogger(__name__).warning(
+            "В локали %s нет ключей (берутся из %s): %s", locale, settings.default_locale, ", ".join(keys)
+        )
     renderer = ReminderRenderer(localizer)
     scheduler = ReminderScheduler(settings, session_factory, bot, renderer)
+    delivery = DeliveryQueue(
+        bot,
+        workers=settings.delivery_workers,
+        global_rate=settings.delivery_global_rate,
+        chat_rate=settings.delivery_chat_rate,
+        max_pending=settings.delivery_queue_size,
+        max_retries=settings.delivery_max_retries,
+    )
+    log_writer = ReminderLogWriter(
+        session_factory,
+        max_batch=settings.log_flush_rows,
+        flush_interval=settings.log_flush_ms / 1000,
+        max_pending=settings.log_buffer_size,
+    )
 
     # ВАЖНО: инициализируем контекст для джобов до старта планировщика
-    init_job_context(session_factory=session_factory, bot=bot, renderer=renderer, scheduler=scheduler)
+    init_job_context(
+        session_factory=session_factory,
+        bot=bot,
+        renderer=renderer,
+        scheduler=scheduler,
+        delivery=delivery,
+        log_writer=log_writer,
+        digest=settings.digest_enabled,
+        digest_max_items=settings.digest_max_items,
+    )
 
     await setup_bot_commands(bot, localizer)
 
+    delivery.start()
+    log_writer.start()
     scheduler.start()
     await scheduler.resync()
 
     # middlewares order: DB -> Services -> i18n -> user-locale
     dp.update.outer_middleware(DatabaseSessionMiddleware(session_factory))
-    dp.update.outer_middleware(ServiceMiddleware(settings, renderer, scheduler))
+    dp.update.outer_middleware(ServiceMiddleware(settings, renderer, scheduler, profile_cache))
     dp.update.outer_middleware(LocalizationMiddleware(localizer))
     dp.update.outer_middleware(UserLocaleMiddleware())
+    # Кнопки главного меню распознаются один раз на сообщение по заранее собранной таблице
+    intent_index = IntentIndex.from_localizer(localizer)
+    dp.message.outer_middleware(IntentMiddleware(intent_index))
+    localizer.on_reload(lambda: intent_index.refresh(localizer))
+    localizer.on_reload(keyboard_cache.clear)
+    locale_watcher = (
+        asyncio.create_task(localizer.watch(settings.locale_reload_seconds), name="locale-watcher")
+        if settings.locale_reload_seconds > 0
+        else None
+    )
 
     router = build_router()
     dp.include_router(router)
 
     try:
-        await dp.start_polling(bot)
+        if settings.bot_mode == "webhook":
+            await run_webhook(dp, bot, settings)
+        else:
+            # getUpdates не работает, пока зарегистрирован вебхук
+            await bot.delete_webhook()
+            await dp.start_polling(bot)
     finally:
+        if locale_watcher is not None:
+            locale_watcher.cancel()
+        await scheduler.stop()
+        logging.getLogger(__name__).info("Кэш профилей: %s", profile_cache.stats())
+        logging.getLogger(__name__).info("Кнопки меню: %s", intent_index.stats())
+        logging.getLogger(__name__).info("Кэш клавиатур: %s", keyboard_cache.stats())
+        # Сначала очередь доставки: её таймаут ограничивает ожидание итогов отправки
+        await delivery.close()
         await scheduler.shutdown()
+        await log_writer.close()
+        await storage.close()
         await bot.session.close()
         await engine.dispose()
 
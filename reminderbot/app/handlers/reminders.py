@@ -8,13 +8,16 @@ from aiogram.filters import Command, StateFilter
 from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery, Message
 
+from reminderbot.app.intents import IntentFilter
 from reminderbot.app.keyboards.common import (
     main_menu_kb,
     reminder_actions_keyboard,
+    reminder_list_keyboard,
     repeat_keyboard,
 )
 from reminderbot.app.utils.states import CreateReminderStates, SnoozeReminderStates
 from reminderbot.app.utils.calendar import calendar_keyboard, hours_keyboard, minutes_keyboard
+from reminderbot.config import Settings
 from reminderbot.domain.models import ReminderCreate
 from reminderbot.domain.services.reminders import ReminderService
 from reminderbot.domain.services.users import UserService
@@ -26,9 +29,7 @@ router = Router()
 
 
 @router.message(Command("create"))
-@router.message(F.text.contains("Создать"))
-@router.message(F.text.contains("Створити"))
-@router.message(F.text.contains("Create"))
+@router.message(IntentFilter("create"))
 async def start_create(message: Message, state: FSMContext, i18n: Localizer, locale: str) -> None:
     await state.set_state(CreateReminderStates.waiting_for_title)
     await message.answer(
@@ -161,13 +162,13 @@ async def choose_repeat(
 
 
 @router.message(Command("reminders"))
-@router.message(F.text.contains("Список"))
-@router.message(F.text.contains("List"))
+@router.message(IntentFilter("list"))
 async def list_reminders(
     message: Message,
     reminder_service: ReminderService,
     user_service: UserService,
     renderer: ReminderRenderer,
+    settings: Settings,
     i18n: Localizer,
     locale: str,
 ) -> None:
@@ -175,19 +176,70 @@ async def list_reminders(
     if not profile:
         await message.answer(i18n.translate("reminder.list_empty", locale))
         return
-    reminders = await reminder_service.list_user_reminders(profile.id)
-    if not reminders:
+    page = await reminder_service.list_user_page(profile.id, limit=settings.reminder_list_page_size)
+    if not page.items:
         await message.answer(i18n.translate("reminder.list_empty", locale))
         return
-    lines = [i18n.translate("reminder.list_title", locale)]
-    for dto in reminders:
-        reminder = await reminder_service.reminders.get_by_id(dto.id)  # type: ignore[attr-defined]
-        if reminder:
-            await message.answer(
-                renderer.render_list_item(reminder),
-                reply_markup=reminder_actions_keyboard(i18n, locale, reminder.id),
-            )
-    await message.answer("\n".join(lines))
+    await message.answer(
+        renderer.render_list_page(page.items, locale, profile.timezone),
+        reply_markup=reminder_list_keyboard(i18n, locale, page.items, page.has_prev, page.has_next),
+    )
+
+
+@router.callback_query(F.data.startswith("rlist:"))
+async def paginate_reminders(
+    callback: CallbackQuery,
+    reminder_service: ReminderService,
+    user_service: UserService,
+    renderer: ReminderRenderer,
+    settings: Settings,
+    i18n: Localizer,
+    locale: str,
+) -> None:
+    await callback.answer()
+    _, direction, cursor = callback.data.split(":")
+    profile = await user_service.get_profile(callback.from_user.id)
+    if not profile:
+        return
+    page = await reminder_service.list_user_page(
+        profile.id,
+        after=int(cursor) if direction == "next" else None,
+        before=int(cursor) if direction == "prev" else None,
+        limit=settings.reminder_list_page_size,
+    )
+    try:
+        if not page.items:
+            await callback.message.edit_text(i18n.translate("reminder.list_empty", locale))
+            return
+        await callback.message.edit_text(
+            renderer.render_list_page(page.items, locale, profile.timezone),
+            reply_markup=reminder_list_keyboard(i18n, locale, page.items, page.has_prev, page.has_next),
+        )
+    except TelegramBadRequest:
+        # Повторное нажатие на ту же страницу: «message is not modified»
+        pass
+
+
+@router.callback_query(F.data.startswith("reminder:open:"))
+async def open_reminder(
+    callback: CallbackQuery,
+    reminder_service: ReminderService,
+    user_service: UserService,
+    renderer: ReminderRenderer,
+    i18n: Localizer,
+    locale: str,
+) -> None:
+    reminder_id = int(callback.data.split(":")[-1])
+    profile = await user_service.get_profile(callback.from_user.id)
+    reminder = await reminder_service.get_user_reminder(profile.id, reminder_id) if profile else None
+    if reminder is None:
+        await callback.answer(i18n.translate("reminder.not_found", locale))
+        return
+    await callback.answer()
+    await callback.message.answer(
+        renderer.render_list_item(reminder),
+        reply_markup=reminder_actions_keyboard(i18n, locale, reminder.id),
+    )
 
 
 @router.callback_query(F.data.startswith("reminder:snooze:"))
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
-from aiogram import F, Router
+from aiogram import Router
 from aiogram.filters import Command
-from aiogram.types import Message, CallbackQuery
+from aiogram.types import InlineKeyboardMarkup, Message, CallbackQuery
 
+from reminderbot.app.intents import IntentFilter
+from reminderbot.app.keyboards.cache import keyboard_cache
 from reminderbot.domain.services.users import UserService
 from reminderbot.presentation.localization import Localizer
 from reminderbot.app.keyboards.common import main_menu_kb
@@ -11,7 +13,11 @@ from reminderbot.app.keyboards.common import main_menu_kb
 router = Router()
 
 
-def language_keyboard():
+def language_keyboard() -> InlineKeyboardMarkup:
+    return keyboard_cache.get_or_build(("language",), _build_language_keyboard)
+
+
+def _build_language_keyboard() -> InlineKeyboardMarkup:
     from aiogram.utils.keyboard import InlineKeyboardBuilder
 
     b = InlineKeyboardBuilder()
@@ -23,10 +29,7 @@ def language_keyboard():
 
 
 @router.message(Command("language"))
-@router.message(F.text.contains("Языки"))
-@router.message(F.text.contains("Мови"))
-@router.message(F.text.contains("Languages"))
-@router.message(lambda m: m.text and any(x in m.text.lower() for x in ("язык", "мова", "language")))
+@router.message(IntentFilter("language"))
 async def settings_entry(message: Message, i18n: Localizer, locale: str) -> None:
     await message.answer(
         i18n.translate("settings.language_choose", locale),
@@ -42,15 +45,13 @@ async def set_language(
 ) -> None:
     await callback.answer()
     lang = callback.data.split(":", maxsplit=1)[1]
-    profile = await user_service.get_profile(callback.from_user.id)
-    if not profile:
-        profile = await user_service.get_or_create_user(
-            telegram_id=callback.from_user.id,
-            full_name=callback.from_user.full_name,
-            username=callback.from_user.username,
-            language=lang,
-        )
-    await user_service.update_language(profile.id, lang)
+    # Создаёт пользователя или сохраняет ему язык одним запросом
+    await user_service.get_or_create_user(
+        telegram_id=callback.from_user.id,
+        full_name=callback.from_user.full_name,
+        username=callback.from_user.username,
+        language=lang,
+    )
     # Update the language selection message itself to the new locale
     try:
         await callback.message.edit_text(
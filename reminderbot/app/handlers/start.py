@@ -1,9 +1,10 @@
 ﻿from __future__ import annotations
 
-from aiogram import F, Router
+from aiogram import Router
 from aiogram.filters import Command, CommandStart
 from aiogram.types import Message
 
+from reminderbot.app.intents import IntentFilter
 from reminderbot.app.keyboards.common import main_menu_kb
 from reminderbot.domain.services.users import UserService
 from reminderbot.presentation.commands import get_commands
@@ -32,8 +33,7 @@ async def handle_start(
 
 
 @router.message(Command("help"))
-@router.message(F.text == "🛑 Помощь")
-@router.message(lambda m: m.text and ("help" in m.text.lower() or "помощ" in m.text.lower() or "довід" in m.text.lower()))
+@router.message(IntentFilter("help"))
 async def handle_help(
     message: Message,
     settings: Settings,
@@ -46,15 +46,3 @@ async def handle_help(
     for cmd, desc in cmds:
         lines.append(f"/{cmd} - {desc}")
     await message.answer("\n".join(lines), reply_markup=main_menu_kb(i18n, locale))
-
-
-@router.message(F.text.contains("Помощь"))
-@router.message(F.text.contains("Help"))
-@router.message(F.text.contains("Допомога"))
-async def handle_help_btn(
-    message: Message,
-    settings: Settings,
-    i18n: Localizer,
-    locale: str,
-) -> None:
-    await handle_help(message, settings, i18n, locale)
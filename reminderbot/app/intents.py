@@ -0,0 +1,90 @@
+﻿from __future__ import annotations
+
+import logging
+import re
+from collections import Counter
+from typing import Any, Callable, Dict, Optional
+
+from aiogram import BaseMiddleware
+from aiogram.filters import BaseFilter
+from aiogram.types import Message, TelegramObject
+
+from reminderbot.presentation.localization import Localizer
+
+logger = logging.getLogger(__name__)
+
+# Кнопки начинаются с эмодзи, а вручную пользователи пишут подпись без него
+_LEADING_SYMBOLS = re.compile(r"^[\W_]+")
+
+
+def normalize(text: str) -> str:
+    return _LEADING_SYMBOLS.sub("", text.strip().casefold()).strip()
+
+
+class IntentIndex:
+    """Таблица «текст кнопки → намерение» по всем локалям.
+
+    Строится один раз при старте из раздела ``buttons.main`` каждой
+    локали; сообщение распознаётся одним поиском в словаре по
+    нормализованному тексту (регистр и эмодзи в начале не важны).
+    """
+
+    def __init__(self, table: Dict[str, str]) -> None:
+        self._table = table
+        self.matches: Counter[str] = Counter()
+
+    @classmethod
+    def from_localizer(cls, i18n: Localizer, section: str = "buttons.main") -> "IntentIndex":
+        table: Dict[str, str] = {}
+        for locale in i18n.available_locales():
+            for intent, label in i18n.section(section, locale).items():
+                key = normalize(label)
+                if table.setdefault(key, intent) != intent:
+                    raise ValueError(f"Кнопка «{label}» ({locale}) уже занята намерением «{table[key]}»")
+        return cls(table)
+
+    def refresh(self, i18n: Localizer, section: str = "buttons.main") -> None:
+        """Пересобирает таблицу после перезагрузки локалей; при конфликте остаётся прежняя."""
+
+        try:
+            self._table = self.from_localizer(i18n, section)._table
+        except ValueError:
+            logger.exception("Кнопки меню не пересобраны")
+
+    def match(self, text: Optional[str]) -> Optional[str]:
+        if not text:
+            return None
+        intent = self._table.get(normalize(text))
+        if intent is not None:
+            self.matches[intent] += 1
+        return intent
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self.matches)
+
+
+class IntentMiddleware(BaseMiddleware):
+    """Распознаёт кнопку главного меню один раз на сообщение и кладёт её в ``data["intent"]``."""
+
+    def __init__(self, index: IntentIndex) -> None:
+        self.index = index
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Any],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        if isinstance(event, Message):
+            data["intent"] = self.index.match(event.text)
+        return await handler(event, data)
+
+
+class IntentFilter(BaseFilter):
+    """Пропускает сообщение, распознанное ``IntentMiddleware`` как заданная кнопка."""
+
+    def __init__(self, intent: str) -> None:
+        self.intent = intent
+
+    async def __call__(self, message: Message, intent: Optional[str] = None) -> bool:
+        return intent == self.intent
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Callable, Hashable, TypeVar
+
+from aiogram.types import InlineKeyboardMarkup, ReplyKeyboardMarkup
+from pydantic import ConfigDict
+
+Markup = TypeVar("Markup", InlineKeyboardMarkup, ReplyKeyboardMarkup)
+
+
+class FrozenInlineKeyboardMarkup(InlineKeyboardMarkup):
+    model_config = ConfigDict(frozen=True)
+
+
+class FrozenReplyKeyboardMarkup(ReplyKeyboardMarkup):
+    model_config = ConfigDict(frozen=True)
+
+
+def freeze(markup: Markup) -> Markup:
+    """Копия разметки, которую нельзя изменить присваиванием: она общая для всех ответов."""
+
+    frozen = FrozenReplyKeyboardMarkup if isinstance(markup, ReplyKeyboardMarkup) else FrozenInlineKeyboardMarkup
+    return frozen.model_construct(**dict(markup))
+
+
+class KeyboardCache:
+    """LRU-кэш готовых клавиатур: ключ — ``(вид, локаль, параметры)``.
+
+    Клавиатура с переводами строится один раз на ключ и дальше отдаётся
+    та же неизменяемая разметка. После перезагрузки локалей кэш
+    сбрасывается через ``clear``.
+    """
+
+    def __init__(self, max_size: int = 1024) -> None:
+        self.max_size = max_size
+        self._entries: OrderedDict[Hashable, InlineKeyboardMarkup | ReplyKeyboardMarkup] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_build(self, key: Hashable, build: Callable[[], Markup]) -> Markup:
+        markup = self._entries.get(key)
+        if markup is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return markup  # type: ignore[return-value]
+        self.misses += 1
+        markup = freeze(build())
+        if self.max_size > 0:
+            self._entries[key] = markup
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return markup
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+# Общий кэш процесса; bot.py сбрасывает его при перезагрузке локалей
+keyboard_cache = KeyboardCache()
@@ -1,12 +1,20 @@
 ﻿from __future__ import annotations
 
+from typing import Sequence
+
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup, ReplyKeyboardMarkup, KeyboardButton
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
+from reminderbot.app.keyboards.cache import keyboard_cache
+from reminderbot.infrastructure.db.models import Reminder
 from reminderbot.presentation.localization import Localizer
 
 
 def main_menu_kb(i18n: Localizer, locale: str) -> ReplyKeyboardMarkup:
+    return keyboard_cache.get_or_build(("main_menu", locale), lambda: _build_main_menu(i18n, locale))
+
+
+def _build_main_menu(i18n: Localizer, locale: str) -> ReplyKeyboardMarkup:
     btn_create = i18n.translate("buttons.main.create", locale)
     btn_list = i18n.translate("buttons.main.list", locale)
     btn_lang = i18n.translate("buttons.main.language", locale)
@@ -20,6 +28,10 @@ def main_menu_kb(i18n: Localizer, locale: str) -> ReplyKeyboardMarkup:
 
 
 def repeat_keyboard(i18n: Localizer, locale: str) -> InlineKeyboardMarkup:
+    return keyboard_cache.get_or_build(("repeat", locale), lambda: _build_repeat(i18n, locale))
+
+
+def _build_repeat(i18n: Localizer, locale: str) -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     builder.button(text=i18n.translate("buttons.repeat.none", locale), callback_data="repeat:none")
     builder.button(text=i18n.translate("buttons.repeat.daily", locale), callback_data="repeat:daily")
@@ -38,3 +50,50 @@ def reminder_actions_keyboard(i18n: Localizer, locale: str, reminder_id: int) ->
     builder.button(text=i18n.translate("buttons.actions.delete", locale), callback_data=f"reminder:delete:{reminder_id}")
     builder.adjust(2)
     return builder.as_markup()
+
+
+def digest_keyboard(i18n: Localizer, locale: str, reminders: Sequence[Reminder]) -> InlineKeyboardMarkup:
+    """Кнопки «закрыть» и «отложить» для каждого пункта дайджеста."""
+
+    close = i18n.translate("buttons.actions.close", locale)
+    snooze = i18n.translate("buttons.actions.snooze", locale)
+    builder = InlineKeyboardBuilder()
+    for reminder in reminders:
+        builder.button(text=f"{close} #{reminder.id}", callback_data=f"reminder:close:{reminder.id}")
+        builder.button(text=f"{snooze} #{reminder.id}", callback_data=f"reminder:snooze:{reminder.id}")
+    builder.adjust(2)
+    return builder.as_markup()
+
+
+def reminder_list_keyboard(
+    i18n: Localizer,
+    locale: str,
+    reminders: Sequence[Reminder],
+    has_prev: bool,
+    has_next: bool,
+) -> InlineKeyboardMarkup:
+    """Кнопка на каждое напоминание страницы и листание, которое правит это же сообщение."""
+
+    builder = InlineKeyboardBuilder()
+    for reminder in reminders:
+        title = reminder.title if len(reminder.title) <= 30 else reminder.title[:29] + "…"
+        builder.button(text=f"#{reminder.id} {title}", callback_data=f"reminder:open:{reminder.id}")
+    nav = []
+    if has_prev:
+        nav.append(
+            InlineKeyboardButton(
+                text=i18n.translate("buttons.list.prev", locale),
+                callback_data=f"rlist:prev:{reminders[0].id}",
+            )
+        )
+    if has_next:
+        nav.append(
+            InlineKeyboardButton(
+                text=i18n.translate("buttons.list.next", locale),
+                callback_data=f"rlist:next:{reminders[-1].id}",
+            )
+        )
+    builder.adjust(1)
+    if nav:
+        builder.row(*nav)
+    return builder.as_markup()
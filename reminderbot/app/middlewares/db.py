@@ -4,11 +4,31 @@ from typing import Any, Callable, Dict
 
 from aiogram import BaseMiddleware
 from aiogram.types import TelegramObject
-from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from reminderbot.app.utils.lazy import Lazy
+
+
+class LazySession(Lazy[AsyncSession]):
+    """Сессия апдейта, которая открывается при первом обращении."""
+
+    async def finish(self, failed: bool) -> None:
+        """Фиксирует или откатывает сессию; нетронутая сессия не стоит ни одного запроса."""
+
+        if not self.resolved:
+            return
+        session = self.get()
+        try:
+            if failed:
+                await session.rollback()
+            elif session.in_transaction():
+                await session.commit()
+        finally:
+            await session.close()
 
 
 class DatabaseSessionMiddleware(BaseMiddleware):
-    """Создаёт сессию БД на время обработки апдейта."""
+    """Даёт апдейту ленивую сессию БД: создаётся и фиксируется только если нужна."""
 
     def __init__(self, session_factory: async_sessionmaker) -> None:
         self.session_factory = session_factory
@@ -19,14 +39,12 @@ class DatabaseSessionMiddleware(BaseMiddleware):
         event: TelegramObject,
         data: Dict[str, Any],
     ) -> Any:
-        session = self.session_factory()
+        session = LazySession(self.session_factory)
         data["session"] = session
         try:
             result = await handler(event, data)
-            await session.commit()
-            return result
         except Exception:
-            await session.rollback()
+            await session.finish(failed=True)
             raise
-        finally:
-            await session.close()
+        await session.finish(failed=False)
+        return result
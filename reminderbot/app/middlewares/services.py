@@ -4,26 +4,30 @@ from typing import Any, Callable, Dict
 
 from aiogram import BaseMiddleware
 from aiogram.types import TelegramObject
-from sqlalchemy.ext.asyncio import AsyncSession
 
+from reminderbot.app.middlewares.db import LazySession
+from reminderbot.app.utils.lazy import Lazy
 from reminderbot.config import Settings
+from reminderbot.domain.profile_cache import ProfileCache
 from reminderbot.infrastructure.container import build_reminder_service, build_user_service
 from reminderbot.infrastructure.repos.users import UserRepository
 from reminderbot.presentation.messages import ReminderRenderer
 
 
 class ServiceMiddleware(BaseMiddleware):
-    """Создаёт сервисы на каждый апдейт."""
+    """Предоставляет сервисы апдейту; создаются они лениво, по первому обращению."""
 
     def __init__(
         self,
         settings: Settings,
         renderer: ReminderRenderer,
         scheduler,
+        profile_cache: ProfileCache | None = None,
     ) -> None:
         self.settings = settings
         self.renderer = renderer
         self.scheduler = scheduler
+        self.profile_cache = profile_cache
 
     async def __call__(
         self,
@@ -31,23 +35,18 @@ class ServiceMiddleware(BaseMiddleware):
         event: TelegramObject,
         data: Dict[str, Any],
     ) -> Any:
-        session: AsyncSession = data["session"]
+        session: LazySession = data["session"]
         bot = data["bot"]
 
-        user_service = build_user_service(session)
-        reminder_service = build_reminder_service(
-            session,
-            bot,
-            self.renderer,
-            self.scheduler,
-        )
-
+        # Сервисы собираются при первом обращении обработчика к ним
         data.update(
             {
                 "settings": self.settings,
-                "user_service": user_service,
-                "reminder_service": reminder_service,
-                "users_repo": UserRepository(session),
+                "user_service": Lazy(lambda: build_user_service(session, self.profile_cache)),
+                "reminder_service": Lazy(
+                    lambda: build_reminder_service(session, bot, self.renderer, self.scheduler)
+                ),
+                "users_repo": Lazy(lambda: UserRepository(session)),
                 "renderer": self.renderer,
             }
         )
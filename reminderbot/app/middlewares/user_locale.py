@@ -1,13 +1,20 @@
 ﻿from __future__ import annotations
 
+import logging
 from typing import Any, Callable, Dict
 
 from aiogram import BaseMiddleware
 from aiogram.types import TelegramObject
 
+logger = logging.getLogger(__name__)
+
 
 class UserLocaleMiddleware(BaseMiddleware):
-    """Выставляет locale из профиля пользователя (приоритетнее чем язык Telegram)."""
+    """Выставляет locale из профиля пользователя (приоритетнее чем язык Telegram).
+
+    Профиль читается через ``UserService.get_profile``, то есть из кэша
+    профилей, если он подключён; обработчики затем получают его оттуда же.
+    """
 
     async def __call__(
         self,
@@ -23,5 +30,6 @@ class UserLocaleMiddleware(BaseMiddleware):
                 if profile and getattr(profile, "language", None):
                     data["locale"] = profile.language
             except Exception:
-                pass
+                # Без профиля апдейт обрабатывается на языке Telegram, но сбой БД не прячем
+                logger.warning("Не удалось прочитать профиль пользователя %s", from_user.id, exc_info=True)
         return await handler(event, data)
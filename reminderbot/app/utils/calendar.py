@@ -5,10 +5,17 @@ from calendar import monthrange
 from aiogram.types import InlineKeyboardMarkup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
-
+from reminderbot.app.keyboards.cache import keyboard_cache
 from reminderbot.presentation.localization import Localizer
 
+
 def calendar_keyboard(i18n: Localizer, locale: str, year: int, month: int) -> InlineKeyboardMarkup:
+    return keyboard_cache.get_or_build(
+        ("calendar", locale, year, month), lambda: _build_calendar(i18n, locale, year, month)
+    )
+
+
+def _build_calendar(i18n: Localizer, locale: str, year: int, month: int) -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     # Header with month navigation
     prev_year, prev_month = _shift_month(year, month, -1)
@@ -19,7 +26,7 @@ def calendar_keyboard(i18n: Localizer, locale: str, year: int, month: int) -> In
     builder.adjust(3)
 
     # Weekday header (Mon-Sun)
-    for wd in ["Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс"]:
+    for wd in i18n.sequence("calendar.weekdays", locale):
         builder.button(text=wd, callback_data="cal:noop")
     builder.adjust(7)
 
@@ -39,6 +46,10 @@ def calendar_keyboard(i18n: Localizer, locale: str, year: int, month: int) -> In
 
 
 def hours_keyboard() -> InlineKeyboardMarkup:
+    return keyboard_cache.get_or_build(("hours",), _build_hours)
+
+
+def _build_hours() -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     for h in range(0, 24):
         builder.button(text=f"{h:02d}", callback_data=f"time:hour:{h:02d}")
@@ -47,6 +58,10 @@ def hours_keyboard() -> InlineKeyboardMarkup:
 
 
 def minutes_keyboard(hour: int) -> InlineKeyboardMarkup:
+    return keyboard_cache.get_or_build(("minutes", hour), lambda: _build_minutes(hour))
+
+
+def _build_minutes(hour: int) -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     # common minute steps
     for m in [0, 5, 10, 15, 20, 25, 30, 35, 40, 45, 50, 55]:
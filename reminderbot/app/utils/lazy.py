@@ -0,0 +1,31 @@
+﻿from __future__ import annotations
+
+from typing import Any, Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class Lazy(Generic[T]):
+    """Прокси, создающий объект при первом обращении к его атрибутам.
+
+    Middleware кладут такие прокси в ``data`` вместо готовых сервисов:
+    апдейт, обработчик которого сервис не трогает, не платит за его сборку.
+    """
+
+    __slots__ = ("_factory", "_instance")
+
+    def __init__(self, factory: Callable[[], T]) -> None:
+        self._factory = factory
+        self._instance: T | None = None
+
+    @property
+    def resolved(self) -> bool:
+        return self._instance is not None
+
+    def get(self) -> T:
+        if self._instance is None:
+            self._instance = self._factory()
+        return self._instance
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.get(), name)
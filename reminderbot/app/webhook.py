@@ -0,0 +1,183 @@
+﻿from __future__ import annotations
+
+import asyncio
+import logging
+from collections import deque
+from typing import Hashable, Optional
+
+from aiogram import Bot, Dispatcher
+from aiogram.dispatcher.middlewares.user_context import UserContextMiddleware
+from aiogram.types import Update
+from aiohttp import web
+from pydantic import ValidationError
+
+from reminderbot.config import Settings
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+class UpdatePipeline:
+    """Пул воркеров для апдейтов из вебхука.
+
+    Апдейты разных чатов обрабатываются параллельно (до ``workers``
+    одновременно), апдейты одного чата — строго по очереди и в порядке
+    поступления. Всего в обработке и ожидании не больше ``max_pending``
+    апдейтов: ``submit`` ждёт свободного места не дольше ``timeout`` и
+    возвращает ``False``, если его не нашлось, — вебхук отвечает ошибкой,
+    и Telegram повторит доставку позже.
+    """
+
+    def __init__(
+        self,
+        dispatcher: Dispatcher,
+        bot: Bot,
+        *,
+        workers: int = 16,
+        max_pending: int = 1000,
+    ) -> None:
+        self.dispatcher = dispatcher
+        self.bot = bot
+        self.workers = workers
+        self._slots = asyncio.Semaphore(max_pending)
+        # Очередь апдейтов на каждый чат; ключ чата в _ready бывает не более одного раза
+        self._lanes: dict[Hashable, deque[Update]] = {}
+        self._ready: asyncio.Queue[Hashable] = asyncio.Queue()
+        self._pending = 0
+        self._drained = asyncio.Event()
+        self._drained.set()
+        self._tasks: list[asyncio.Task] = []
+        self._closed = False
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        logger.info("Запуск обработки апдейтов (%s воркеров)", self.workers)
+        self._closed = False
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"update-worker:{index}")
+            for index in range(self.workers)
+        ]
+
+    async def close(self, timeout: float = 10.0) -> None:
+        """Перестаёт принимать апдейты и дожидается обработки уже принятых."""
+
+        self._closed = True
+        try:
+            await asyncio.wait_for(self._drained.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Обработка апдейтов остановлена, не обработано: %s", self._pending)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, update: Update, timeout: Optional[float] = None) -> bool:
+        if self._closed:
+            return False
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return False
+        self._pending += 1
+        self._drained.clear()
+        key = _order_key(update)
+        lane = self._lanes.get(key)
+        if lane is None:
+            self._lanes[key] = deque([update])
+            self._ready.put_nowait(key)
+        else:
+            lane.append(update)
+        return True
+
+    async def _worker(self) -> None:
+        while True:
+            key = await self._ready.get()
+            lane = self._lanes[key]
+            update = lane.popleft()
+            try:
+                await self.dispatcher.feed_update(self.bot, update)
+            except Exception:
+                logger.exception("Ошибка обработки апдейта %s", update.update_id)
+            finally:
+                # Остаток очереди чата встаёт в конец общей очереди, чтобы не задерживать другие чаты
+                if lane:
+                    self._ready.put_nowait(key)
+                else:
+                    del self._lanes[key]
+                self._pending -= 1
+                self._slots.release()
+                if not self._pending:
+                    self._drained.set()
+
+
+def _order_key(update: Update) -> Hashable:
+    """Ключ упорядочивания: чат, иначе пользователь; прочие апдейты независимы."""
+
+    context = UserContextMiddleware.resolve_event_context(update)
+    if context.chat is not None:
+        return "chat", context.chat.id
+    if context.user is not None:
+        return "user", context.user.id
+    return "update", update.update_id
+
+
+def create_webhook_app(
+    pipeline: UpdatePipeline,
+    path: str,
+    secret: Optional[str] = None,
+    submit_timeout: float = 5.0,
+) -> web.Application:
+    """aiohttp-приложение с одним маршрутом вебхука поверх ``UpdatePipeline``."""
+
+    async def handle(request: web.Request) -> web.Response:
+        if secret and request.headers.get(SECRET_HEADER) != secret:
+            return web.Response(status=401)
+        try:
+            update = Update.model_validate(await request.json(), context={"bot": pipeline.bot})
+        except (ValueError, ValidationError) as exc:
+            # Telegram повторяет всё, что не получило 2xx: битый апдейт отбрасываем, а не ловим повторами
+            logger.warning("Отброшен некорректный апдейт вебхука: %s", exc)
+            return web.Response()
+        if not await pipeline.submit(update, timeout=submit_timeout):
+            # Telegram повторит доставку; так очередь не растёт без границ
+            return web.Response(status=503)
+        return web.Response()
+
+    app = web.Application()
+    app.router.add_post(path, handle)
+    return app
+
+
+async def run_webhook(dispatcher: Dispatcher, bot: Bot, settings: Settings) -> None:
+    """Регистрирует вебхук в Telegram и обслуживает его до отмены задачи."""
+
+    pipeline = UpdatePipeline(
+        dispatcher,
+        bot,
+        workers=settings.update_workers,
+        max_pending=settings.update_queue_size,
+    )
+    app = create_webhook_app(pipeline, settings.webhook_path, settings.webhook_secret)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, settings.webhook_host, settings.webhook_port)
+    pipeline.start()
+    await site.start()
+    await bot.set_webhook(
+        settings.webhook_url.rstrip("/") + settings.webhook_path,
+        secret_token=settings.webhook_secret,
+        allowed_updates=dispatcher.resolve_used_update_types(),
+        max_connections=settings.webhook_max_connections,
+    )
+    logger.info("Вебхук слушает %s:%s%s", settings.webhook_host, settings.webhook_port, settings.webhook_path)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+        await pipeline.close()
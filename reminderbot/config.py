@@ -3,7 +3,7 @@
 import os
 from functools import lru_cache
 from pathlib import Path
-from typing import List
+from typing import List, Literal
 
 from pydantic import Field, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -16,15 +16,14 @@ class Settings(BaseSettings):
     database_url: str = Field(
         default="sqlite+aiosqlite:///./data/reminderbot.db", alias="DATABASE_URL"
     )
-    scheduler_database_url: str | None = Field(
-        default=None, alias="SCHEDULER_DATABASE_URL"
-    )
     timezone: str = Field(default="UTC", alias="DEFAULT_TIMEZONE")
     admin_ids: List[int] = Field(default_factory=list, alias="ADMIN_IDS")
     locale_dir: Path = Field(
         default=Path("reminderbot/presentation/locales"), alias="LOCALE_DIR"
     )
     default_locale: str = Field(default="ru", alias="DEFAULT_LOCALE")
+    # Как часто проверять изменения YAML-файлов локалей (0 — только при старте)
+    locale_reload_seconds: float = Field(default=30.0, alias="LOCALE_RELOAD_SECONDS")
     quiet_hours_start: int = Field(default=22, alias="QUIET_HOURS_START")
     quiet_hours_end: int = Field(default=7, alias="QUIET_HOURS_END")
     web_enabled: bool = Field(default=True, alias="WEB_ENABLED")
@@ -34,6 +33,63 @@ class Settings(BaseSettings):
         default=None, alias="GOOGLE_CREDENTIALS_PATH"
     )
     logging_level: str = Field(default="INFO", alias="LOGGING_LEVEL")
+    # Профиль файловой SQLite: WAL и прагмы на каждое соединение, пул на процесс
+    sqlite_tuned: bool = Field(default=True, alias="SQLITE_TUNED")
+    sqlite_journal_mode: str = Field(default="WAL", alias="SQLITE_JOURNAL_MODE")
+    sqlite_synchronous: str = Field(default="NORMAL", alias="SQLITE_SYNCHRONOUS")
+    sqlite_busy_timeout_ms: int = Field(default=5000, alias="SQLITE_BUSY_TIMEOUT_MS")
+    sqlite_mmap_size: int = Field(default=256 * 1024 * 1024, alias="SQLITE_MMAP_SIZE")
+    sqlite_cache_size_kib: int = Field(default=64 * 1024, alias="SQLITE_CACHE_SIZE_KIB")
+    db_pool_size: int = Field(default=5, alias="DB_POOL_SIZE")
+    db_max_overflow: int = Field(default=5, alias="DB_MAX_OVERFLOW")
+    # PostgreSQL (asyncpg): кэш подготовленных выражений на соединение и время жизни соединения
+    db_statement_cache_size: int = Field(default=100, alias="DB_STATEMENT_CACHE_SIZE")
+    db_pool_recycle_seconds: int = Field(default=1800, alias="DB_POOL_RECYCLE_SECONDS")
+    # Кэш профилей пользователей в памяти процесса (0 — без кэша)
+    profile_cache_size: int = Field(default=10000, alias="PROFILE_CACHE_SIZE")
+    profile_cache_ttl_seconds: float = Field(default=60.0, alias="PROFILE_CACHE_TTL_SECONDS")
+    # Список напоминаний в боте: одна страница — одно сообщение
+    reminder_list_page_size: int = Field(default=10, alias="REMINDER_LIST_PAGE_SIZE")
+    # Горизонт планировщика: в памяти держим только то, что сработает в ближайшие N часов (0 — без ограничения)
+    scheduler_horizon_hours: float = Field(default=6.0, alias="SCHEDULER_HORIZON_HOURS")
+    scheduler_sweep_minutes: float = Field(default=30.0, alias="SCHEDULER_SWEEP_MINUTES")
+    scheduler_batch_size: int = Field(default=1000, alias="SCHEDULER_BATCH_SIZE")
+    # Диспетчер просыпается раз в tick и обрабатывает сработавшее пачками
+    scheduler_tick_seconds: float = Field(default=1.0, alias="SCHEDULER_TICK_SECONDS")
+    scheduler_dispatch_batch_size: int = Field(default=200, alias="SCHEDULER_DISPATCH_BATCH_SIZE")
+    # Очередь доставки: лимиты Telegram ~30 сообщений/с всего и ~1 сообщение/с в чат
+    delivery_workers: int = Field(default=4, alias="DELIVERY_WORKERS")
+    delivery_global_rate: float = Field(default=30.0, alias="DELIVERY_GLOBAL_RATE")
+    delivery_chat_rate: float = Field(default=1.0, alias="DELIVERY_CHAT_RATE")
+    delivery_queue_size: int = Field(default=10000, alias="DELIVERY_QUEUE_SIZE")
+    delivery_max_retries: int = Field(default=3, alias="DELIVERY_MAX_RETRIES")
+    # Журнал доставки: строки о срабатываниях старше N дней удаляются при проходе sweep (0 — хранить всё)
+    delivery_ledger_retention_days: float = Field(default=7.0, alias="DELIVERY_LEDGER_RETENTION_DAYS")
+    # Дайджест: напоминания пользователя со сроками в пределах окна уходят одним сообщением
+    digest_enabled: bool = Field(default=False, alias="DIGEST_ENABLED")
+    digest_window_seconds: float = Field(default=60.0, alias="DIGEST_WINDOW_SECONDS")
+    digest_max_items: int = Field(default=20, alias="DIGEST_MAX_ITEMS")
+    # Журнал отправок пишется пачками: каждые N строк или M миллисекунд
+    log_flush_rows: int = Field(default=500, alias="LOG_FLUSH_ROWS")
+    log_flush_ms: int = Field(default=500, alias="LOG_FLUSH_MS")
+    log_buffer_size: int = Field(default=10000, alias="LOG_BUFFER_SIZE")
+    # FSM-диалоги: в БД с кэшем записи в памяти (переживают рестарт и общие для воркеров) или только в памяти
+    fsm_storage: Literal["database", "memory"] = Field(default="database", alias="FSM_STORAGE")
+    fsm_cache_size: int = Field(default=10000, alias="FSM_CACHE_SIZE")
+    fsm_cache_ttl_seconds: float = Field(default=30.0, alias="FSM_CACHE_TTL_SECONDS")
+    fsm_flush_ms: int = Field(default=200, alias="FSM_FLUSH_MS")
+    fsm_state_ttl_hours: float = Field(default=24.0, alias="FSM_STATE_TTL_HOURS")
+    # Приём апдейтов: polling или вебхук (несколько воркеров за балансировщиком)
+    bot_mode: Literal["polling", "webhook"] = Field(default="polling", alias="BOT_MODE")
+    webhook_url: str | None = Field(default=None, alias="WEBHOOK_URL")
+    webhook_path: str = Field(default="/telegram/webhook", alias="WEBHOOK_PATH")
+    webhook_secret: str | None = Field(default=None, alias="WEBHOOK_SECRET")
+    webhook_host: str = Field(default="0.0.0.0", alias="WEBHOOK_HOST")
+    webhook_port: int = Field(default=8080, alias="WEBHOOK_PORT")
+    webhook_max_connections: int = Field(default=40, alias="WEBHOOK_MAX_CONNECTIONS")
+    # Апдейты разных чатов обрабатываются параллельно, очередь ограничена
+    update_workers: int = Field(default=16, alias="UPDATE_WORKERS")
+    update_queue_size: int = Field(default=1000, alias="UPDATE_QUEUE_SIZE")
 
     model_config = SettingsConfigDict(
         env_file=os.path.join(os.path.dirname(os.path.dirname(__file__)), ".env"),
@@ -43,6 +99,12 @@ class Settings(BaseSettings):
         str_strip_whitespace=True,
     )
 
+    @model_validator(mode="after")
+    def _require_webhook_url(self) -> "Settings":
+        if self.bot_mode == "webhook" and not self.webhook_url:
+            raise ValueError("BOT_MODE=webhook требует WEBHOOK_URL")
+        return self
+
     @model_validator(mode="after")
     def _split_admin_ids(self) -> "Settings":
         if self.admin_ids and isinstance(self.admin_ids, list):
@@ -52,14 +114,6 @@ class Settings(BaseSettings):
             object.__setattr__(self, "admin_ids", [int(v) for v in values])
         return self
 
-    @property
-    def scheduler_url(self) -> str:
-        """Возвращает URL хранилища задач APScheduler."""
-
-        if self.scheduler_database_url:
-            return self.scheduler_database_url
-        return "sqlite:///./data/scheduler.db"
-
 
 @lru_cache(maxsize=1)
 def get_settings() -> Settings:
@@ -0,0 +1,67 @@
+﻿from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from reminderbot.domain.models import UserProfile
+
+
+class ProfileCache:
+    """Кэш профилей пользователей в памяти процесса: ключ — ``telegram_id``.
+
+    Запись живёт ``ttl`` секунд, при переполнении вытесняется давно не
+    читанная (LRU). Кэш заполняется при чтении в ``UserService``, а методы,
+    меняющие профиль, обновляют запись после коммита. TTL ограничивает
+    устаревание, если профиль поменял другой процесс (например, веб).
+    """
+
+    def __init__(
+        self,
+        max_size: int = 10_000,
+        ttl: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict[int, tuple[float, UserProfile]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, telegram_id: int) -> Optional[UserProfile]:
+        entry = self._entries.get(telegram_id)
+        if entry is not None and entry[0] > self._clock():
+            self._entries.move_to_end(telegram_id)
+            self.hits += 1
+            return entry[1]
+        if entry is not None:
+            del self._entries[telegram_id]
+        self.misses += 1
+        return None
+
+    def put(self, profile: UserProfile) -> None:
+        if self.max_size <= 0:
+            return
+        self._entries[profile.telegram_id] = (self._clock() + self.ttl, profile)
+        self._entries.move_to_end(profile.telegram_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, telegram_id: int) -> None:
+        self._entries.pop(telegram_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
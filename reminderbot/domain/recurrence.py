@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+from calendar import monthrange
+from dataclasses import dataclass
+from datetime import datetime, timedelta, tzinfo
+from typing import Any, Callable, Iterator, Optional, Sequence
+from zoneinfo import ZoneInfo
+
+from reminderbot.infrastructure.db.models import RepeatKind
+
+
+@dataclass(frozen=True, slots=True)
+class RecurrenceRule:
+    """Компактное неизменяемое описание правила повтора, без ORM и БД."""
+
+    kind: RepeatKind
+    interval: int = 1
+    custom_interval_minutes: Optional[int] = None
+    weekday_mask: tuple[int, ...] = ()
+    monthday: Optional[int] = None
+
+    @classmethod
+    def from_rule(cls, rule: Any) -> Optional["RecurrenceRule"]:
+        """Строит правило из ``ReminderRuleDTO`` или ORM ``ReminderRule``."""
+
+        if rule is None:
+            return None
+        return cls(
+            kind=RepeatKind(rule.kind),
+            interval=rule.interval,
+            custom_interval_minutes=rule.custom_interval_minutes,
+            weekday_mask=tuple(rule.weekday_mask or ()),
+            monthday=rule.monthday,
+        )
+
+    def next_after(self, base: datetime, reference: datetime) -> Optional[datetime]:
+        return next_occurrence(
+            base,
+            reference,
+            self.kind,
+            self.interval,
+            self.custom_interval_minutes,
+            self.weekday_mask,
+            self.monthday,
+        )
+
+
+def iter_occurrences(
+    scheduled_at: datetime,
+    rule: Any,
+    timezone: str | tzinfo,
+    *,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: Optional[int] = None,
+) -> Iterator[datetime]:
+    """Лениво перечисляет срабатывания строго после ``start`` (по умолчанию — сейчас).
+
+    ``rule`` — ``RecurrenceRule``, ``ReminderRuleDTO`` или ``None`` для
+    разового напоминания. Последовательность совпадает с тем, что по очереди
+    выдавал бы планировщик; без ``end`` и ``limit`` она бесконечна.
+    """
+
+    tz = ZoneInfo(timezone) if isinstance(timezone, str) else timezone
+    compact = rule if isinstance(rule, RecurrenceRule) or rule is None else RecurrenceRule.from_rule(rule)
+    base = _in_zone(scheduled_at, tz)
+    reference = _in_zone(start, tz) if start is not None else datetime.now(tz=tz)
+    end = _in_zone(end, tz) if end is not None else None
+    produced = 0
+    while limit is None or produced < limit:
+        if base > reference:
+            occurrence: Optional[datetime] = base
+        elif compact is not None:
+            occurrence = compact.next_after(base, reference)
+        else:
+            occurrence = None
+        if occurrence is None or (end is not None and occurrence > end):
+            return
+        yield occurrence
+        produced += 1
+        reference = occurrence
+
+
+def last_occurrence(
+    scheduled_at: datetime,
+    rule: Any,
+    timezone: str | tzinfo,
+    moment: datetime,
+) -> Optional[datetime]:
+    """Последнее срабатывание не позже ``moment``; ``None``, если первое ещё впереди.
+
+    Перебор начинается за один период правила до ``moment``, поэтому
+    стоимость не зависит от возраста напоминания.
+    """
+
+    tz = ZoneInfo(timezone) if isinstance(timezone, str) else timezone
+    compact = rule if isinstance(rule, RecurrenceRule) or rule is None else RecurrenceRule.from_rule(rule)
+    base = _in_zone(scheduled_at, tz)
+    moment = _in_zone(moment, tz)
+    if base > moment:
+        return None
+    period = _max_period(compact) if compact is not None else None
+    if period is None or moment - period <= base:
+        latest, reference = base, base
+    else:
+        latest, reference = None, moment - period
+    while True:
+        following = compact.next_after(base, reference) if compact is not None else None
+        if following is None or following > moment:
+            return latest or base
+        latest = reference = following
+
+
+def _max_period(rule: RecurrenceRule) -> Optional[timedelta]:
+    """Верхняя оценка расстояния между соседними срабатываниями по настенному времени."""
+
+    if rule.kind == RepeatKind.CUSTOM:
+        minutes = rule.custom_interval_minutes or 0
+        return timedelta(minutes=minutes) if minutes > 0 else None
+    # Недельное правило может перескочить день недели внутри периода, отсюда два периода
+    days = {RepeatKind.DAILY: 1, RepeatKind.WEEKLY: 14, RepeatKind.MONTHLY: 32}.get(rule.kind, 0) * rule.interval
+    return timedelta(days=days) if days > 0 else None
+
+
+def _in_zone(dt: datetime, tz: tzinfo) -> datetime:
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=tz)
+    return dt.astimezone(tz)
+
+
+def next_occurrence(
+    base: datetime,
+    reference: datetime,
+    kind: RepeatKind | str,
+    interval: int,
+    custom_interval_minutes: Optional[int] = None,
+    weekday_mask: Optional[Sequence[int]] = None,
+    monthday: Optional[int] = None,
+) -> Optional[datetime]:
+    """Следующее после ``reference`` срабатывание правила, начатого в ``base``.
+
+    Номер шага вычисляется арифметически, поэтому цена не зависит от того,
+    как давно создано напоминание. Результат совпадает с пошаговым обходом
+    от ``base``: сравнения и сложения идут по тем же правилам aware-datetime
+    (при общем tzinfo — по настенному времени). Правила с нулевым или
+    отрицательным интервалом, на которых пошаговый обход зацикливался,
+    дают ``None``.
+    """
+
+    if kind == RepeatKind.DAILY:
+        return _next_fixed_step(base, reference, timedelta(days=interval))
+    if kind == RepeatKind.WEEKLY:
+        weekdays = weekday_mask or [base.weekday()]
+        return _next_weekly(base, reference, weekdays, interval)
+    if kind == RepeatKind.MONTHLY:
+        return _next_monthly(base, reference, monthday or base.day, interval)
+    if kind == RepeatKind.CUSTOM and custom_interval_minutes:
+        return _next_fixed_step(base, reference, timedelta(minutes=custom_interval_minutes))
+    return None
+
+
+def _first_index_after(point: Callable[[int], datetime], estimate: int, reference: datetime, lower: int) -> int:
+    """Наименьший k >= lower, для которого ``point(k) > reference``.
+
+    ``estimate`` — арифметическая оценка; поправочные шаги нужны только
+    когда у ``reference`` другой tzinfo и сравнение идёт по UTC.
+    """
+
+    k = max(estimate, lower)
+    while point(k) <= reference:
+        k += 1
+    while k > lower and point(k - 1) > reference:
+        k -= 1
+    return k
+
+
+def _next_fixed_step(base: datetime, reference: datetime, step: timedelta) -> Optional[datetime]:
+    if step <= timedelta(0):
+        return None
+    if base > reference:
+        return base
+    k = _first_index_after(lambda i: base + step * i, (reference - base) // step + 1, reference, 1)
+    return base + step * k
+
+
+def _next_weekly(
+    base: datetime,
+    reference: datetime,
+    weekdays: Sequence[int],
+    interval: int,
+) -> Optional[datetime]:
+    if interval <= 0:
+        return None
+    if base > reference:
+        return base
+    period = timedelta(days=7 * interval)
+    offsets = [timedelta(days=(weekday - base.weekday()) % 7) for weekday in sorted(set(weekdays))]
+    # Дни недели внутри периода проверяются в порядке номеров, время — как у base без микросекунд
+    base_time = base.replace(microsecond=0)
+    latest = base_time + max(offsets)
+
+    def estimate(start: datetime) -> int:
+        return 0 if start > reference else (reference - start) // period + 1
+
+    # Первый период, в котором хотя бы один день недели позже reference
+    hit = _first_index_after(lambda i: latest + period * i, estimate(latest), reference, 0)
+    # Период, в начале которого сам кандидат уже позже reference (выход из цикла)
+    exit_ = _first_index_after(lambda i: base + period * i, estimate(base), reference, 1)
+    if exit_ <= hit:
+        return base + period * exit_
+    start = base_time + period * hit
+    for offset in offsets:
+        if start + offset > reference:
+            return start + offset
+    raise AssertionError("unreachable")  # pragma: no cover
+
+
+def _next_monthly(
+    base: datetime,
+    reference: datetime,
+    monthday: int,
+    interval: int,
+) -> Optional[datetime]:
+    if interval <= 0:
+        return None
+    if base > reference:
+        return base
+    base_index = base.year * 12 + base.month - 1
+    local_reference = reference.astimezone(base.tzinfo) if base.tzinfo else reference
+
+    def point(k: int) -> datetime:
+        year, month0 = divmod(base_index + k * interval, 12)
+        day = min(monthday, monthrange(year, month0 + 1)[1])
+        return base.replace(year=year, month=month0 + 1, day=day)
+
+    reference_index = local_reference.year * 12 + local_reference.month - 1
+    estimate = -(-(reference_index - base_index) // interval)
+    return point(_first_index_after(point, estimate, reference, 1))
@@ -0,0 +1,285 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Optional, Sequence
+from zoneinfo import ZoneInfo
+
+from reminderbot.domain.recurrence import RecurrenceRule
+from reminderbot.infrastructure.db.models import RepeatKind
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy ставится через extra [perf]
+    np = None
+
+KIND_CODES = {
+    RepeatKind.NONE: 0,
+    RepeatKind.DAILY: 1,
+    RepeatKind.WEEKLY: 2,
+    RepeatKind.MONTHLY: 3,
+    RepeatKind.CUSTOM: 4,
+}
+
+_US = 1_000_000
+_DAY = 86_400 * _US
+# Настенное время считаем в микросекундах от полуночи 1970-01-01 (четверг)
+_WALL_EPOCH = datetime(1970, 1, 1)
+_WALL_MAX = (datetime.max - _WALL_EPOCH) // timedelta(microseconds=1)
+# «Нет следующего срабатывания» во внутренних int64-массивах
+_NONE = -(2**63)
+
+_FROM_WALL, _FROM_BASE, _FROM_SNOOZE, _FROM_MONTHLY, _FROM_NONE, _FROM_SCALAR = range(6)
+
+BatchItem = tuple[datetime, Optional[datetime], Any, str]
+
+
+@dataclass
+class RuleArrays:
+    """Правила повтора в колоночном виде, по строке на напоминание.
+
+    ``base`` — epoch-секунды UTC первого срабатывания, ``tz_offset`` —
+    смещение зоны пользователя в секундах. ``weekday_mask`` — битовая маска
+    (бит 0 — понедельник), 0 означает «день недели base»; нули в
+    ``custom_minutes`` и ``monthday`` означают «не задано», NaN в
+    ``snooze`` — отложенного срабатывания нет.
+    """
+
+    base: Any
+    kind: Any
+    interval: Any
+    custom_minutes: Any
+    weekday_mask: Any
+    monthday: Any
+    tz_offset: Any
+    snooze: Any = None
+
+    def __len__(self) -> int:
+        return len(self.base)
+
+
+def next_fire_epochs(rules: RuleArrays, now: float) -> Any:
+    """Следующие срабатывания всех строк одним проходом: epoch-секунды, NaN — нет.
+
+    Смещение зоны в строке считается постоянным; для зон с переходом на
+    летнее время используйте ``compute_next_runs``.
+    """
+
+    _require_numpy()
+    offset = np.asarray(rules.tz_offset, dtype=np.int64) * _US
+    base = np.round(np.asarray(rules.base, dtype=np.float64) * _US).astype(np.int64) + offset
+    ref = int(round(now * _US)) + offset
+    snooze = np.full(len(rules), _NONE, dtype=np.int64)
+    if rules.snooze is not None:
+        seconds = np.asarray(rules.snooze, dtype=np.float64)
+        valid = ~np.isnan(seconds)
+        snooze[valid] = np.round(seconds[valid] * _US).astype(np.int64) + offset[valid]
+    wall = _next_wall(
+        base,
+        ref,
+        snooze,
+        np.asarray(rules.kind),
+        np.asarray(rules.interval, dtype=np.int64),
+        np.asarray(rules.custom_minutes, dtype=np.int64),
+        np.asarray(rules.weekday_mask, dtype=np.int64),
+        np.asarray(rules.monthday, dtype=np.int64),
+    )
+    result = (wall - offset).astype(np.float64) / _US
+    result[wall == _NONE] = np.nan
+    return result
+
+
+def compute_next_runs(items: Sequence[BatchItem], now: datetime) -> list[Optional[datetime]]:
+    """Пакетный аналог ``compute_next_run`` для активных напоминаний.
+
+    Строка — ``(scheduled_at, snooze_until, rule, timezone)``. Как и
+    скалярный путь, расчёт идёт по настенному времени зоны пользователя,
+    поэтому переходы на летнее время не требуют отдельной обработки.
+    Правила, которые скалярный путь трактует особо (дни недели вне 0..6,
+    отрицательный день месяца, выход за datetime.max), и окружение без
+    numpy считаются по одному через ``RecurrenceRule.next_after``.
+    """
+
+    if not items:
+        return []
+    zones = {name: ZoneInfo(name) for name in {item[3] for item in items}}
+    if np is None:
+        return [_scalar(item, zones[item[3]], now) for item in items]
+
+    references = {name: _wall_array([now.astimezone(zone)])[0] for name, zone in zones.items()}
+    localized = [_localize(item, zones[item[3]]) for item in items]
+    base = _wall_array([scheduled for scheduled, _ in localized])
+    ref = np.array([references[item[3]] for item in items], dtype=np.int64)
+    snooze = np.full(len(items), _NONE, dtype=np.int64)
+    snoozed_rows = [row for row, (_, snoozed) in enumerate(localized) if snoozed is not None]
+    if snoozed_rows:
+        snooze[snoozed_rows] = _wall_array([localized[row][1] for row in snoozed_rows])
+    columns = [_rule_columns(item[2]) for item in items]
+    kind, interval, custom, mask, monthday = (np.array(column, dtype=np.int64) for column in zip(*columns))
+    odd = (mask < 0) | (monthday < 0)
+
+    wall = _next_wall(base, ref, snooze, kind, interval, custom, np.maximum(mask, 0), monthday)
+    moments = wall.astype("datetime64[us]").tolist()
+    # Откуда брать результат строки; считаем векторно, чтобы не индексировать массивы в цикле
+    source = np.select(
+        [odd | (wall > _WALL_MAX), wall == _NONE, wall == snooze, wall == base, kind == 3],
+        [_FROM_SCALAR, _FROM_NONE, _FROM_SNOOZE, _FROM_BASE, _FROM_MONTHLY],
+        _FROM_WALL,
+    ).tolist()
+    results: list[Optional[datetime]] = []
+    for item, (scheduled, snoozed), origin, moment in zip(items, localized, source, moments):
+        if origin == _FROM_WALL:
+            results.append(moment.replace(tzinfo=zones[item[3]]))
+        elif origin == _FROM_BASE:
+            results.append(scheduled)
+        elif origin == _FROM_SNOOZE:
+            results.append(snoozed)
+        elif origin == _FROM_MONTHLY:
+            # Месячный шаг строится через replace() и сохраняет fold исходного base
+            results.append(moment.replace(tzinfo=zones[item[3]], fold=scheduled.fold))
+        elif origin == _FROM_NONE:
+            results.append(None)
+        else:
+            results.append(_scalar(item, zones[item[3]], now))
+    return results
+
+
+def _next_wall(
+    base: Any,
+    ref: Any,
+    snooze: Any,
+    kind: Any,
+    interval: Any,
+    custom: Any,
+    mask: Any,
+    monthday: Any,
+) -> Any:
+    """Ядро расчёта: все значения — настенное время в микросекундах."""
+
+    result = np.full(len(base), _NONE, dtype=np.int64)
+    due = base <= ref
+
+    # DAILY и CUSTOM: фиксированный шаг, номер шага — целочисленным делением
+    step = np.where(kind == 1, interval * _DAY, np.where(kind == 4, custom * 60 * _US, 0))
+    sel = due & (step > 0)
+    if sel.any():
+        b, s = base[sel], step[sel]
+        result[sel] = b + ((ref[sel] - b) // s + 1) * s
+
+    sel = due & (kind == 2) & (interval > 0)
+    if sel.any():
+        result[sel] = _weekly(base[sel], ref[sel], interval[sel], mask[sel])
+
+    sel = due & (kind == 3) & (interval > 0)
+    if sel.any():
+        result[sel] = _monthly(base[sel], ref[sel], interval[sel], monthday[sel])
+
+    # Порядок проверок как в compute_next_run: активный snooze, затем будущий base
+    result[~due] = base[~due]
+    snoozed = (snooze != _NONE) & (snooze > ref)
+    result[snoozed] = snooze[snoozed]
+    return result
+
+
+def _weekly(base: Any, ref: Any, interval: Any, mask: Any) -> Any:
+    weekday = (base // _DAY + 3) % 7
+    mask = np.where(mask == 0, np.left_shift(1, weekday), mask)
+    period = 7 * interval * _DAY
+    base_time = base - base % _US
+    # Дни недели внутри периода перебираются в порядке номеров, как в скалярном пути
+    offsets = np.stack([(day - weekday) % 7 * _DAY for day in range(7)])
+    present = np.stack([(mask >> day) & 1 == 1 for day in range(7)])
+    latest = base_time + np.where(present, offsets, -_DAY).max(axis=0)
+
+    hit = np.where(latest > ref, 0, (ref - latest) // period + 1)
+    exit_ = (ref - base) // period + 1
+    result = base + exit_ * period
+    start = base_time + hit * period
+    pending = hit < exit_
+    for day in range(7):
+        candidate = start + offsets[day]
+        take = pending & present[day] & (candidate > ref)
+        result[take] = candidate[take]
+        pending &= ~take
+    return result
+
+
+def _monthly(base: Any, ref: Any, interval: Any, monthday: Any) -> Any:
+    base_days = base // _DAY
+    time_of_day = base - base_days * _DAY
+    base_month = base_days.astype("datetime64[D]").astype("datetime64[M]")
+    base_index = base_month.astype(np.int64)
+    monthday = np.where(monthday > 0, monthday, base_days - base_month.astype("datetime64[D]").astype(np.int64) + 1)
+    ref_index = (ref // _DAY).astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+
+    def point(k: Any) -> Any:
+        month = (base_index + k * interval).astype("datetime64[M]")
+        first = month.astype("datetime64[D]").astype(np.int64)
+        days_in_month = (month + 1).astype("datetime64[D]").astype(np.int64) - first
+        return (first + np.minimum(monthday, days_in_month) - 1) * _DAY + time_of_day
+
+    # Первый шаг, попадающий в месяц reference или позже; максимум одна поправка
+    k = np.maximum(1, -((base_index - ref_index) // interval))
+    candidate = point(k)
+    late = candidate <= ref
+    return np.where(late, point(k + late), candidate)
+
+
+def _rule_columns(rule: Any) -> tuple[int, int, int, int, int]:
+    """Колонки правила для ядра; маска -1 помечает дни недели вне 0..6."""
+
+    if rule is None:
+        return 0, 0, 0, 0, 0
+    bits = 0
+    for weekday in rule.weekday_mask or ():
+        if not 0 <= weekday <= 6:
+            bits = -1
+            break
+        bits |= 1 << weekday
+    return (
+        KIND_CODES[rule.kind],
+        rule.interval,
+        rule.custom_interval_minutes or 0,
+        bits,
+        rule.monthday or 0,
+    )
+
+
+def _localize(item: BatchItem, zone: ZoneInfo) -> tuple[datetime, Optional[datetime]]:
+    scheduled, snoozed, _, _ = item
+    return _in_zone(scheduled, zone), _in_zone(snoozed, zone) if snoozed is not None else None
+
+
+def _in_zone(dt: datetime, zone: ZoneInfo) -> datetime:
+    if dt.tzinfo is zone:
+        return dt
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=zone)
+    return dt.astimezone(zone)
+
+
+def _wall_array(values: Sequence[datetime]) -> Any:
+    """Настенное время aware-datetime в микросекундах без построения naive-копий."""
+
+    stamps = np.array([value.timestamp() + value.utcoffset().total_seconds() for value in values])
+    micros = np.array([value.microsecond for value in values], dtype=np.int64)
+    # Целые секунды восстанавливаются точно и для дат далеко за 2255 годом
+    return np.round(stamps - micros / _US).astype(np.int64) * _US + micros
+
+
+def _scalar(item: BatchItem, zone: ZoneInfo, now: datetime) -> Optional[datetime]:
+    scheduled, snoozed = _localize(item, zone)
+    reference = now.astimezone(zone)
+    if snoozed is not None and snoozed > reference:
+        return snoozed
+    if scheduled > reference:
+        return scheduled
+    compact = RecurrenceRule.from_rule(item[2])
+    if compact is None:
+        return None
+    return compact.next_after(scheduled, reference)
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise RuntimeError("Для пакетного расчёта нужен numpy: pip install reminderbot[perf]")
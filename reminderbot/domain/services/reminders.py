@@ -1,12 +1,15 @@
 ﻿from __future__ import annotations
 
 import logging
-from datetime import datetime, timedelta, time
-from typing import Awaitable, Callable, Iterable, Optional
+from dataclasses import dataclass
+from datetime import datetime, timedelta, time, timezone
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Mapping, Optional, Sequence
 from zoneinfo import ZoneInfo
 
 from reminderbot.domain.models import ReminderCreate, ReminderDTO, ReminderUpdate
+from reminderbot.domain.recurrence import last_occurrence, next_occurrence
 from reminderbot.infrastructure.db.models import (
+    DeliveryStatus,
     Reminder,
     ReminderLog,
     ReminderRule,
@@ -15,8 +18,11 @@ from reminderbot.infrastructure.db.models import (
     ReminderEventStatus,
     User,
 )
+from reminderbot.infrastructure.repos.deliveries import DeliveryLedgerRepository
+from reminderbot.infrastructure.repos.log_writer import ReminderLogWriter
 from reminderbot.infrastructure.repos.reminders import (
     ReminderLogRepository,
+    ReminderPage,
     ReminderRepository,
 )
 from reminderbot.infrastructure.repos.rules import ReminderRuleRepository
@@ -25,7 +31,29 @@ from reminderbot.presentation.messages import ReminderRenderer
 
 logger = logging.getLogger(__name__)
 
-SendCallback = Callable[[int, str], Awaitable[None]]
+# sender(chat_id, text, **kwargs): kwargs уходят в send_message (например, reply_markup).
+# Если сообщение лишь поставлено в очередь, sender возвращает квитанцию — awaitable,
+# который завершается после фактической отправки или бросает её ошибку.
+SendCallback = Callable[..., Awaitable[Optional[Awaitable[None]]]]
+DigestKeyboard = Callable[[User, Sequence[Reminder]], Any]
+
+
+@dataclass
+class PendingDelivery:
+    """Сообщение в очереди отправки, итог которого ещё не известен."""
+
+    reminder_ids: list[int]
+    ledger_ids: list[int]
+    receipt: Awaitable[None]
+
+    async def outcome(self) -> Optional[BaseException]:
+        """Ждёт квитанцию: ``None`` — сообщение отправлено, иначе ошибка отправки."""
+
+        try:
+            await self.receipt
+        except Exception as exc:
+            return exc
+        return None
 
 
 class ReminderService:
@@ -39,6 +67,8 @@ class ReminderService:
         users: UserRepository,
         renderer: ReminderRenderer,
         sender: SendCallback,
+        deliveries: DeliveryLedgerRepository | None = None,
+        log_writer: ReminderLogWriter | None = None,
     ) -> None:
         self.reminders = reminders
         self.rules = rules
@@ -46,11 +76,26 @@ class ReminderService:
         self.users = users
         self.renderer = renderer
         self.sender = sender
+        self.deliveries = deliveries
+        self.log_writer = log_writer
         self.scheduler = None
+        self.digest_keyboard: DigestKeyboard | None = None
+        self.digest_max_items = 20
+        # Поставленные в очередь сообщения: итог записывает settle_delivery
+        self.pending_deliveries: list[PendingDelivery] = []
 
     def attach_scheduler(self, scheduler) -> None:
         self.scheduler = scheduler
 
+    def enable_digest(self, keyboard: DigestKeyboard, max_items: int = 20) -> None:
+        """Сработавшие вместе напоминания одного пользователя уходят одним сообщением.
+
+        ``keyboard(user, reminders)`` строит кнопки действий по каждому пункту.
+        """
+
+        self.digest_keyboard = keyboard
+        self.digest_max_items = max(max_items, 1)
+
     async def create_reminder(self, user_id: int, payload: ReminderCreate) -> ReminderDTO:
         user = await self._get_user(user_id)
         rule = await self._prepare_rule(payload) if payload.repeat_kind != "none" else None
@@ -88,14 +133,26 @@ class ReminderService:
         if self.scheduler:
             self.scheduler.remove_reminder(reminder_id)
 
-    async def get_active_reminders(self) -> Iterable[Reminder]:
-        return await self.reminders.list_active()
+    async def iter_next_runs(self, until: datetime, batch_size: int) -> AsyncIterator[Sequence[tuple[int, datetime]]]:
+        async for batch in self.reminders.iter_next_runs(until, batch_size):
+            yield batch
+
+    async def list_upcoming(self, within: timedelta, limit: int = 100) -> list[ReminderDTO]:
+        """Ближайшие срабатывания всех пользователей — диапазонный запрос по ``next_run_at``."""
+
+        now = datetime.now(timezone.utc)
+        reminders = await self.reminders.list_upcoming(now, now + within, limit)
+        return [ReminderDTO.model_validate(r) for r in reminders]
+
+    async def compute_next_run(self, reminder: Reminder, after: Optional[datetime] = None) -> Optional[datetime]:
+        """Следующее срабатывание после текущего момента или после ``after``, если оно позже."""
 
-    async def compute_next_run(self, reminder: Reminder) -> Optional[datetime]:
-        if reminder.status != ReminderStatus.ACTIVE:
+        if reminder.status == ReminderStatus.CLOSED:
             return None
         tz = ZoneInfo(reminder.user.timezone)
         now = datetime.now(tz=tz)
+        if after is not None and after > now:
+            now = after.astimezone(tz)
         snooze = self._ensure_tz(reminder.snooze_until, tz) if reminder.snooze_until else None
         scheduled = self._ensure_tz(reminder.scheduled_at, tz)
         if snooze and snooze > now:
@@ -119,65 +176,258 @@ class ReminderService:
         reminder = await self._require_reminder(reminder_id)
         reminder.status = ReminderStatus.CLOSED
         reminder.snooze_until = None
+        reminder.next_run_at = None
         if self.scheduler:
             self.scheduler.remove_reminder(reminder_id)
         return ReminderDTO.model_validate(reminder)
 
     async def process_and_reschedule(self, reminder_id: int) -> None:
         reminder = await self._require_reminder(reminder_id)
-        user = reminder.user
-        tz = ZoneInfo(user.timezone)
-        now = datetime.now(tz=tz)
-        if reminder.status == ReminderStatus.CLOSED:
-            logger.info("Напоминание %s закрыто, пропускаем", reminder_id)
-            if self.scheduler:
-                self.scheduler.remove_reminder(reminder_id)
-            return
+        if reminder.status != ReminderStatus.CLOSED:
+            await self._process_batch([reminder], {})
+
+    async def process_due(self, due: Mapping[int, datetime] | Sequence[int]) -> int:
+        """Обрабатывает пачку сработавших напоминаний, загруженных одним запросом.
+
+        ``due`` — id напоминаний или ``{id: срабатывание}`` из очереди
+        планировщика; срабатывание служит ключом журнала доставки. Для id
+        без срабатывания берётся последнее наступившее по правилу.
+        """
+
+        occurrences = dict(due) if isinstance(due, Mapping) else {}
+        reminders = await self.reminders.list_due(list(due))
+        await self._process_batch(reminders, occurrences)
+        return len(reminders)
+
+    async def _process_batch(self, reminders: Sequence[Reminder], occurrences: Mapping[int, datetime]) -> None:
+        ready = [reminder for reminder in reminders if await self._ready_to_send(reminder)]
+        if self.digest_keyboard is not None:
+            ready = self._defer_unpaired_early(ready, occurrences)
+        if self.deliveries is None:
+            claims: dict[int, Optional[int]] = {reminder.id: None for reminder in ready}
+        else:
+            claims = await self.deliveries.claim(
+                {reminder.id: occurrences.get(reminder.id) or self._due_occurrence(reminder) for reminder in ready}
+            )
+            # Заявку фиксируем до отправки: конкурирующие диспетчеры должны её увидеть
+            await self.deliveries.session.commit()
+        claimed: list[Reminder] = []
+        for reminder in ready:
+            if reminder.id in claims:
+                claimed.append(reminder)
+            else:
+                logger.info("Срабатывание напоминания %s уже обработано другим диспетчером", reminder.id)
+        sent: list[int] = []
+        failed: list[int] = []
+        for group in self._delivery_groups(claimed):
+            receipt = await self._submit(group)
+            ledger_ids = [claims[reminder.id] for reminder in group if claims[reminder.id] is not None]
+            if receipt is None or isinstance(receipt, Exception):
+                if receipt is None:
+                    self._mark_delivered(group)
+                await self._record_outcome(group, receipt)
+                (sent if receipt is None else failed).extend(ledger_ids)
+            else:
+                # Квитанцию не ждём: пачка не должна стоять за лимитом отправки одного чата.
+                # До итога сообщение считается отправленным, неудачу переносит settle_delivery
+                self._mark_delivered(group)
+                self.pending_deliveries.append(PendingDelivery([reminder.id for reminder in group], ledger_ids, receipt))
+        for reminder in ready:
+            # Подтянутое окном дайджеста срабатывание уже отправлено: следующее ищем после него
+            await self._schedule_next(reminder, after=occurrences.get(reminder.id))
+        if self.deliveries is not None:
+            await self.deliveries.mark(sent, DeliveryStatus.SENT)
+            await self.deliveries.mark(failed, DeliveryStatus.FAILED)
+
+    async def settle_delivery(self, pending: PendingDelivery, error: Optional[BaseException]) -> None:
+        """Записывает итог сообщения из очереди, когда тот стал известен.
+
+        Вызывается в новой сессии: пачка, поставившая сообщение в очередь,
+        к этому времени уже зафиксирована.
+        """
+
+        reminders = await self.reminders.list_by_ids(pending.reminder_ids)
+        if reminders:
+            await self._record_outcome(reminders, error)
+            if error is not None:
+                for reminder in reminders:
+                    await self._schedule_next(reminder)
+        if self.deliveries is not None:
+            await self.deliveries.mark(pending.ledger_ids, DeliveryStatus.FAILED if error else DeliveryStatus.SENT)
+
+    async def _ready_to_send(self, reminder: Reminder) -> bool:
+        """Переносит попавшие в тихие часы; закрытые отсекает ещё ``list_due``."""
 
+        user = reminder.user
+        now = datetime.now(tz=ZoneInfo(user.timezone))
         if self._is_quiet_time(user, now):
             logger.info("Пользователь %s в тихих часах, переносим", user.id)
-            next_time = self._end_of_quiet(now, user)
-            reminder.snooze_until = next_time
+            reminder.snooze_until = self._end_of_quiet(now, user)
             reminder.status = ReminderStatus.SNOOZED
             await self._schedule_next(reminder)
-            return
+            return False
+        return True
 
+    def _defer_unpaired_early(
+        self,
+        ready: Sequence[Reminder],
+        occurrences: Mapping[int, datetime],
+    ) -> list[Reminder]:
+        """Возвращает в очередь срабатывания из будущего, которым не с чем объединиться.
+
+        Планировщик в режиме дайджеста снимает таймеры на окно вперёд. Если у
+        пользователя в пачке нет срабатывания, наступившего сейчас, раньше
+        срока его напоминание не отправляется.
+        """
+
+        now = datetime.now(timezone.utc)
+
+        def early(reminder: Reminder) -> bool:
+            occurrence = occurrences.get(reminder.id)
+            return occurrence is not None and occurrence > now
+
+        users_due_now = {reminder.user_id for reminder in ready if not early(reminder)}
+        kept: list[Reminder] = []
+        for reminder in ready:
+            if early(reminder) and reminder.user_id not in users_due_now:
+                if self.scheduler:
+                    self.scheduler.schedule_reminder(reminder.id, occurrences[reminder.id])
+                continue
+            kept.append(reminder)
+        return kept
+
+    def _delivery_groups(self, reminders: Sequence[Reminder]) -> list[list[Reminder]]:
+        """По сообщению на напоминание или, в режиме дайджеста, на пользователя."""
+
+        if self.digest_keyboard is None:
+            return [[reminder] for reminder in reminders]
+        by_user: dict[int, list[Reminder]] = {}
+        for reminder in reminders:
+            by_user.setdefault(reminder.user_id, []).append(reminder)
+        size = self.digest_max_items
+        return [items[start : start + size] for items in by_user.values() for start in range(0, len(items), size)]
+
+    async def _submit(self, group: Sequence[Reminder]) -> Optional[Awaitable[None]] | Exception:
+        """Отдаёт отправителю одно напоминание или дайджест; ошибка возвращается, а не бросается."""
+
+        user = group[0].user
         try:
-            message = self.renderer.render_reminder(reminder)
-            await self.sender(user.telegram_id, message)
+            if len(group) == 1:
+                return await self.sender(user.telegram_id, self.renderer.render_reminder(group[0]))
+            message = self.renderer.render_digest(group, user.language, user.timezone)
+            return await self.sender(user.telegram_id, message, reply_markup=self.digest_keyboard(user, group))
+        except Exception as exc:
+            return exc
+
+    @staticmethod
+    def _mark_delivered(group: Sequence[Reminder]) -> None:
+        for reminder in group:
             reminder.status = ReminderStatus.ACTIVE
             reminder.snooze_until = None
-            await self.logs.add(
-                ReminderLog(
-                    reminder_id=reminder.id,
-                    scheduled_for=self._ensure_tz(reminder.scheduled_at, tz),
-                    processed_at=now,
-                    status=ReminderEventStatus.SENT,
-                )
-            )
-        except Exception as exc:  # pragma: no cover - критично логируем
-            logger.exception("Ошибка отправки напоминания")
-            await self.logs.add(
-                ReminderLog(
-                    reminder_id=reminder.id,
-                    scheduled_for=self._ensure_tz(reminder.scheduled_at, tz),
-                    processed_at=now,
-                    status=ReminderEventStatus.FAILED,
-                    error_message=str(exc),
-                )
+
+    async def _record_outcome(self, group: Sequence[Reminder], error: Optional[BaseException]) -> None:
+        """Журнал по фактическому итогу; неотправленное повторяется через 5 минут."""
+
+        user = group[0].user
+        tz = ZoneInfo(user.timezone)
+        now = datetime.now(tz=tz)
+        if error is not None:
+            logger.error(
+                "Ошибка отправки напоминаний %s пользователю %s",
+                [reminder.id for reminder in group],
+                user.id,
+                exc_info=error,
             )
-            reminder.snooze_until = now + timedelta(minutes=5)
-        finally:
-            await self._schedule_next(reminder)
+            logs = [self._log_entry(reminder, tz, now, ReminderEventStatus.FAILED, str(error)) for reminder in group]
+            for reminder in group:
+                if reminder.status != ReminderStatus.CLOSED:
+                    reminder.snooze_until = now + timedelta(minutes=5)
+        else:
+            logs = [self._log_entry(reminder, tz, now, ReminderEventStatus.SENT) for reminder in group]
+        await (self._write_log(logs[0]) if len(logs) == 1 else self._write_logs(logs))
+
+    def _log_entry(
+        self,
+        reminder: Reminder,
+        tz: ZoneInfo,
+        now: datetime,
+        status: ReminderEventStatus,
+        error: Optional[str] = None,
+    ) -> ReminderLog:
+        return ReminderLog(
+            reminder_id=reminder.id,
+            scheduled_for=self._ensure_tz(reminder.scheduled_at, tz),
+            processed_at=now,
+            status=status,
+            error_message=error,
+        )
+
+    async def _write_log(self, log: ReminderLog) -> None:
+        # С буферизованным журналом запись не стоит отдельного INSERT на каждое сообщение
+        if self.log_writer is not None:
+            await self.log_writer.add(log)
+        else:
+            await self.logs.add(log)
+
+    async def _write_logs(self, logs: Sequence[ReminderLog]) -> None:
+        if self.log_writer is not None:
+            for log in logs:
+                await self.log_writer.add(log)
+            return
+        await self.logs.add_many(
+            [
+                {
+                    "reminder_id": log.reminder_id,
+                    "scheduled_for": log.scheduled_for,
+                    "processed_at": log.processed_at,
+                    "status": log.status,
+                    "error_message": log.error_message,
+                }
+                for log in logs
+            ]
+        )
+
+    def _due_occurrence(self, reminder: Reminder) -> datetime:
+        """Наступившее срабатывание, когда планировщик его не передал (ручной запуск)."""
+
+        tz = ZoneInfo(reminder.user.timezone)
+        now = datetime.now(tz=tz)
+        snooze = self._ensure_tz(reminder.snooze_until, tz)
+        if snooze is not None and snooze <= now:
+            return snooze
+        scheduled = self._ensure_tz(reminder.scheduled_at, tz)
+        return last_occurrence(scheduled, reminder.rule, tz, now) or scheduled
 
     async def list_user_reminders(self, user_id: int) -> Iterable[ReminderDTO]:
         reminders = await self.reminders.list_for_user(user_id)
         return [ReminderDTO.model_validate(r) for r in reminders]
 
-    async def _schedule_next(self, reminder: Reminder) -> None:
+    async def list_user_page(
+        self,
+        user_id: int,
+        *,
+        after: Optional[int] = None,
+        before: Optional[int] = None,
+        limit: int = 10,
+    ) -> ReminderPage:
+        """Страница списка для бота; при устаревшем курсоре — первая страница."""
+
+        page = await self.reminders.page_for_user(user_id, after=after, before=before, limit=limit)
+        if not page.items and (after is not None or before is not None):
+            page = await self.reminders.page_for_user(user_id, limit=limit)
+        return page
+
+    async def get_user_reminder(self, user_id: int, reminder_id: int) -> Optional[Reminder]:
+        reminder = await self.reminders.get_by_id(reminder_id)
+        if reminder is None or reminder.user_id != user_id:
+            return None
+        return reminder
+
+    async def _schedule_next(self, reminder: Reminder, after: Optional[datetime] = None) -> None:
+        next_run = await self.compute_next_run(reminder, after)
+        reminder.next_run_at = next_run.astimezone(timezone.utc) if next_run else None
         if not self.scheduler:
             return
-        next_run = await self.compute_next_run(reminder)
         if next_run:
             self.scheduler.schedule_reminder(reminder.id, next_run)
         else:
@@ -274,76 +524,15 @@ class ReminderService:
         base = self._ensure_tz(reminder.scheduled_at, ZoneInfo(reminder.user.timezone))
         if base is None:
             return None
-        if rule.kind == RepeatKind.DAILY:
-            next_time = base
-            while next_time <= reference:
-                next_time += timedelta(days=rule.interval)
-            return next_time
-        if rule.kind == RepeatKind.WEEKLY:
-            weekdays = rule.weekday_mask or [base.weekday()]
-            return self._next_weekly(reference, base, weekdays, rule.interval)
-        if rule.kind == RepeatKind.MONTHLY:
-            monthday = rule.monthday or base.day
-            return self._next_monthly(reference, base, monthday, rule.interval)
-        if rule.kind == RepeatKind.CUSTOM and rule.custom_interval_minutes:
-            next_time = base
-            delta = timedelta(minutes=rule.custom_interval_minutes)
-            while next_time <= reference:
-                next_time += delta
-            return next_time
-        return None
-
-    def _next_weekly(
-        self,
-        reference: datetime,
-        base: datetime,
-        weekdays: list[int],
-        interval: int,
-    ) -> datetime:
-        weekdays = sorted(set(weekdays))
-        candidate = base
-        while candidate <= reference:
-            for weekday in weekdays:
-                delta_days = (weekday - candidate.weekday()) % 7
-                test = candidate + timedelta(days=delta_days)
-                test = test.replace(
-                    hour=base.hour,
-                    minute=base.minute,
-                    second=base.second,
-                    microsecond=0,
-                )
-                if test > reference:
-                    return test
-            candidate += timedelta(days=7 * interval)
-        return candidate
-
-    def _next_monthly(
-        self,
-        reference: datetime,
-        base: datetime,
-        monthday: int,
-        interval: int,
-    ) -> datetime:
-        year = base.year
-        month = base.month
-        candidate = base
-        while candidate <= reference:
-            month += interval
-            year += (month - 1) // 12
-            month = ((month - 1) % 12) + 1
-            day = min(monthday, self._days_in_month(year, month))
-            candidate = candidate.replace(year=year, month=month, day=day)
-        return candidate
-
-    @staticmethod
-    def _days_in_month(year: int, month: int) -> int:
-        if month == 2:
-            if year % 4 == 0 and (year % 100 != 0 or year % 400 == 0):
-                return 29
-            return 28
-        if month in {4, 6, 9, 11}:
-            return 30
-        return 31
+        return next_occurrence(
+            base,
+            reference,
+            rule.kind,
+            rule.interval,
+            rule.custom_interval_minutes,
+            rule.weekday_mask,
+            rule.monthday,
+        )
 
     def _is_quiet_time(self, user: User, now: datetime) -> bool:
         start = user.quiet_hours_start
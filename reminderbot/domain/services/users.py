@@ -4,15 +4,24 @@ from datetime import time
 from typing import Optional
 
 from reminderbot.domain.models import QuietHours, UserProfile
-from reminderbot.infrastructure.db.models import User
+from reminderbot.domain.profile_cache import ProfileCache
 from reminderbot.infrastructure.repos.users import UserRepository
 
 
 class UserService:
-    """Бизнес-логика, связанная с пользователями."""
+    """Бизнес-логика, связанная с пользователями.
 
-    def __init__(self, users: UserRepository) -> None:
+    Кэш профилей видит только зафиксированные данные: профиль, изменённый в
+    текущей транзакции, читается мимо кэша, а после коммита кладётся в кэш
+    или сбрасывается из него; откат изменения просто забывает.
+    """
+
+    def __init__(self, users: UserRepository, cache: ProfileCache | None = None) -> None:
         self.users = users
+        self.cache = cache
+        # telegram_id изменённых в транзакции профилей -> свежий профиль (None — перечитать после коммита)
+        self._uncommitted: dict[int, Optional[UserProfile]] = {}
+        self._watching = False
 
     async def get_or_create_user(
         self,
@@ -21,33 +30,24 @@ class UserService:
         username: Optional[str],
         language: Optional[str],
     ) -> UserProfile:
-        user = await self.users.get_by_telegram_id(telegram_id)
-        if user is None:
-            user = User(
-                telegram_id=telegram_id,
-                full_name=full_name,
-                username=username,
-                language=language or "ru",
-            )
-            await self.users.add(user)
-        else:
-            user.full_name = full_name or user.full_name
-            user.username = username or user.username
-            if language:
-                user.language = language
-        return UserProfile.model_validate(user)
+        user = await self.users.upsert_from_telegram(telegram_id, full_name, username, language)
+        profile = UserProfile.model_validate(user)
+        self._changed(profile.telegram_id, profile)
+        return profile
 
     async def update_language(self, user_id: int, language: str) -> None:
         user = await self.users.get(id=user_id)
         if not user:
             raise ValueError("Пользователь не найден")
         user.language = language
+        self._changed(user.telegram_id)
 
     async def update_timezone(self, user_id: int, timezone: str) -> None:
         user = await self.users.get(id=user_id)
         if not user:
             raise ValueError("Пользователь не найден")
         user.timezone = timezone
+        self._changed(user.telegram_id)
 
     async def update_quiet_hours(
         self,
@@ -60,6 +60,7 @@ class UserService:
             raise ValueError("Пользователь не найден")
         user.quiet_hours_start = quiet_start
         user.quiet_hours_end = quiet_end
+        self._changed(user.telegram_id)
         return QuietHours(start=quiet_start, end=quiet_end)
 
     async def set_active(self, user_id: int, active: bool) -> None:
@@ -67,9 +68,39 @@ class UserService:
         if not user:
             raise ValueError("Пользователь не найден")
         user.is_active = active
+        self._changed(user.telegram_id)
 
     async def get_profile(self, telegram_id: int) -> Optional[UserProfile]:
+        if self.cache is not None and telegram_id not in self._uncommitted:
+            cached = self.cache.get(telegram_id)
+            if cached is not None:
+                return cached
         user = await self.users.get_by_telegram_id(telegram_id)
         if user:
-            return UserProfile.model_validate(user)
+            return self._remember(UserProfile.model_validate(user))
         return None
+
+    def _remember(self, profile: UserProfile) -> UserProfile:
+        if self.cache is None:
+            return profile
+        if profile.telegram_id in self._uncommitted:
+            self._uncommitted[profile.telegram_id] = profile
+        else:
+            self.cache.put(profile)
+        return profile
+
+    def _changed(self, telegram_id: int, profile: Optional[UserProfile] = None) -> None:
+        if self.cache is None:
+            return
+        self._uncommitted[telegram_id] = profile
+        if not self._watching:
+            self.users.on_transaction_end(self._on_commit, self._uncommitted.clear)
+            self._watching = True
+
+    def _on_commit(self) -> None:
+        for telegram_id, profile in self._uncommitted.items():
+            if profile is None:
+                self.cache.invalidate(telegram_id)
+            else:
+                self.cache.put(profile)
+        self._uncommitted.clear()
@@ -1,20 +1,27 @@
 ﻿from __future__ import annotations
 
+from typing import Any, Awaitable, Optional
+
 from aiogram import Bot
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from reminderbot.app.keyboards.common import digest_keyboard
 from reminderbot.config import Settings
+from reminderbot.domain.profile_cache import ProfileCache
 from reminderbot.domain.services.reminders import ReminderService
 from reminderbot.domain.services.users import UserService
+from reminderbot.infrastructure.delivery.queue import DeliveryQueue
+from reminderbot.infrastructure.repos.deliveries import DeliveryLedgerRepository
+from reminderbot.infrastructure.repos.log_writer import ReminderLogWriter
 from reminderbot.infrastructure.repos.reminders import ReminderLogRepository, ReminderRepository
 from reminderbot.infrastructure.repos.rules import ReminderRuleRepository
 from reminderbot.infrastructure.repos.users import UserRepository
 from reminderbot.presentation.messages import ReminderRenderer
 
 
-def build_user_service(session: AsyncSession) -> UserService:
+def build_user_service(session: AsyncSession, profile_cache: ProfileCache | None = None) -> UserService:
     users_repo = UserRepository(session)
-    return UserService(users_repo)
+    return UserService(users_repo, profile_cache)
 
 
 def build_reminder_service(
@@ -22,14 +29,22 @@ def build_reminder_service(
     bot: Bot,
     renderer: ReminderRenderer,
     scheduler,
+    delivery: DeliveryQueue | None = None,
+    log_writer: ReminderLogWriter | None = None,
+    digest: bool = False,
+    digest_max_items: int = 20,
 ) -> ReminderService:
     users_repo = UserRepository(session)
     reminders_repo = ReminderRepository(session)
     rules_repo = ReminderRuleRepository(session)
     logs_repo = ReminderLogRepository(session)
+    deliveries_repo = DeliveryLedgerRepository(session)
 
-    async def sender(chat_id: int, text: str) -> None:
-        await bot.send_message(chat_id, text)
+    async def sender(chat_id: int, text: str, **kwargs: Any) -> Optional[Awaitable[None]]:
+        if delivery is not None:
+            return await delivery.enqueue(chat_id, text, **kwargs)
+        await bot.send_message(chat_id, text, **kwargs)
+        return None
 
     service = ReminderService(
         reminders_repo,
@@ -38,6 +53,13 @@ def build_reminder_service(
         users_repo,
         renderer,
         sender,
+        deliveries_repo,
+        log_writer,
     )
     service.attach_scheduler(scheduler)
+    if digest:
+        service.enable_digest(
+            lambda user, reminders: digest_keyboard(renderer.localizer, user.language, reminders),
+            digest_max_items,
+        )
     return service
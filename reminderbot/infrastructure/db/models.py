@@ -4,7 +4,7 @@ import enum
 from datetime import datetime, time
 from typing import List, Optional
 
-from sqlalchemy import Boolean, DateTime, Enum, ForeignKey, Integer, JSON, String, Time
+from sqlalchemy import BigInteger, Boolean, DateTime, Enum, ForeignKey, Index, Integer, JSON, String, Time, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base
@@ -22,6 +22,12 @@ class ReminderEventStatus(str, enum.Enum):
     FAILED = "failed"
 
 
+class DeliveryStatus(str, enum.Enum):
+    CLAIMED = "claimed"
+    SENT = "sent"
+    FAILED = "failed"
+
+
 class RepeatKind(str, enum.Enum):
     NONE = "none"
     DAILY = "daily"
@@ -31,7 +37,7 @@ class RepeatKind(str, enum.Enum):
 
 
 class User(Base):
-    telegram_id: Mapped[int] = mapped_column(Integer, unique=True, index=True)
+    telegram_id: Mapped[int] = mapped_column(BigInteger, unique=True, index=True)
     username: Mapped[str | None] = mapped_column(String(255), nullable=True)
     full_name: Mapped[str | None] = mapped_column(String(255), nullable=True)
     timezone: Mapped[str] = mapped_column(String(64), default="UTC")
@@ -58,6 +64,12 @@ class ReminderRule(Base):
 
 
 class Reminder(Base):
+    __table_args__ = (
+        # Лента пользователя по времени и выборка планировщика по сроку
+        Index("ix_reminder_user_id_scheduled_at", "user_id", "scheduled_at"),
+        Index("ix_reminder_next_run_at", "next_run_at"),
+    )
+
     user_id: Mapped[int] = mapped_column(ForeignKey("user.id", ondelete="CASCADE"))
     rule_id: Mapped[int | None] = mapped_column(ForeignKey("reminderrule.id", ondelete="SET NULL"))
     title: Mapped[str] = mapped_column(String(255))
@@ -65,6 +77,8 @@ class Reminder(Base):
     scheduled_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
     status: Mapped[ReminderStatus] = mapped_column(Enum(ReminderStatus), default=ReminderStatus.ACTIVE)
     snooze_until: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Ближайшее срабатывание в UTC; None — срабатываний больше нет. Поддерживает ReminderService
+    next_run_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
     user: Mapped[User] = relationship(back_populates="reminders")
     rule: Mapped[ReminderRule | None] = relationship(back_populates="reminders")
@@ -72,6 +86,8 @@ class Reminder(Base):
 
 
 class ReminderLog(Base):
+    __table_args__ = (Index("ix_reminderlog_reminder_id_scheduled_for", "reminder_id", "scheduled_for"),)
+
     reminder_id: Mapped[int] = mapped_column(ForeignKey("reminder.id", ondelete="CASCADE"))
     scheduled_for: Mapped[datetime] = mapped_column(DateTime(timezone=True))
     processed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -80,3 +96,34 @@ class ReminderLog(Base):
 
     reminder: Mapped[Reminder] = relationship(back_populates="logs")
 
+
+class ReminderDelivery(Base):
+    """Журнал доставки: не больше одной строки на срабатывание напоминания.
+
+    Строка вставляется до отправки; уникальный ключ
+    ``(reminder_id, occurrence_at)`` гарантирует, что одно срабатывание
+    отправит только один диспетчер.
+    """
+
+    __table_args__ = (
+        UniqueConstraint("reminder_id", "occurrence_at"),
+        # Для удаления строк старше срока хранения
+        Index("ix_reminderdelivery_occurrence_at", "occurrence_at"),
+    )
+
+    reminder_id: Mapped[int] = mapped_column(ForeignKey("reminder.id", ondelete="CASCADE"))
+    occurrence_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    status: Mapped[DeliveryStatus] = mapped_column(Enum(DeliveryStatus), default=DeliveryStatus.CLAIMED)
+
+
+class FsmRecord(Base):
+    """Состояние FSM-диалога: строка на ключ хранилища aiogram.
+
+    ``expires_at`` (UTC) продлевается при каждой записи; брошенные
+    диалоги после него считаются пустыми и удаляются фоновой чисткой.
+    """
+
+    key: Mapped[str] = mapped_column(String(255), unique=True)
+    state: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    data: Mapped[dict] = mapped_column(JSON, default=dict)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, index=True)
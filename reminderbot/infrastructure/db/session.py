@@ -2,10 +2,12 @@
 
 from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import AsyncIterator
+from typing import Any, AsyncIterator
 
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 
+from reminderbot.config import Settings
 from reminderbot.infrastructure.db import models  # noqa: F401  # импорт для регистрации
 
 
@@ -16,9 +18,78 @@ def _prepare_sqlite_path(database_url: str) -> None:
         db_path.parent.mkdir(parents=True, exist_ok=True)
 
 
-def create_engine(database_url: str) -> AsyncEngine:
+def create_engine(database_url: str, settings: Settings | None = None) -> AsyncEngine:
+    """Создаёт движок; для файловой SQLite с настройками включает рабочий профиль.
+
+    Профиль (``SQLITE_TUNED``): WAL, ``synchronous``, ``busy_timeout``, mmap и
+    кэш страниц на каждое соединение плюс пул соединений на процесс. В WAL
+    читатели не ждут писателя, а ``busy_timeout`` превращает
+    ``database is locked`` в ожидание, когда бот и веб пишут в один файл.
+    Для PostgreSQL (``postgresql+asyncpg://``) настраиваются пул и кэш
+    подготовленных выражений, см. ``postgres_options``.
+    """
+
     _prepare_sqlite_path(database_url)
-    return create_async_engine(database_url, future=True, echo=False)
+    options: dict[str, Any] = {}
+    tuned = settings is not None and settings.sqlite_tuned and _is_sqlite_file(database_url)
+    if tuned:
+        options.update(pool_size=settings.db_pool_size, max_overflow=settings.db_max_overflow)
+    elif settings is not None and _is_postgres(database_url):
+        options.update(postgres_options(settings))
+    engine = create_async_engine(database_url, future=True, echo=False, **options)
+    if tuned:
+        _apply_sqlite_pragmas(engine, sqlite_pragmas(settings))
+    return engine
+
+
+def sqlite_pragmas(settings: Settings) -> dict[str, Any]:
+    return {
+        "journal_mode": settings.sqlite_journal_mode,
+        "synchronous": settings.sqlite_synchronous,
+        "busy_timeout": settings.sqlite_busy_timeout_ms,
+        "mmap_size": settings.sqlite_mmap_size,
+        # Отрицательное значение — размер в КиБ, а не в страницах
+        "cache_size": -settings.sqlite_cache_size_kib,
+    }
+
+
+def postgres_options(settings: Settings) -> dict[str, Any]:
+    """Параметры движка для asyncpg: пул на процесс и кэши подготовленных выражений.
+
+    ``DB_STATEMENT_CACHE_SIZE=0`` отключает оба кэша (SQLAlchemy и asyncpg) —
+    это нужно за pgbouncer в режиме транзакций.
+    """
+
+    cache_size = settings.db_statement_cache_size
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+        "pool_pre_ping": True,
+        "connect_args": {
+            "prepared_statement_cache_size": cache_size,
+            "statement_cache_size": cache_size,
+        },
+    }
+
+
+def _apply_sqlite_pragmas(engine: AsyncEngine, pragmas: dict[str, Any]) -> None:
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def _is_sqlite_file(database_url: str) -> bool:
+    return database_url.startswith("sqlite") and ":memory:" not in database_url and "///" in database_url
+
+
+def _is_postgres(database_url: str) -> bool:
+    return database_url.startswith("postgresql")
 
 
 def create_session_factory(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
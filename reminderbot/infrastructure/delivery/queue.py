@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from aiogram import Bot
+from aiogram.exceptions import (
+    TelegramNetworkError,
+    TelegramRetryAfter,
+    TelegramServerError,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Token bucket с резервированием.
+
+    ``reserve()`` списывает токен сразу (баланс может уйти в минус) и
+    возвращает, сколько секунд нужно подождать до его появления. Так
+    очередь запросов к одному bucket сама выстраивается по времени.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0, clock: Callable[[], float] = time.monotonic) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = capacity
+        self._updated = clock()
+
+    def reserve(self) -> float:
+        self._refill()
+        self._tokens -= 1
+        if self._tokens >= 0:
+            return 0.0
+        return -self._tokens / self.rate
+
+    async def acquire(self) -> None:
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def is_idle(self) -> bool:
+        self._refill()
+        return self._tokens >= self.capacity
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+class DeliveryError(Exception):
+    """Сообщение не отправлено: очередь остановлена раньше, чем до него дошла очередь."""
+
+
+@dataclass
+class OutgoingMessage:
+    chat_id: int
+    text: str
+    kwargs: dict[str, Any] = field(default_factory=dict)
+    receipt: asyncio.Future[None] | None = None
+
+
+class DeliveryQueue:
+    """Асинхронная очередь исходящих сообщений с учётом лимитов Telegram.
+
+    Глобальный bucket ограничивает общий темп (~30 сообщений/с), bucket на
+    каждый чат — темп в один чат (~1 сообщение/с). У каждого чата своя
+    очередь, и в работе у воркеров не больше одного его сообщения, поэтому
+    сообщения одного чата уходят строго в порядке постановки, даже если
+    предыдущее ждёт повтора. ``TelegramRetryAfter`` приостанавливает все
+    воркеры на указанное Telegram время.
+
+    ``enqueue`` возвращает квитанцию — future, который завершается после
+    отправки или получает её ошибку.
+    """
+
+    # Сколько per-chat bucket'ов держим, прежде чем вычищать простаивающие
+    _CHAT_BUCKETS_SOFT_LIMIT = 10_000
+
+    def __init__(
+        self,
+        bot: Bot,
+        *,
+        workers: int = 4,
+        global_rate: float = 30.0,
+        chat_rate: float = 1.0,
+        max_pending: int = 10_000,
+        max_retries: int = 3,
+    ) -> None:
+        self.bot = bot
+        self.workers = workers
+        self.chat_rate = chat_rate
+        self.max_retries = max_retries
+        self._global = TokenBucket(global_rate, capacity=global_rate)
+        self._chats: dict[int, TokenBucket] = {}
+        # Очередь сообщений на каждый чат; id чата в _ready бывает не более одного раза
+        self._lanes: dict[int, deque[OutgoingMessage]] = {}
+        self._ready: asyncio.Queue[int] = asyncio.Queue()
+        self._receipts: set[asyncio.Future[None]] = set()
+        self._slots = asyncio.Semaphore(max_pending)
+        self._pending = 0
+        self._drained = asyncio.Event()
+        self._drained.set()
+        self._paused_until = 0.0
+        self._tasks: list[asyncio.Task] = []
+        self._closed = False
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        logger.info("Запуск очереди доставки (%s воркеров)", self.workers)
+        self._closed = False
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"delivery-worker:{index}")
+            for index in range(self.workers)
+        ]
+
+    async def close(self, timeout: float = 10.0) -> None:
+        """Перестаёт принимать сообщения и дожидается отправки уже принятых.
+
+        Не отправленные за ``timeout`` сообщения получают в квитанцию
+        ``DeliveryError``.
+        """
+
+        self._closed = True
+        try:
+            await asyncio.wait_for(self._drained.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Очередь доставки закрыта, не отправлено сообщений: %s", self._pending)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for receipt in list(self._receipts):
+            if not receipt.done():
+                receipt.set_exception(DeliveryError("Очередь доставки остановлена до отправки"))
+        self._lanes.clear()
+
+    async def enqueue(self, chat_id: int, text: str, **kwargs: Any) -> asyncio.Future[None]:
+        """Ставит сообщение в очередь; ждёт только при переполнении очереди."""
+
+        if self._closed:
+            raise RuntimeError("Очередь доставки закрыта")
+        await self._slots.acquire()
+        self._pending += 1
+        self._drained.clear()
+        receipt: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._receipts.add(receipt)
+        receipt.add_done_callback(self._receipts.discard)
+        message = OutgoingMessage(chat_id, text, kwargs, receipt)
+        lane = self._lanes.get(chat_id)
+        if lane is None:
+            self._lanes[chat_id] = deque([message])
+            self._schedule_lane(chat_id)
+        else:
+            lane.append(message)
+        return receipt
+
+    def _schedule_lane(self, chat_id: int) -> None:
+        """Отдаёт чат воркерам, как только его bucket разрешит следующее сообщение."""
+
+        delay = self._chat_bucket(chat_id).reserve()
+        if delay > 0:
+            asyncio.get_running_loop().call_later(delay, self._ready.put_nowait, chat_id)
+        else:
+            self._ready.put_nowait(chat_id)
+
+    def _chat_bucket(self, chat_id: int) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if len(self._chats) >= self._CHAT_BUCKETS_SOFT_LIMIT:
+                self._chats = {key: b for key, b in self._chats.items() if not b.is_idle()}
+            bucket = self._chats[chat_id] = TokenBucket(self.chat_rate)
+        return bucket
+
+    async def _worker(self) -> None:
+        while True:
+            chat_id = await self._ready.get()
+            lane = self._lanes.get(chat_id)
+            if not lane:
+                continue
+            message = lane[0]
+            try:
+                await self._deliver(message)
+            except Exception as exc:
+                _resolve(message.receipt, exc)
+            else:
+                _resolve(message.receipt)
+            finally:
+                # Сообщение снимается с очереди чата только после отправки: следующее его не обгонит
+                lane.popleft()
+                if lane:
+                    self._schedule_lane(chat_id)
+                else:
+                    del self._lanes[chat_id]
+                self._pending -= 1
+                self._slots.release()
+                if not self._pending:
+                    self._drained.set()
+
+    async def _deliver(self, message: OutgoingMessage) -> None:
+        """Отправляет сообщение; ошибка, после которой повторять бессмысленно, пробрасывается."""
+
+        attempt = 0
+        while True:
+            await self._wait_pause()
+            await self._global.acquire()
+            try:
+                await self.bot.send_message(message.chat_id, message.text, **message.kwargs)
+                return
+            except TelegramRetryAfter as exc:
+                # Flood control не считаем неудачной попыткой: просто ждём, сколько сказал Telegram
+                logger.warning("Flood control Telegram, пауза %s с", exc.retry_after)
+                self._paused_until = max(self._paused_until, time.monotonic() + exc.retry_after)
+            except (TelegramNetworkError, TelegramServerError):
+                attempt += 1
+                logger.warning("Сбой сети при отправке в чат %s, попытка %s", message.chat_id, attempt)
+                if attempt >= self.max_retries:
+                    raise
+                await asyncio.sleep(min(2**attempt, 30))
+
+    async def _wait_pause(self) -> None:
+        delay = self._paused_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def _resolve(receipt: asyncio.Future[None] | None, error: BaseException | None = None) -> None:
+    if receipt is None or receipt.done():
+        return
+    if error is not None:
+        receipt.set_exception(error)
+    else:
+        receipt.set_result(None)
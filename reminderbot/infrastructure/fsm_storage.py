@@ -0,0 +1,208 @@
+﻿from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable, Mapping, Optional
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, DefaultKeyBuilder, StateType, StorageKey
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from reminderbot.infrastructure.repos.fsm import FsmRecordRepository
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Entry:
+    state: Optional[str] = None
+    data: dict[str, Any] = field(default_factory=dict)
+    expires_at: datetime = datetime.min
+    loaded_at: float = 0.0
+
+
+class DatabaseStorage(BaseStorage):
+    """FSM-хранилище aiogram в общей БД с LRU-кэшем записи в памяти.
+
+    Чтение идёт из кэша, пока запись моложе ``cache_ttl`` секунд; запись
+    меняет только кэш и помечает ключ, а фоновая задача раз в
+    ``flush_interval`` секунд сохраняет изменённые ключи одним upsert. При
+    ``flush_interval <= 0`` запись сразу уходит в БД. Состояние живёт
+    ``state_ttl`` с последней записи — брошенные диалоги считаются пустыми
+    и раз в ``purge_interval`` секунд удаляются из таблицы.
+
+    Несколько воркеров делят состояние через БД; без привязки чата к
+    воркеру задайте ``cache_ttl=0`` и ``flush_interval=0``, чтобы каждый
+    апдейт видел запись предыдущего.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        *,
+        cache_size: int = 10_000,
+        cache_ttl: float = 30.0,
+        flush_interval: float = 0.2,
+        state_ttl: timedelta = timedelta(hours=24),
+        purge_interval: float = 600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.session_factory = session_factory
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self.flush_interval = flush_interval
+        self.state_ttl = state_ttl
+        self.purge_interval = purge_interval
+        self._clock = clock
+        self._key_builder = DefaultKeyBuilder(with_bot_id=True, with_business_connection_id=True, with_destiny=True)
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._dirty: set[str] = set()
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._closed = False
+
+    @property
+    def pending(self) -> int:
+        return len(self._dirty)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._closed = False
+            self._task = asyncio.create_task(self._run(), name="fsm-storage-writer")
+
+    async def close(self) -> None:
+        """Останавливает фоновую запись и сохраняет все изменения."""
+
+        self._closed = True
+        self._wakeup.set()
+        if self._task is not None:
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        entry = await self._load(key)
+        entry.state = state.state if isinstance(state, State) else state
+        await self._touch(key, entry)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        return (await self._load(key)).state
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        entry = await self._load(key)
+        entry.data = dict(data)
+        await self._touch(key, entry)
+
+    async def get_data(self, key: StorageKey) -> dict[str, Any]:
+        return (await self._load(key)).data.copy()
+
+    async def flush(self) -> None:
+        """Сохраняет изменённые ключи: пустые состояния удаляются, остальные — upsert."""
+
+        async with self._flush_lock:
+            if not self._dirty:
+                return
+            keys, self._dirty = self._dirty, set()
+            now = datetime.utcnow()
+            rows = []
+            empty = []
+            for name in keys:
+                entry = self._entries[name]
+                if entry.state is None and not entry.data:
+                    empty.append(name)
+                else:
+                    rows.append(
+                        {"key": name, "state": entry.state, "data": entry.data, "expires_at": entry.expires_at, "updated_at": now}
+                    )
+            try:
+                async with self.session_factory() as session:
+                    repo = FsmRecordRepository(session)
+                    await repo.save_many(rows)
+                    await repo.delete_keys(empty)
+                    await session.commit()
+            except Exception:
+                logger.exception("Не удалось сохранить состояние FSM для %s ключей", len(keys))
+                # Ключи остаются помеченными и уйдут со следующей записью
+                self._dirty |= keys
+            self._evict()
+
+    async def purge(self) -> int:
+        """Удаляет из БД просроченные состояния брошенных диалогов."""
+
+        async with self.session_factory() as session:
+            removed = await FsmRecordRepository(session).purge_expired(datetime.utcnow())
+            await session.commit()
+        return removed
+
+    async def _load(self, key: StorageKey) -> _Entry:
+        name = self._key_builder.build(key)
+        entry = self._entries.get(name)
+        if entry is not None and (name in self._dirty or self._clock() - entry.loaded_at < self.cache_ttl):
+            self._entries.move_to_end(name)
+            return self._live(entry)
+        now = datetime.utcnow()
+        async with self.session_factory() as session:
+            record = await FsmRecordRepository(session).get_live(name, now)
+        # Пока шёл запрос, ключ мог изменить другой апдейт: его запись свежее
+        if name in self._dirty:
+            return self._live(self._entries[name])
+        if record is None:
+            entry = _Entry(loaded_at=self._clock())
+        else:
+            entry = _Entry(record.state, dict(record.data or {}), record.expires_at, self._clock())
+        self._entries[name] = entry
+        self._entries.move_to_end(name)
+        self._evict()
+        return entry
+
+    def _live(self, entry: _Entry) -> _Entry:
+        if (entry.state is not None or entry.data) and entry.expires_at <= datetime.utcnow():
+            entry.state, entry.data = None, {}
+        return entry
+
+    async def _touch(self, key: StorageKey, entry: _Entry) -> None:
+        name = self._key_builder.build(key)
+        entry.expires_at = datetime.utcnow() + self.state_ttl
+        entry.loaded_at = self._clock()
+        self._entries[name] = entry
+        self._dirty.add(name)
+        if self.flush_interval <= 0:
+            await self.flush()
+
+    def _evict(self) -> None:
+        """Вытесняет давно не читанные ключи; несохранённые остаются до записи."""
+
+        excess = len(self._entries) - self.cache_size
+        if excess <= 0:
+            return
+        victims = []
+        for name in self._entries:
+            if name not in self._dirty:
+                victims.append(name)
+                if len(victims) == excess:
+                    break
+        for name in victims:
+            del self._entries[name]
+
+    async def _run(self) -> None:
+        last_purge = self._clock()
+        # В режиме сквозной записи задача нужна только для чистки
+        timeout = self.flush_interval if self.flush_interval > 0 else self.purge_interval
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+            if self._clock() - last_purge >= self.purge_interval:
+                last_purge = self._clock()
+                try:
+                    await self.purge()
+                except Exception:
+                    logger.exception("Не удалось удалить просроченные состояния FSM")
@@ -1,15 +1,22 @@
 ﻿from __future__ import annotations
 
-from typing import Generic, Iterable, Optional, TypeVar
+from typing import Any, AsyncIterator, Callable, Generic, Iterable, Mapping, Optional, Sequence, TypeVar
 
-from sqlalchemy import select
+from sqlalchemy import delete, event, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
 
 T = TypeVar("T")
 
+Row = Mapping[str, Any]
+
 
 class SQLAlchemyRepository(Generic[T]):
-    """Базовый репозиторий для асинхронной работы с SQLAlchemy."""
+    """Базовый репозиторий для асинхронной работы с SQLAlchemy.
+
+    Кроме поштучных ``add``/``get``/``delete`` даёт множественные операции,
+    которые выполняются одним выражением на пачку, без ORM-объектов на строку.
+    """
 
     model: type[T]
 
@@ -33,3 +40,97 @@ class SQLAlchemyRepository(Generic[T]):
 
     async def delete(self, instance: T) -> None:
         await self.session.delete(instance)
+
+    async def add_many(self, rows: Sequence[Row]) -> list[int]:
+        """Вставляет словари колонок пачкой и возвращает id в порядке ``rows``."""
+
+        if not rows:
+            return []
+        stmt = insert(self.model).returning(self.model.id, sort_by_parameter_order=True)
+        result = await self.session.scalars(stmt, list(rows))
+        return list(result.all())
+
+    async def bulk_update(self, rows: Sequence[Row]) -> None:
+        """Обновляет строки по первичному ключу: в каждом словаре есть ``id``."""
+
+        if rows:
+            await self.session.execute(update(self.model), list(rows))
+
+    async def upsert(
+        self,
+        rows: Sequence[Row],
+        index_elements: Sequence[str],
+        update_columns: Optional[Sequence[str]] = None,
+    ) -> list[T]:
+        """``INSERT ... ON CONFLICT`` по уникальному ключу ``index_elements``.
+
+        Конфликтующие строки получают значения ``update_columns`` (по умолчанию
+        все переданные колонки, кроме ключа); пустой список — ``DO NOTHING``.
+        Возвращает вставленные и обновлённые объекты, уже загруженные в сессию.
+        """
+
+        if not rows:
+            return []
+        stmt = self._insert().values(list(rows))
+        if update_columns is None:
+            update_columns = [column for column in rows[0] if column not in index_elements]
+        if update_columns:
+            values = {column: stmt.excluded[column] for column in update_columns}
+            if "updated_at" in self.model.__table__.c and "updated_at" not in values:
+                values["updated_at"] = stmt.excluded.updated_at
+            stmt = stmt.on_conflict_do_update(index_elements=list(index_elements), set_=values)
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=list(index_elements))
+        result = await self.session.scalars(
+            stmt.returning(self.model), execution_options={"populate_existing": True}
+        )
+        return list(result.all())
+
+    async def delete_where(self, *criteria: Any, **filters: Any) -> int:
+        """Удаляет строки одним ``DELETE`` и возвращает их число."""
+
+        stmt = delete(self.model).where(*criteria).filter_by(**filters)
+        result = await self.session.execute(stmt, execution_options={"synchronize_session": False})
+        return result.rowcount
+
+    async def iter_where(
+        self,
+        *criteria: Any,
+        batch_size: int = 1000,
+        order_by: Sequence[Any] = (),
+        options: Sequence[Any] = (),
+        **filters: Any,
+    ) -> AsyncIterator[Sequence[T]]:
+        """Потоково отдаёт объекты, подходящие под условия, пачками по batch_size."""
+
+        stmt = (
+            select(self.model)
+            .options(*options)
+            .where(*criteria)
+            .filter_by(**filters)
+            .order_by(*order_by)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await self.session.stream(stmt)
+        async for partition in result.scalars().partitions():
+            yield partition
+
+    def on_transaction_end(self, committed: Callable[[], None], rolled_back: Callable[[], None]) -> None:
+        """Подписывает колбэки на каждый коммит и откат транзакции сессии репозитория."""
+
+        sync_session = self.session.sync_session
+        event.listen(sync_session, "after_commit", lambda session: committed())
+        event.listen(sync_session, "after_rollback", lambda session: rolled_back())
+
+    @property
+    def supports_upsert(self) -> bool:
+        """``ON CONFLICT ... RETURNING`` доступен: PostgreSQL или SQLite 3.35+."""
+
+        return self.session.get_bind().dialect.insert_returning
+
+    def _insert(self):
+        """``INSERT`` диалекта текущего соединения — с поддержкой ``ON CONFLICT``."""
+
+        if self.session.get_bind().dialect.name == "postgresql":
+            return postgresql.insert(self.model)
+        return sqlite.insert(self.model)
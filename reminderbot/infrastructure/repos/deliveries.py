@@ -0,0 +1,75 @@
+﻿from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Iterable, Mapping
+
+from sqlalchemy import update
+
+from reminderbot.infrastructure.db.models import DeliveryStatus, ReminderDelivery
+
+from .base import SQLAlchemyRepository
+
+
+class DeliveryLedgerRepository(SQLAlchemyRepository[ReminderDelivery]):
+    model = ReminderDelivery
+
+    async def claim(self, occurrences: Mapping[int, datetime]) -> dict[int, int]:
+        """Застолбить срабатывания перед отправкой.
+
+        Одна вставка ``ON CONFLICT DO NOTHING ... RETURNING`` на всю пачку:
+        возвращаются только строки, которые вставил этот вызов, — их и
+        можно отправлять. Фиксирует заявку вызывающий (диспетчер) — до
+        отправки, чтобы конкурирующие диспетчеры увидели её.
+        Результат — ``{reminder_id: id строки журнала}``.
+        """
+
+        if not occurrences:
+            return {}
+        now = _utc_now()
+        rows = [
+            {
+                "reminder_id": reminder_id,
+                "occurrence_at": occurrence_key(occurrence),
+                "status": DeliveryStatus.CLAIMED,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for reminder_id, occurrence in occurrences.items()
+        ]
+        stmt = (
+            self._insert()
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=["reminder_id", "occurrence_at"])
+            .returning(ReminderDelivery.reminder_id, ReminderDelivery.id)
+        )
+        result = await self.session.execute(stmt)
+        return {reminder_id: ledger_id for reminder_id, ledger_id in result.all()}
+
+    async def mark(self, ledger_ids: Iterable[int], status: DeliveryStatus) -> None:
+        ids = list(ledger_ids)
+        if not ids:
+            return
+        stmt = (
+            update(ReminderDelivery)
+            .where(ReminderDelivery.id.in_(ids))
+            .values(status=status, updated_at=_utc_now())
+        )
+        await self.session.execute(stmt)
+
+    async def purge_before(self, cutoff: datetime) -> int:
+        """Удаляет строки о срабатываниях раньше ``cutoff``; возвращает их число."""
+
+        return await self.delete_where(ReminderDelivery.occurrence_at < occurrence_key(cutoff))
+
+
+def _utc_now() -> datetime:
+    # created_at/updated_at — DateTime без зоны, в них хранится UTC
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def occurrence_key(occurrence: datetime) -> datetime:
+    """Ключ срабатывания в UTC (наивное время считается UTC): SQLite хранит DateTime без зоны."""
+
+    if occurrence.tzinfo is None:
+        return occurrence.replace(tzinfo=timezone.utc)
+    return occurrence.astimezone(timezone.utc)
@@ -0,0 +1,30 @@
+﻿from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Mapping, Optional, Sequence
+
+from sqlalchemy import select
+
+from reminderbot.infrastructure.db.models import FsmRecord
+
+from .base import SQLAlchemyRepository
+
+
+class FsmRecordRepository(SQLAlchemyRepository[FsmRecord]):
+    model = FsmRecord
+
+    async def get_live(self, key: str, now: datetime) -> Optional[FsmRecord]:
+        stmt = select(FsmRecord).where(FsmRecord.key == key, FsmRecord.expires_at > now)
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def save_many(self, rows: Sequence[Mapping[str, Any]]) -> None:
+        await self.upsert(rows, index_elements=["key"], update_columns=["state", "data", "expires_at"])
+
+    async def delete_keys(self, keys: Sequence[str]) -> int:
+        if not keys:
+            return 0
+        return await self.delete_where(FsmRecord.key.in_(keys))
+
+    async def purge_expired(self, now: datetime) -> int:
+        return await self.delete_where(FsmRecord.expires_at <= now)
@@ -0,0 +1,113 @@
+﻿from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from reminderbot.infrastructure.db.models import ReminderLog
+
+from .reminders import ReminderLogRepository
+
+logger = logging.getLogger(__name__)
+
+
+class ReminderLogWriter:
+    """Отложенная запись ``ReminderLog`` пачками.
+
+    ``add()`` только кладёт строку в буфер; фоновая задача сбрасывает его
+    одним ``INSERT ... VALUES (...), (...)`` каждые ``max_batch`` строк или
+    ``flush_interval`` секунд, в отдельной сессии. Буфер ограничен
+    ``max_pending`` строками: при переполнении ``add()`` ждёт сброса.
+    Неудачная пачка остаётся в буфере до следующей попытки.
+    ``close()`` сбрасывает всё накопленное.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        *,
+        max_batch: int = 500,
+        flush_interval: float = 0.5,
+        max_pending: int = 10_000,
+    ) -> None:
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self._buffer: list[dict[str, Any]] = []
+        self._slots = asyncio.Semaphore(max_pending)
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self._closed = False
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._closed = False
+            self._task = asyncio.create_task(self._run(), name="reminder-log-writer")
+
+    async def close(self) -> None:
+        """Перестаёт принимать записи и сбрасывает буфер в БД."""
+
+        self._closed = True
+        self._wakeup.set()
+        if self._task is not None:
+            # Не отменяем задачу: прерванная вставка потеряла бы уже снятую с буфера пачку
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    async def add(self, log: ReminderLog) -> ReminderLog:
+        """Ставит запись в буфер; ждёт только при переполнении буфера."""
+
+        if self._closed:
+            raise RuntimeError("Журнал напоминаний закрыт")
+        await self._slots.acquire()
+        now = datetime.utcnow()
+        self._buffer.append(
+            {
+                "reminder_id": log.reminder_id,
+                "scheduled_for": log.scheduled_for,
+                "processed_at": log.processed_at,
+                "status": log.status,
+                "error_message": log.error_message,
+                "created_at": now,
+                "updated_at": now,
+            }
+        )
+        if len(self._buffer) >= self.max_batch:
+            self._wakeup.set()
+        return log
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            while self._buffer:
+                batch = self._buffer[: self.max_batch]
+                del self._buffer[: self.max_batch]
+                try:
+                    async with self.session_factory() as session:
+                        await ReminderLogRepository(session).add_many(batch)
+                        await session.commit()
+                except Exception:
+                    logger.exception("Не удалось записать %s строк журнала напоминаний", len(batch))
+                    # Пачка возвращается в начало буфера и уйдёт со следующим сбросом;
+                    # места в буфере она занимает до успешной записи
+                    self._buffer[:0] = batch
+                    return
+                for _ in batch:
+                    self._slots.release()
+
+    async def _run(self) -> None:
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
@@ -1,9 +1,10 @@
 ﻿from __future__ import annotations
 
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Iterable, Optional
+from typing import AsyncIterator, Iterable, Optional, Sequence
 
-from sqlalchemy import select
+from sqlalchemy import and_, or_, select
 from sqlalchemy.orm import selectinload
 
 from reminderbot.infrastructure.db.models import Reminder, ReminderLog, ReminderStatus
@@ -11,6 +12,15 @@ from reminderbot.infrastructure.db.models import Reminder, ReminderLog, Reminder
 from .base import SQLAlchemyRepository
 
 
+@dataclass
+class ReminderPage:
+    """Страница списка напоминаний пользователя в порядке срабатывания."""
+
+    items: Sequence[Reminder]
+    has_prev: bool
+    has_next: bool
+
+
 class ReminderRepository(SQLAlchemyRepository[Reminder]):
     model = Reminder
 
@@ -32,21 +42,120 @@ class ReminderRepository(SQLAlchemyRepository[Reminder]):
         result = await self.session.execute(stmt)
         return result.scalars().all()
 
-    async def list_active(self) -> Iterable[Reminder]:
+    async def page_for_user(
+        self,
+        user_id: int,
+        *,
+        after: Optional[int] = None,
+        before: Optional[int] = None,
+        limit: int = 10,
+    ) -> ReminderPage:
+        """Keyset-страница напоминаний пользователя по ``(scheduled_at, id)``.
+
+        Курсор — id крайнего напоминания соседней страницы: ``after`` листает
+        вперёд, ``before`` — назад. Его ``scheduled_at`` берётся подзапросом,
+        поэтому страница — один запрос по индексу ``user_id, scheduled_at``
+        независимо от номера. Если напоминание-курсор удалено, страница пуста.
+        """
+
+        cursor = before if before is not None else after
+        backwards = before is not None
+        stmt = select(Reminder).where(Reminder.user_id == user_id)
+        if cursor is not None:
+            anchor = (
+                select(Reminder.scheduled_at)
+                .where(Reminder.id == cursor, Reminder.user_id == user_id)
+                .scalar_subquery()
+            )
+            if backwards:
+                stmt = stmt.where(
+                    or_(Reminder.scheduled_at < anchor, and_(Reminder.scheduled_at == anchor, Reminder.id < cursor))
+                )
+            else:
+                stmt = stmt.where(
+                    or_(Reminder.scheduled_at > anchor, and_(Reminder.scheduled_at == anchor, Reminder.id > cursor))
+                )
+        if backwards:
+            stmt = stmt.order_by(Reminder.scheduled_at.desc(), Reminder.id.desc())
+        else:
+            stmt = stmt.order_by(Reminder.scheduled_at, Reminder.id)
+        # Лишняя строка показывает, есть ли ещё страница в направлении листания
+        result = await self.session.execute(stmt.limit(limit + 1))
+        rows = list(result.scalars().all())
+        more = len(rows) > limit
+        rows = rows[:limit]
+        if backwards:
+            rows.reverse()
+            return ReminderPage(rows, has_prev=more, has_next=True)
+        return ReminderPage(rows, has_prev=cursor is not None, has_next=more)
+
+    async def list_due(self, reminder_ids: Sequence[int]) -> Sequence[Reminder]:
+        """Одним запросом загружает сработавшие по таймерам напоминания.
+
+        Срок проверяет очередь планировщика; здесь отбрасываются закрытые
+        и удалённые к моменту срабатывания. На PostgreSQL строки берутся
+        под ``FOR UPDATE SKIP LOCKED``: конкурирующий диспетчер не ждёт
+        чужую пачку, а пропускает её до фиксации заявки в журнале доставки.
+        SQLite блокировок строк не знает и предложение не выводит.
+        """
+
+        if not reminder_ids:
+            return []
         stmt = (
             select(Reminder)
-            .options(selectinload(Reminder.rule), selectinload(Reminder.user))
-            .where(Reminder.status == ReminderStatus.ACTIVE)
+            .options(selectinload(Reminder.user), selectinload(Reminder.rule))
+            .where(Reminder.id.in_(reminder_ids))
+            .where(Reminder.status.in_((ReminderStatus.ACTIVE, ReminderStatus.SNOOZED)))
+            .order_by(Reminder.id)
+            .with_for_update(skip_locked=True, of=Reminder)
         )
         result = await self.session.execute(stmt)
         return result.scalars().all()
 
-    async def list_due(self, now: datetime) -> Iterable[Reminder]:
+    async def list_by_ids(self, reminder_ids: Sequence[int]) -> Sequence[Reminder]:
+        if not reminder_ids:
+            return []
+        stmt = (
+            select(Reminder)
+            .options(selectinload(Reminder.user), selectinload(Reminder.rule))
+            .where(Reminder.id.in_(reminder_ids))
+            .order_by(Reminder.id)
+        )
+        result = await self.session.execute(stmt)
+        return result.scalars().all()
+
+    async def iter_next_runs(
+        self,
+        until: datetime,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[Sequence[tuple[int, datetime]]]:
+        """Потоково отдаёт пары ``(id, next_run_at)`` со сроком не позже until.
+
+        Один диапазонный запрос по индексу ``next_run_at`` без загрузки
+        объектов; просроченные тоже попадают в выборку.
+        """
+
+        stmt = (
+            select(Reminder.id, Reminder.next_run_at)
+            .where(Reminder.next_run_at <= until, Reminder.status != ReminderStatus.CLOSED)
+            .order_by(Reminder.next_run_at)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await self.session.stream(stmt)
+        async for partition in result.partitions():
+            yield [(reminder_id, next_run_at) for reminder_id, next_run_at in partition]
+
+    async def list_upcoming(self, start: datetime, end: datetime, limit: int = 100) -> Sequence[Reminder]:
         stmt = (
             select(Reminder)
             .options(selectinload(Reminder.user), selectinload(Reminder.rule))
-            .where(Reminder.status == ReminderStatus.ACTIVE)
-            .where(Reminder.scheduled_at <= now)
+            .where(
+                Reminder.next_run_at >= start,
+                Reminder.next_run_at < end,
+                Reminder.status != ReminderStatus.CLOSED,
+            )
+            .order_by(Reminder.next_run_at)
+            .limit(limit)
         )
         result = await self.session.execute(stmt)
         return result.scalars().all()
@@ -2,7 +2,7 @@
 
 from typing import Iterable, Optional
 
-from sqlalchemy import select
+from sqlalchemy import func, select
 
 from reminderbot.infrastructure.db.models import User
 
@@ -21,3 +21,58 @@ class UserRepository(SQLAlchemyRepository[User]):
         stmt = select(User).where(User.is_active.is_(True))
         result = await self.session.execute(stmt)
         return result.scalars().all()
+
+    async def upsert_from_telegram(
+        self,
+        telegram_id: int,
+        full_name: Optional[str],
+        username: Optional[str],
+        language: Optional[str],
+    ) -> User:
+        """Создаёт или освежает пользователя одним ``INSERT ... ON CONFLICT DO UPDATE ... RETURNING``.
+
+        Пустые имя и username не затирают сохранённые, язык меняется только
+        если передан. На SQLite старше 3.35 — прежний путь SELECT + INSERT/UPDATE.
+        """
+
+        if not self.supports_upsert:
+            return await self._get_or_create(telegram_id, full_name, username, language)
+        stmt = self._insert().values(
+            telegram_id=telegram_id,
+            full_name=full_name,
+            username=username,
+            language=language or "ru",
+        )
+        values = {
+            "full_name": func.coalesce(func.nullif(stmt.excluded.full_name, ""), User.full_name),
+            "username": func.coalesce(func.nullif(stmt.excluded.username, ""), User.username),
+            "updated_at": stmt.excluded.updated_at,
+        }
+        if language:
+            values["language"] = stmt.excluded.language
+        stmt = stmt.on_conflict_do_update(index_elements=[User.telegram_id], set_=values).returning(User)
+        result = await self.session.scalars(stmt, execution_options={"populate_existing": True})
+        return result.one()
+
+    async def _get_or_create(
+        self,
+        telegram_id: int,
+        full_name: Optional[str],
+        username: Optional[str],
+        language: Optional[str],
+    ) -> User:
+        user = await self.get_by_telegram_id(telegram_id)
+        if user is None:
+            user = User(
+                telegram_id=telegram_id,
+                full_name=full_name,
+                username=username,
+                language=language or "ru",
+            )
+            await self.add(user)
+        else:
+            user.full_name = full_name or user.full_name
+            user.username = username or user.username
+            if language:
+                user.language = language
+        return user
@@ -1,11 +1,17 @@
 ﻿from __future__ import annotations
 
 import logging
+from datetime import datetime
+from typing import Mapping, Sequence
+
 from sqlalchemy.ext.asyncio import async_sessionmaker
 from aiogram import Bot
 
+from reminderbot.domain.services.reminders import PendingDelivery
 from reminderbot.presentation.messages import ReminderRenderer
 from reminderbot.infrastructure.container import build_reminder_service
+from reminderbot.infrastructure.delivery.queue import DeliveryQueue
+from reminderbot.infrastructure.repos.log_writer import ReminderLogWriter
 
 logger = logging.getLogger(__name__)
 
@@ -13,21 +19,62 @@ logger = logging.getLogger(__name__)
 JOB_CTX: dict[str, object] = {}
 
 
-def init_job_context(*, session_factory: async_sessionmaker, bot: Bot, renderer: ReminderRenderer, scheduler) -> None:
+def init_job_context(
+    *,
+    session_factory: async_sessionmaker,
+    bot: Bot,
+    renderer: ReminderRenderer,
+    scheduler,
+    delivery: DeliveryQueue | None = None,
+    log_writer: ReminderLogWriter | None = None,
+    digest: bool = False,
+    digest_max_items: int = 20,
+) -> None:
     JOB_CTX["session_factory"] = session_factory
     JOB_CTX["bot"] = bot
     JOB_CTX["renderer"] = renderer
     JOB_CTX["scheduler"] = scheduler
+    JOB_CTX["delivery"] = delivery
+    JOB_CTX["log_writer"] = log_writer
+    JOB_CTX["digest"] = digest
+    JOB_CTX["digest_max_items"] = digest_max_items
+
 
+async def run_due_reminders(due: Mapping[int, datetime]) -> Sequence[PendingDelivery]:
+    """Обрабатывает пачку сработавших напоминаний ``{id: срабатывание}``.
 
-async def run_reminder_job(reminder_id: int) -> None:
-    """Функция уровня модуля для APScheduler (легко сериализуется)."""
+    Заявки в журнале доставки фиксируются отдельным коммитом до отправки,
+    остальные изменения пачки — общим коммитом в конце. Возвращает сообщения,
+    оставшиеся в очереди отправки: их итог записывает :func:`settle_delivery`.
+    """
     session_factory: async_sessionmaker = JOB_CTX["session_factory"]  # type: ignore[assignment]
-    bot: Bot = JOB_CTX["bot"]  # type: ignore[assignment]
-    renderer: ReminderRenderer = JOB_CTX["renderer"]  # type: ignore[assignment]
-    scheduler = JOB_CTX.get("scheduler")
 
     async with session_factory() as session:
-        service = build_reminder_service(session, bot, renderer, scheduler)
-        await service.process_and_reschedule(reminder_id)
+        service = _build_service(session)
+        processed = await service.process_due(due)
+        await session.commit()
+    logger.debug("Обработано %s из %s сработавших напоминаний", processed, len(due))
+    return service.pending_deliveries
+
+
+async def settle_delivery(pending: PendingDelivery) -> None:
+    """Дожидается отправки сообщения из очереди и записывает итог отдельной сессией."""
+
+    session_factory: async_sessionmaker = JOB_CTX["session_factory"]  # type: ignore[assignment]
+    error = await pending.outcome()
+    async with session_factory() as session:
+        await _build_service(session).settle_delivery(pending, error)
         await session.commit()
+
+
+def _build_service(session):
+    return build_reminder_service(
+        session,
+        JOB_CTX["bot"],  # type: ignore[arg-type]
+        JOB_CTX["renderer"],  # type: ignore[arg-type]
+        JOB_CTX.get("scheduler"),
+        JOB_CTX.get("delivery"),  # type: ignore[arg-type]
+        JOB_CTX.get("log_writer"),  # type: ignore[arg-type]
+        digest=bool(JOB_CTX.get("digest")),
+        digest_max_items=JOB_CTX.get("digest_max_items", 20),  # type: ignore[arg-type]
+    )
@@ -1,25 +1,32 @@
 ﻿from __future__ import annotations
 
+import asyncio
 import logging
-from datetime import datetime
-from typing import Iterable
-from zoneinfo import ZoneInfo
+import time
+from datetime import datetime, timedelta, timezone
 
 from aiogram import Bot
-from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from apscheduler.triggers.date import DateTrigger
 from sqlalchemy.ext.asyncio import async_sessionmaker
 
 from reminderbot.config import Settings
-from reminderbot.infrastructure.scheduler.jobs import run_reminder_job
+from reminderbot.infrastructure.repos.deliveries import DeliveryLedgerRepository
+from reminderbot.infrastructure.scheduler.jobs import run_due_reminders, settle_delivery
+from reminderbot.infrastructure.scheduler.timers import TimerQueue
 from reminderbot.presentation.messages import ReminderRenderer
 
 logger = logging.getLogger(__name__)
 
+# Горизонт «без ограничения» для запроса к БД
+_MAX_TIMESTAMP = datetime(9999, 1, 1, tzinfo=timezone.utc).timestamp()
 
 class ReminderScheduler:
-    """Менеджер задач APScheduler для напоминаний."""
+    """Планировщик напоминаний на in-memory очереди таймеров.
+
+    Единственный источник истины — таблица ``reminder``: очередь живёт только
+    в памяти процесса и восстанавливается из БД через :meth:`resync`.
+    Раз в tick сработавшие таймеры снимаются разом и обрабатываются пачками,
+    по одной сессии на пачку.
+    """
 
     def __init__(
         self,
@@ -28,57 +35,181 @@ class ReminderScheduler:
         bot: Bot,
         renderer: ReminderRenderer,
     ) -> None:
-        jobstore = SQLAlchemyJobStore(url=settings.scheduler_url)
-        self.scheduler = AsyncIOScheduler(
-            jobstores={"default": jobstore}, timezone=settings.timezone
-        )
         self.settings = settings
         self.session_factory = session_factory
         self.bot = bot
         self.renderer = renderer
+        self.queue = TimerQueue()
+        self.horizon = max(settings.scheduler_horizon_hours, 0.0) * 3600
+        self.batch_size = settings.scheduler_batch_size
+        # Досыпаем горизонт заметно чаще, чем он истекает
+        sweep = settings.scheduler_sweep_minutes * 60
+        self.sweep_interval = min(sweep, self.horizon / 2) if self.horizon else None
+        self._horizon_end = self._next_horizon_end()
+        self.tick = settings.scheduler_tick_seconds
+        self.dispatch_batch_size = settings.scheduler_dispatch_batch_size
+        # В режиме дайджеста вместе с наступившими снимаются таймеры на окно вперёд
+        self.digest_window = settings.digest_window_seconds if settings.digest_enabled else 0.0
+        self.ledger_retention = timedelta(days=max(settings.delivery_ledger_retention_days, 0.0))
+        # Журнал доставки чистится с тем же шагом, что и sweep, даже без горизонта
+        self.prune_interval = (self.sweep_interval or sweep) if self.ledger_retention else None
+        self._loop_task: asyncio.Task | None = None
+        self._sweep_task: asyncio.Task | None = None
+        self._jobs: set[asyncio.Task] = set()
+
+    @property
+    def running(self) -> bool:
+        return self._loop_task is not None and not self._loop_task.done()
 
     def start(self) -> None:
-        if not self.scheduler.running:
+        if not self.running:
             logger.info("Запуск планировщика напоминаний")
-            self.scheduler.start()
+            self._loop_task = asyncio.create_task(self._run(), name="reminder-scheduler")
+            if self.sweep_interval or self.prune_interval:
+                self._sweep_task = asyncio.create_task(self._sweep_forever(), name="reminder-sweep")
+
+    async def stop(self) -> None:
+        """Останавливает таймеры и sweep; начатые пачки продолжают работу."""
+
+        if self._loop_task is None:
+            return
+        logger.info("Остановка планировщика напоминаний")
+        tasks = [task for task in (self._loop_task, self._sweep_task) if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loop_task = self._sweep_task = None
+
+    async def shutdown(self, timeout: float = 10.0) -> None:
+        """Останавливает планировщик и ждёт начатые пачки не дольше ``timeout`` секунд.
+
+        Итоги отправки приходят из очереди доставки, поэтому её закрывают
+        между :meth:`stop` и этим вызовом: неотправленное получит ошибку
+        в квитанцию и будет перенесено, а не задержит остановку.
+        """
 
-    async def shutdown(self) -> None:
-        if self.scheduler.running:
-            logger.info("Остановка планировщика напоминаний")
-            await self.scheduler.shutdown()
+        await self.stop()
+        if not self._jobs:
+            return
+        _, unfinished = await asyncio.wait(set(self._jobs), timeout=timeout)
+        if unfinished:
+            logger.warning("Не дождались %s задач обработки напоминаний", len(unfinished))
+            for task in unfinished:
+                task.cancel()
+            await asyncio.gather(*unfinished, return_exceptions=True)
 
     def schedule_reminder(self, reminder_id: int, when: datetime) -> None:
-        trigger = DateTrigger(run_date=when.astimezone(ZoneInfo(self.settings.timezone)))
-        job_id = self._job_id(reminder_id)
-        # Важно: используем модульную функцию run_reminder_job — она сериализуется корректно
-        self.scheduler.add_job(
-            run_reminder_job,
-            trigger=trigger,
-            id=job_id,
-            replace_existing=True,
-            args=[reminder_id],
-            misfire_grace_time=60,
-        )
+        deadline = when.timestamp()
+        if deadline > self._horizon_end:
+            # За горизонтом: в память не кладём, его подберёт очередной проход sweep
+            self.queue.discard(reminder_id)
+            return
+        self.queue.push(reminder_id, deadline)
         logger.debug("Запланировано напоминание %s на %s", reminder_id, when)
 
     def remove_reminder(self, reminder_id: int) -> None:
-        job_id = self._job_id(reminder_id)
-        if self.scheduler.get_job(job_id):
-            self.scheduler.remove_job(job_id)
+        if self.queue.discard(reminder_id):
             logger.debug("Удалено напоминание %s из планировщика", reminder_id)
 
     async def resync(self) -> None:
-        from reminderbot.infrastructure.container import build_reminder_service
+        """Полностью пересобирает очередь из таблицы ``reminder``."""
 
         logger.info("Синхронизация заданий планировщика")
+        self.queue.clear()
+        await self.sweep()
+        logger.info("В очереди планировщика %s напоминаний", len(self.queue))
+
+    async def sweep(self) -> None:
+        """Сдвигает горизонт и догружает срабатывания, попадающие в него.
+
+        Один диапазонный запрос по индексу ``next_run_at``: ничего не
+        пересчитывается, просроченные срабатывания сразу уходят диспетчеру.
+        """
+
+        from reminderbot.infrastructure.container import build_reminder_service
+
+        self._horizon_end = self._next_horizon_end()
+        until = datetime.fromtimestamp(min(self._horizon_end, _MAX_TIMESTAMP), tz=timezone.utc)
         async with self.session_factory() as session:
             service = build_reminder_service(session, self.bot, self.renderer, self)
-            reminders = await service.get_active_reminders()
-            for reminder in reminders:
-                next_fire = await service.compute_next_run(reminder)
-                if next_fire:
-                    self.schedule_reminder(reminder.id, next_fire)
-
-    @staticmethod
-    def _job_id(reminder_id: int) -> str:
-        return f"reminder:{reminder_id}"
+            async for batch in service.iter_next_runs(until, self.batch_size):
+                for reminder_id, next_run_at in batch:
+                    if next_run_at.tzinfo is None:
+                        # SQLite отдаёт DateTime без зоны, а хранится там UTC
+                        next_run_at = next_run_at.replace(tzinfo=timezone.utc)
+                    self.schedule_reminder(reminder_id, next_run_at)
+
+    async def prune_deliveries(self) -> int:
+        """Удаляет из журнала доставки срабатывания старше срока хранения.
+
+        Журнал нужен, пока срабатывание может прийти повторно (рестарт,
+        соседний диспетчер); старые строки только растят таблицу.
+        """
+
+        if not self.ledger_retention:
+            return 0
+        cutoff = datetime.now(timezone.utc) - self.ledger_retention
+        async with self.session_factory() as session:
+            removed = await DeliveryLedgerRepository(session).purge_before(cutoff)
+            await session.commit()
+        if removed:
+            logger.info("Из журнала доставки удалено %s строк", removed)
+        return removed
+
+    def _next_horizon_end(self) -> float:
+        if not self.horizon:
+            return float("inf")
+        return time.time() + self.horizon
+
+    async def _sweep_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_interval or self.prune_interval)
+            if self.sweep_interval:
+                try:
+                    await self.sweep()
+                except Exception:  # pragma: no cover - следующий проход повторит попытку
+                    logger.exception("Ошибка досылки горизонта планировщика")
+            if self.prune_interval:
+                try:
+                    await self.prune_deliveries()
+                except Exception:  # pragma: no cover - следующий проход повторит попытку
+                    logger.exception("Ошибка очистки журнала доставки")
+
+    async def _run(self) -> None:
+        while True:
+            now = time.time()
+            due = self.queue.pop_due_with_deadlines(now)
+            if due and self.digest_window > 0:
+                due.extend(self.queue.pop_due_with_deadlines(now + self.digest_window))
+            if due:
+                self._spawn(due)
+            await asyncio.sleep(self.tick)
+
+    def _spawn(self, due: list[tuple[int, float]]) -> None:
+        self._track(self._dispatch(due), f"reminders-due:{len(due)}")
+
+    def _track(self, job, name: str) -> None:
+        task = asyncio.create_task(job, name=name)
+        self._jobs.add(task)
+        task.add_done_callback(self._on_job_done)
+
+    async def _dispatch(self, due: list[tuple[int, float]]) -> None:
+        # Срок таймера — это и есть срабатывание: по нему журнал доставки отсекает дубли
+        for start in range(0, len(due), self.dispatch_batch_size):
+            batch = {
+                reminder_id: datetime.fromtimestamp(deadline, tz=timezone.utc)
+                for reminder_id, deadline in due[start : start + self.dispatch_batch_size]
+            }
+            try:
+                pending = await run_due_reminders(batch)
+            except Exception:
+                logger.exception("Ошибка обработки пачки напоминаний %s", list(batch))
+                continue
+            # Итог каждого сообщения записывается по его квитанции, следующая пачка не ждёт
+            for item in pending:
+                self._track(settle_delivery(item), f"reminders-sent:{item.reminder_ids[0]}")
+
+    def _on_job_done(self, task: asyncio.Task) -> None:
+        self._jobs.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Ошибка обработки %s", task.get_name(), exc_info=task.exception())
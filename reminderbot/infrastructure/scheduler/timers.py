@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+from typing import Iterator
+
+
+class TimerQueue:
+    """Min-heap таймеров, ключом служит id напоминания.
+
+    Перепланирование и отмена работают за O(log n): устаревшие записи
+    кучи не удаляются сразу, а пропускаются при чтении (ленивое удаление).
+    """
+
+    # Перестраиваем кучу, когда мусорных записей становится больше живых
+    _COMPACT_THRESHOLD = 1024
+
+    def __init__(self) -> None:
+        self._heap: list[tuple[float, int, int]] = []
+        self._live: dict[int, tuple[float, int]] = {}
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def __contains__(self, key: int) -> bool:
+        return key in self._live
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._live)
+
+    def deadline(self, key: int) -> float | None:
+        entry = self._live.get(key)
+        return entry[0] if entry else None
+
+    def push(self, key: int, deadline: float) -> bool:
+        """Ставит (или переставляет) таймер. Возвращает True, если он стал ближайшим."""
+
+        seq = next(self._seq)
+        self._live[key] = (deadline, seq)
+        heapq.heappush(self._heap, (deadline, seq, key))
+        self._maybe_compact()
+        return self._heap[0][2] == key and self._heap[0][1] == seq
+
+    def discard(self, key: int) -> bool:
+        return self._live.pop(key, None) is not None
+
+    def clear(self) -> None:
+        self._heap.clear()
+        self._live.clear()
+
+    def next_deadline(self) -> float | None:
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: float, limit: int | None = None) -> list[int]:
+        """Снимает с очереди все таймеры со сроком <= now (не больше limit)."""
+
+        return [key for key, _ in self.pop_due_with_deadlines(now, limit)]
+
+    def pop_due_with_deadlines(self, now: float, limit: int | None = None) -> list[tuple[int, float]]:
+        """То же, что :meth:`pop_due`, но вместе со сроком каждого таймера."""
+
+        due: list[tuple[int, float]] = []
+        while self._heap and (limit is None or len(due) < limit):
+            self._drop_stale()
+            if not self._heap or self._heap[0][0] > now:
+                break
+            deadline, _, key = heapq.heappop(self._heap)
+            del self._live[key]
+            due.append((key, deadline))
+        return due
+
+    def _is_live(self, entry: tuple[float, int, int]) -> bool:
+        deadline, seq, key = entry
+        return self._live.get(key) == (deadline, seq)
+
+    def _drop_stale(self) -> None:
+        while self._heap and not self._is_live(self._heap[0]):
+            heapq.heappop(self._heap)
+
+    def _maybe_compact(self) -> None:
+        if len(self._heap) - len(self._live) <= max(self._COMPACT_THRESHOLD, len(self._live)):
+            return
+        self._heap = [(deadline, seq, key) for key, (deadline, seq) in self._live.items()]
+        heapq.heapify(self._heap)
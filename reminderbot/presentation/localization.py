@@ -1,40 +1,189 @@
 ﻿from __future__ import annotations
 
+import asyncio
+import logging
 import yaml
-from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict
+from string import Formatter
+from typing import Any, Callable, Dict, Mapping
+
+logger = logging.getLogger(__name__)
+
+
+class Template:
+    """Строка каталога с заранее разобранными подстановками ``str.format``.
+
+    Простые поля вида ``{name}`` подставляются склейкой готовых кусков;
+    шаблоны с форматом, конверсией или позиционными полями отдаются
+    обычному ``str.format`` — результат в обоих случаях одинаков.
+    """
+
+    __slots__ = ("text", "_parts", "_simple")
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        parsed = list(Formatter().parse(text))
+        self._simple = all(
+            name is None or (name.isidentifier() and not spec and not conversion)
+            for _, name, spec, conversion in parsed
+        )
+        self._parts = [(literal, name) for literal, name, _, _ in parsed]
+
+    def format(self, params: Mapping[str, Any]) -> str:
+        if not self._simple:
+            return self.text.format(**params)
+        chunks = []
+        for literal, name in self._parts:
+            chunks.append(literal)
+            if name is not None:
+                chunks.append(format(params[name]))
+        return "".join(chunks)
+
+
+Catalog = Dict[str, Any]
 
 
 class Localizer:
-    """Простая локализация на основе YAML-файлов."""
+    """Локализация на основе YAML-файлов.
+
+    Каталоги компилируются один раз: для каждой локали — плоский словарь
+    «ключ с точками → ``Template``», в который заранее подмешаны значения
+    локали по умолчанию. ``translate`` делает один поиск в словаре.
+    ``reload_if_changed`` пересобирает каталоги при изменении файлов.
+    """
 
     def __init__(self, locales_dir: Path, default_locale: str = "ru") -> None:
-        self.locales_dir = locales_dir
+        self.locales_dir = Path(locales_dir)
         self.default_locale = default_locale
+        self._catalogs: Dict[str, Catalog] = {}
+        self._aliases: Dict[str, Catalog] = {}
+        self._mtimes: Dict[Path, float] = {}
+        self._listeners: list[Callable[[], None]] = []
+        self._build()
 
     def translate(self, key: str, locale: str | None = None, **params: Any) -> str:
-        catalogue = self._load_locale(locale or self.default_locale)
-        value = self._resolve_key(catalogue, key.split("."))
+        value = self._catalog(locale).get(key)
+        if value is None:
+            raise KeyError(f"Локализационный ключ отсутствует: {key}")
+        if not isinstance(value, Template):
+            raise ValueError("Локализационное значение должно быть строкой")
         if params:
-            return value.format(**params)
-        return value
-
-    @lru_cache(maxsize=32)
-    def _load_locale(self, locale: str) -> Dict[str, Any]:
-        file_path = self.locales_dir / f"{locale}.yml"
-        if not file_path.exists():
-            file_path = self.locales_dir / f"{self.default_locale}.yml"
-        with file_path.open("r", encoding="utf-8") as fp:
+            return value.format(params)
+        return value.text
+
+    def sequence(self, key: str, locale: str | None = None) -> list[str]:
+        """Список строк каталога, например ``calendar.weekdays``."""
+
+        value = self._catalog(locale).get(key)
+        if value is None:
+            raise KeyError(f"Локализационный ключ отсутствует: {key}")
+        if not isinstance(value, list):
+            raise ValueError("Локализационное значение должно быть списком")
+        return [str(item) for item in value]
+
+    def available_locales(self) -> list[str]:
+        return sorted(self._catalogs)
+
+    def section(self, key: str, locale: str | None = None) -> Dict[str, str]:
+        """Строковые значения раздела каталога, например ``buttons.main``."""
+
+        prefix = f"{key}."
+        values = {
+            name[len(prefix):]: value.text
+            for name, value in self._catalog(locale).items()
+            if name.startswith(prefix) and "." not in name[len(prefix):] and isinstance(value, Template)
+        }
+        if not values:
+            raise KeyError(f"Локализационный раздел отсутствует: {key}")
+        return values
+
+    def missing_keys(self) -> Dict[str, list[str]]:
+        """Ключи локали по умолчанию, которых нет в файле другой локали.
+
+        При переводе такие ключи берутся из локали по умолчанию; отчёт
+        нужен, чтобы пропуск не прошёл незамеченным.
+        """
+
+        expected = self._own_keys.get(self.default_locale, set())
+        return {locale: sorted(expected - keys) for locale, keys in self._own_keys.items() if expected - keys}
+
+    def on_reload(self, callback: Callable[[], None]) -> None:
+        self._listeners.append(callback)
+
+    def reload_if_changed(self) -> bool:
+        """Пересобирает каталоги, если YAML-файлы изменились; ``True`` при перезагрузке.
+
+        Ошибка в файле не ломает работу: остаются прежние каталоги до
+        следующего изменения файлов.
+        """
+
+        mtimes = self._current_mtimes()
+        if mtimes == self._mtimes:
+            return False
+        try:
+            self._build()
+        except Exception:
+            logger.exception("Не удалось перезагрузить локализацию, остаются прежние каталоги")
+            # Повторим, когда файл снова изменится, а не на каждой проверке
+            self._mtimes = mtimes
+            return False
+        logger.info("Локализация перезагружена: %s", ", ".join(self.available_locales()))
+        for callback in self._listeners:
+            callback()
+        return True
+
+    async def watch(self, interval: float) -> None:
+        """Проверяет файлы локалей раз в ``interval`` секунд, пока задачу не отменят."""
+
+        while True:
+            await asyncio.sleep(interval)
+            self.reload_if_changed()
+
+    def _catalog(self, locale: str | None) -> Catalog:
+        if not locale:
+            return self._default
+        catalog = self._aliases.get(locale)
+        if catalog is None:
+            # «en-US» → «en», неизвестная локаль → локаль по умолчанию
+            base = locale.replace("_", "-").split("-")[0].lower()
+            catalog = self._catalogs.get(locale) or self._catalogs.get(base) or self._default
+            self._aliases[locale] = catalog
+        return catalog
+
+    def _build(self) -> None:
+        mtimes = self._current_mtimes()
+        raw = {path.stem: self._flatten(self._read(path)) for path in mtimes}
+        default = raw.get(self.default_locale, {})
+        catalogs = {
+            locale: {key: self._compile(value) for key, value in {**default, **values}.items()}
+            for locale, values in raw.items()
+        }
+        # Новые словари подменяются целиком: конкурентный translate видит либо старые, либо новые
+        self._own_keys = {locale: set(values) for locale, values in raw.items()}
+        self._catalogs = catalogs
+        self._default = catalogs.get(self.default_locale, {})
+        self._aliases = {}
+        self._mtimes = mtimes
+
+    def _current_mtimes(self) -> Dict[Path, float]:
+        return {path: path.stat().st_mtime for path in sorted(self.locales_dir.glob("*.yml"))}
+
+    @staticmethod
+    def _read(path: Path) -> Dict[str, Any]:
+        with path.open("r", encoding="utf-8-sig") as fp:
             return yaml.safe_load(fp) or {}
 
-    def _resolve_key(self, catalogue: Dict[str, Any], keys: list[str]) -> str:
-        current: Any = catalogue
-        for key in keys:
-            if isinstance(current, dict) and key in current:
-                current = current[key]
+    @classmethod
+    def _flatten(cls, tree: Dict[str, Any], prefix: str = "") -> Dict[str, Any]:
+        flat: Dict[str, Any] = {}
+        for name, value in tree.items():
+            key = f"{prefix}{name}"
+            if isinstance(value, dict):
+                flat.update(cls._flatten(value, f"{key}."))
             else:
-                raise KeyError(f"Локализационный ключ отсутствует: {'.'.join(keys)}")
-        if not isinstance(current, str):
-            raise ValueError("Локализационное значение должно быть строкой")
-        return current
+                flat[key] = value
+        return flat
+
+    @staticmethod
+    def _compile(value: Any) -> Any:
+        return Template(value) if isinstance(value, str) else value
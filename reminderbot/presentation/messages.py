@@ -1,6 +1,7 @@
 ﻿from __future__ import annotations
 
-from datetime import datetime
+from datetime import datetime, timezone as dt_timezone
+from typing import Dict, Sequence
 from zoneinfo import ZoneInfo
 
 from reminderbot.infrastructure.db.models import Reminder
@@ -29,15 +30,62 @@ class ReminderRenderer:
 
     def render_list_item(self, reminder: Reminder) -> str:
         locale = reminder.user.language
-        scheduled = reminder.scheduled_at.astimezone(ZoneInfo(reminder.user.timezone))
         status_key = f"reminder.status.{reminder.status.value}"
+        return self._list_line(
+            reminder,
+            locale,
+            ZoneInfo(reminder.user.timezone),
+            self.localizer.translate(status_key, locale),
+        )
+
+    def render_list_page(self, reminders: Sequence[Reminder], locale: str, timezone: str) -> str:
+        """Страница списка одним сообщением: заголовок и строка на напоминание.
+
+        Все напоминания принадлежат одному пользователю, поэтому язык и зона
+        передаются один раз и ``reminder.user`` не загружается.
+        """
+
+        tz = ZoneInfo(timezone)
+        statuses: Dict[str, str] = {}
+        lines = [self.localizer.translate("reminder.list_title", locale)]
+        for reminder in reminders:
+            status = reminder.status.value
+            if status not in statuses:
+                statuses[status] = self.localizer.translate(f"reminder.status.{status}", locale)
+            lines.append(self._list_line(reminder, locale, tz, statuses[status]))
+        return "\n".join(lines)
+
+    def render_digest(self, reminders: Sequence[Reminder], locale: str, timezone: str) -> str:
+        """Несколько сработавших вместе напоминаний одного пользователя одним сообщением."""
+
+        tz = ZoneInfo(timezone)
+        lines = [self.localizer.translate("reminder.digest_title", locale, count=len(reminders))]
+        for reminder in reminders:
+            if reminder.next_run_at is not None:
+                fired = _as_utc(reminder.next_run_at).astimezone(tz)
+            else:
+                fired = _in_zone(reminder.scheduled_at, tz)
+            lines.append(
+                self.localizer.translate(
+                    "reminder.digest_item",
+                    locale,
+                    id=reminder.id,
+                    title=reminder.title,
+                    time=fired.strftime("%H:%M"),
+                )
+            )
+            if reminder.description:
+                lines.append(reminder.description)
+        return "\n".join(lines)
+
+    def _list_line(self, reminder: Reminder, locale: str | None, tz: ZoneInfo, status: str) -> str:
         return self.localizer.translate(
             "reminder.list_item",
             locale,
             id=reminder.id,
             title=reminder.title,
-            status=self.localizer.translate(status_key, locale),
-            time=scheduled.strftime("%d.%m.%Y %H:%M"),
+            status=status,
+            time=_in_zone(reminder.scheduled_at, tz).strftime("%d.%m.%Y %H:%M"),
         )
 
     def render_admin_log_entry(self, log) -> str:
@@ -51,3 +99,13 @@ class ReminderRenderer:
             time=processed_at.strftime("%d.%m.%Y %H:%M"),
             error=log.error_message or "",
         )
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite возвращает DateTime без зоны; в next_run_at хранится UTC
+    return value.replace(tzinfo=dt_timezone.utc) if value.tzinfo is None else value
+
+
+def _in_zone(value: datetime, tz: ZoneInfo) -> datetime:
+    # scheduled_at сохраняется в зоне пользователя, SQLite отдаёт его настенное время
+    return value.replace(tzinfo=tz) if value.tzinfo is None else value.astimezone(tz)
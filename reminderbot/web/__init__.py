@@ -7,7 +7,7 @@ from reminderbot.web.main import create_app
 
 def build_app():
     settings = get_settings()
-    engine = create_engine(settings.database_url)
+    engine = create_engine(settings.database_url, settings)
     session_factory = create_session_factory(engine)
     return create_app(settings, session_factory)
 
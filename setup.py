@@ -9,7 +9,6 @@ setup(
     packages=find_packages(),  # автоматически найдёт reminderbot/ и все модули
     install_requires=[
         "aiogram>=3.4",
-        "APScheduler>=3.10",
         "SQLAlchemy>=2.0",
         "aiosqlite>=0.19",
         "alembic>=1.13",
@@ -30,6 +29,15 @@ setup(
             "pytest-asyncio>=0.23",
             "pytest-mock>=3.12",
             "coverage>=7.4",
-        ]
+        ],
+        "perf": [
+            "numpy>=1.24",
+        ],
+        "postgres": [
+            "asyncpg>=0.29",
+        ],
+        "bench": [
+            "pytest-benchmark>=4.0",
+        ],
     }
 )
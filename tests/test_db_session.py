@@ -0,0 +1,26 @@
+import pytest
+from sqlalchemy import text
+
+from reminderbot.config import Settings
+from reminderbot.infrastructure.db.session import create_engine
+
+
+@pytest.mark.asyncio
+async def test_sqlite_profile_applies_pragmas_and_pool(tmp_path):
+    settings = Settings(BOT_TOKEN="test", SQLITE_BUSY_TIMEOUT_MS=1234, DB_POOL_SIZE=3)
+    engine = create_engine(f"sqlite+aiosqlite:///{tmp_path / 'tuned.db'}", settings)
+    async with engine.connect() as conn:
+        assert (await conn.execute(text("PRAGMA journal_mode"))).scalar() == "wal"
+        assert (await conn.execute(text("PRAGMA synchronous"))).scalar() == 1  # NORMAL
+        assert (await conn.execute(text("PRAGMA busy_timeout"))).scalar() == 1234
+    assert engine.pool.size() == 3
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_sqlite_profile_can_be_disabled(tmp_path):
+    settings = Settings(BOT_TOKEN="test", SQLITE_TUNED=False)
+    engine = create_engine(f"sqlite+aiosqlite:///{tmp_path / 'plain.db'}", settings)
+    async with engine.connect() as conn:
+        assert (await conn.execute(text("PRAGMA journal_mode"))).scalar() == "delete"
+    await engine.dispose()
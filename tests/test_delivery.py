@@ -0,0 +1,105 @@
+import asyncio
+import time
+
+import pytest
+from aiogram.exceptions import TelegramForbiddenError, TelegramRetryAfter
+from aiogram.methods import SendMessage
+
+from reminderbot.infrastructure.delivery.queue import DeliveryError, DeliveryQueue, TokenBucket
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class RecordingBot:
+    def __init__(self, flood_once: bool = False, blocked: tuple[int, ...] = ()) -> None:
+        self.sent: list[tuple[int, str, float]] = []
+        self.flood_once = flood_once
+        self.blocked = blocked
+
+    async def send_message(self, chat_id: int, text: str, **kwargs) -> None:
+        if self.flood_once:
+            self.flood_once = False
+            raise TelegramRetryAfter(SendMessage(chat_id=chat_id, text=text), "flood", retry_after=0.05)
+        if chat_id in self.blocked:
+            raise TelegramForbiddenError(SendMessage(chat_id=chat_id, text=text), "bot was blocked by the user")
+        self.sent.append((chat_id, text, time.monotonic()))
+
+
+def test_token_bucket_reserves_future_tokens():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, capacity=2.0, clock=clock)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == pytest.approx(0.5)
+    assert bucket.reserve() == pytest.approx(1.0)
+    clock.now = 10.0
+    assert bucket.is_idle()
+    assert bucket.reserve() == 0.0
+
+
+@pytest.mark.asyncio
+async def test_delivery_queue_spaces_messages_per_chat():
+    bot = RecordingBot()
+    queue = DeliveryQueue(bot, workers=3, global_rate=1000.0, chat_rate=20.0)
+    queue.start()
+    for index in range(3):
+        await queue.enqueue(1, f"a{index}")
+    await queue.enqueue(2, "b0")
+    await queue.close()
+    assert [text for chat, text, _ in bot.sent if chat == 1] == ["a0", "a1", "a2"]
+    times = [at for chat, _, at in bot.sent if chat == 1]
+    assert times[2] - times[0] >= 0.09
+    assert queue.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_delivery_queue_retries_after_flood_control():
+    bot = RecordingBot(flood_once=True)
+    queue = DeliveryQueue(bot, workers=1)
+    queue.start()
+    await queue.enqueue(1, "hello")
+    await queue.close()
+    assert [text for _, text, _ in bot.sent] == ["hello"]
+    with pytest.raises(RuntimeError):
+        await queue.enqueue(1, "late")
+
+
+@pytest.mark.asyncio
+async def test_delivery_queue_keeps_chat_order_while_retrying():
+    bot = RecordingBot(flood_once=True)
+    queue = DeliveryQueue(bot, workers=4, global_rate=1000.0, chat_rate=1000.0)
+    queue.start()
+    receipts = [await queue.enqueue(1, f"m{index}") for index in range(4)]
+    await asyncio.gather(*receipts)
+    assert [text for _, text, _ in bot.sent] == ["m0", "m1", "m2", "m3"]
+    await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_delivery_queue_reports_outcome_in_receipt():
+    class HangingBot:
+        async def send_message(self, chat_id: int, text: str, **kwargs) -> None:
+            await asyncio.Event().wait()
+
+    bot = RecordingBot(blocked=(2,))
+    queue = DeliveryQueue(bot, workers=2, global_rate=1000.0)
+    queue.start()
+    delivered = await queue.enqueue(1, "ok")
+    blocked = await queue.enqueue(2, "lost")
+    await delivered
+    with pytest.raises(TelegramForbiddenError):
+        await blocked
+    await queue.close()
+
+    stuck = DeliveryQueue(HangingBot(), workers=1)
+    stuck.start()
+    receipt = await stuck.enqueue(1, "never")
+    await stuck.close(timeout=0.05)
+    with pytest.raises(DeliveryError):
+        await receipt
@@ -0,0 +1,92 @@
+from datetime import timedelta
+
+import pytest
+from aiogram.fsm.state import State, StatesGroup
+from aiogram.fsm.storage.base import StorageKey
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from reminderbot.infrastructure.db.models import FsmRecord
+from reminderbot.infrastructure.fsm_storage import DatabaseStorage
+from tests.db import create_test_engine
+
+
+class Flow(StatesGroup):
+    title = State()
+
+
+def key(chat_id: int) -> StorageKey:
+    return StorageKey(bot_id=1, chat_id=chat_id, user_id=chat_id)
+
+
+@pytest.fixture
+async def engine(tmp_path):
+    engine = await create_test_engine(f"sqlite+aiosqlite:///{tmp_path / 'fsm.db'}")
+    yield engine
+    await engine.dispose()
+
+
+async def count_rows(factory) -> int:
+    async with factory() as session:
+        return (await session.execute(select(func.count()).select_from(FsmRecord))).scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_state_survives_restart_and_is_shared(engine):
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+    storage = DatabaseStorage(factory)
+    await storage.set_state(key(1), Flow.title)
+    await storage.update_data(key(1), {"date": "2024-03-01"})
+    await storage.close()
+
+    restarted = DatabaseStorage(factory)
+    assert await restarted.get_state(key(1)) == Flow.title.state
+    assert await restarted.get_data(key(1)) == {"date": "2024-03-01"}
+    # Завершённый диалог удаляет строку
+    await restarted.set_state(key(1), None)
+    await restarted.set_data(key(1), {})
+    await restarted.close()
+    assert await count_rows(factory) == 0
+
+
+@pytest.mark.asyncio
+async def test_hot_conversation_is_served_from_memory_and_written_behind(engine):
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+    storage = DatabaseStorage(factory, flush_interval=60)
+    await storage.set_state(key(2), Flow.title)
+
+    statements: list[str] = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    await storage.update_data(key(2), {"title": "Call"})
+    assert await storage.get_state(key(2)) == Flow.title.state
+    assert statements == []
+    assert storage.pending == 1
+
+    await storage.flush()
+    assert storage.pending == 0 and await count_rows(factory) == 1
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_abandoned_flow_expires_and_is_purged(engine):
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+    storage = DatabaseStorage(factory, state_ttl=timedelta(seconds=-1), cache_ttl=0)
+    await storage.set_state(key(3), Flow.title)
+    await storage.flush()
+    assert await storage.get_state(key(3)) is None
+    assert await storage.purge() == 1
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_lru_front_keeps_unsaved_entries(engine):
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+    storage = DatabaseStorage(factory, cache_size=2, flush_interval=60)
+    for chat_id in range(4):
+        await storage.set_data(key(chat_id), {"n": chat_id})
+    # Все четыре ключа ещё не записаны — вытеснять их нельзя
+    assert len(storage._entries) == 4
+    await storage.flush()
+    assert len(storage._entries) == 2
+    assert await storage.get_data(key(0)) == {"n": 0}
+    await storage.close()
@@ -0,0 +1,60 @@
+from pathlib import Path
+
+import pytest
+from aiogram.types import Chat, Message
+
+from reminderbot.app.intents import IntentFilter, IntentIndex, IntentMiddleware, normalize
+from reminderbot.presentation.localization import Localizer
+
+LOCALES = Path("reminderbot/presentation/locales")
+
+
+class StubLocalizer:
+    def __init__(self, sections: dict[str, dict[str, str]]) -> None:
+        self.sections = sections
+
+    def available_locales(self) -> list[str]:
+        return sorted(self.sections)
+
+    def section(self, key: str, locale: str) -> dict[str, str]:
+        return self.sections[locale]
+
+
+def test_normalize_drops_leading_emoji_and_case():
+    assert normalize("🆘 Help") == "help"
+    assert normalize("  ❓ ПОМОЩЬ ") == "помощь"
+    assert normalize("Help me") == "help me"
+
+
+def test_index_matches_buttons_of_every_locale():
+    index = IntentIndex.from_localizer(Localizer(LOCALES, "ru"))
+    assert index.match("➕ Создать") == "create"
+    assert index.match("📋 List") == "list"
+    assert index.match("🌐 Мови") == "language"
+    assert index.match("🛟 Допомога") == "help"
+    # Подпись, набранная вручную без эмодзи и в другом регистре
+    assert index.match("помощь") == "help"
+    assert index.match("Help me") is None
+    assert index.match(None) is None
+    assert index.stats() == {"create": 1, "list": 1, "language": 1, "help": 2}
+
+
+def test_conflicting_labels_are_rejected():
+    i18n = StubLocalizer({"en": {"create": "➕ New"}, "ru": {"list": "📋 new"}})
+    with pytest.raises(ValueError):
+        IntentIndex.from_localizer(i18n)
+
+
+@pytest.mark.asyncio
+async def test_middleware_feeds_filter():
+    index = IntentIndex({"help": "help"})
+    message = Message.model_construct(message_id=1, date=0, chat=Chat(id=1, type="private"), text="🆘 Help")
+    seen: dict = {}
+
+    async def handler(event, data):
+        seen.update(data)
+
+    await IntentMiddleware(index)(handler, message, {})
+    assert seen["intent"] == "help"
+    assert await IntentFilter("help")(message, intent=seen["intent"])
+    assert not await IntentFilter("create")(message, intent=seen["intent"])
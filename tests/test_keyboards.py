@@ -0,0 +1,59 @@
+import os
+from pathlib import Path
+
+import pytest
+from pydantic import ValidationError
+
+from reminderbot.app.keyboards import common
+from reminderbot.app.keyboards.cache import KeyboardCache, keyboard_cache
+from reminderbot.app.utils import calendar
+from reminderbot.presentation.localization import Localizer
+
+LOCALES = Path("reminderbot/presentation/locales")
+
+
+@pytest.fixture
+def i18n():
+    keyboard_cache.clear()
+    yield Localizer(LOCALES, "ru")
+    keyboard_cache.clear()
+
+
+def test_cached_markup_is_shared_and_equal_to_fresh_build(i18n):
+    menu = common.main_menu_kb(i18n, "en")
+    assert common.main_menu_kb(i18n, "en") is menu
+    assert common.main_menu_kb(i18n, "ru") is not menu
+    assert menu.model_dump() == common._build_main_menu(i18n, "en").model_dump()
+    march = calendar.calendar_keyboard(i18n, "ru", 2030, 3)
+    assert calendar.calendar_keyboard(i18n, "ru", 2030, 3) is march
+    assert march.model_dump() == calendar._build_calendar(i18n, "ru", 2030, 3).model_dump()
+    english = [button.text for row in calendar.calendar_keyboard(i18n, "en", 2030, 3).inline_keyboard for button in row]
+    assert english[3:10] == ["Mo", "Tu", "We", "Th", "Fr", "Sa", "Su"]
+    assert [button.text for row in march.inline_keyboard for button in row][3] == "Пн"
+    assert calendar.minutes_keyboard(9) is not calendar.minutes_keyboard(10)
+    with pytest.raises(ValidationError):
+        march.inline_keyboard = []
+
+
+def test_lru_eviction_and_stats():
+    cache = KeyboardCache(max_size=2)
+    for hour in (1, 2, 1, 3):
+        cache.get_or_build(("minutes", hour), lambda hour=hour: calendar._build_minutes(hour))
+    assert len(cache) == 2
+    assert cache.stats()["hits"] == 1
+    cache.get_or_build(("minutes", 2), lambda: calendar._build_minutes(2))
+    assert cache.misses == 4
+
+
+def test_catalog_reload_clears_cache(tmp_path):
+    path = tmp_path / "ru.yml"
+    path.write_text("buttons:\n  main:\n    create: a\n    list: b\n    language: c\n    help: d\n", encoding="utf-8")
+    os.utime(path, (1_000, 1_000))
+    localizer = Localizer(tmp_path, "ru")
+    cache = KeyboardCache()
+    localizer.on_reload(cache.clear)
+    cache.get_or_build(("main_menu", "ru"), lambda: common._build_main_menu(localizer, "ru"))
+    path.write_text("buttons:\n  main:\n    create: e\n    list: b\n    language: c\n    help: d\n", encoding="utf-8")
+    os.utime(path, (2_000, 2_000))
+    assert localizer.reload_if_changed()
+    assert len(cache) == 0
@@ -0,0 +1,61 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from reminderbot.presentation.localization import Localizer, Template
+
+LOCALES = Path("reminderbot/presentation/locales")
+
+
+def write_locale(directory: Path, locale: str, text: str, mtime: float | None = None) -> None:
+    path = directory / f"{locale}.yml"
+    path.write_text(text, encoding="utf-8")
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+@pytest.mark.parametrize("text", ["plain", "#{id}: {title} ({time})", "{{literal}} {name}", "{value:>5}|{name!r}"])
+def test_template_matches_str_format(text):
+    params = {"id": 7, "title": "Т", "time": "12:00", "name": "n", "value": 3}
+    assert Template(text).format(params) == text.format(**params)
+
+
+def test_shipped_locales_are_complete():
+    localizer = Localizer(LOCALES, "ru")
+    assert localizer.available_locales() == ["en", "ru", "uk"]
+    assert localizer.missing_keys() == {}
+    assert localizer.translate("buttons.main.help", "en") == "🆘 Help"
+    assert localizer.section("buttons.main", "uk")["create"] == "➕ Створити"
+
+
+def test_fallback_chain_is_resolved_ahead(tmp_path):
+    write_locale(tmp_path, "ru", 'greet: "Привет, {name}"\nbye: "Пока"\nmenu:\n  a: "А"\n')
+    write_locale(tmp_path, "en", 'greet: "Hi, {name}"\n')
+    localizer = Localizer(tmp_path, "ru")
+    assert localizer.missing_keys() == {"en": ["bye", "menu.a"]}
+    assert localizer.translate("greet", "en", name="Ann") == "Hi, Ann"
+    assert localizer.translate("bye", "en") == "Пока"
+    assert localizer.translate("greet", "en-GB", name="Bob") == "Hi, Bob"
+    assert localizer.translate("greet", "de", name="Ann") == "Привет, Ann"
+    assert localizer.section("menu", "en") == {"a": "А"}
+    with pytest.raises(KeyError):
+        localizer.translate("missing", "en")
+
+
+def test_reload_on_file_change(tmp_path):
+    write_locale(tmp_path, "ru", 'greet: "Привет"\n', mtime=1_000)
+    localizer = Localizer(tmp_path, "ru")
+    reloads = []
+    localizer.on_reload(lambda: reloads.append(localizer.translate("greet")))
+    assert not localizer.reload_if_changed()
+
+    write_locale(tmp_path, "ru", 'greet: "Здравствуйте"\n', mtime=2_000)
+    assert localizer.reload_if_changed()
+    assert reloads == ["Здравствуйте"]
+
+    # Сломанный файл не роняет бота: остаются прежние каталоги
+    write_locale(tmp_path, "ru", "greet: [unclosed\n", mtime=3_000)
+    assert not localizer.reload_if_changed()
+    assert localizer.translate("greet") == "Здравствуйте"
+    assert not localizer.reload_if_changed()
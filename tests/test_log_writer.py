@@ -0,0 +1,96 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from reminderbot.infrastructure.db.base import Base
+from reminderbot.infrastructure.db.models import Reminder, ReminderEventStatus, ReminderLog, User
+from reminderbot.infrastructure.repos.log_writer import ReminderLogWriter
+from reminderbot.infrastructure.repos.reminders import ReminderLogRepository
+
+
+@pytest.fixture
+async def factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'logs.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with factory() as session:
+        user = User(telegram_id=1)
+        session.add(user)
+        await session.flush()
+        session.add(Reminder(id=1, user_id=user.id, title="T", scheduled_at=datetime.now(timezone.utc)))
+        await session.commit()
+    yield factory
+    await engine.dispose()
+
+
+def make_log() -> ReminderLog:
+    now = datetime.now(timezone.utc)
+    return ReminderLog(reminder_id=1, scheduled_for=now, processed_at=now, status=ReminderEventStatus.SENT)
+
+
+async def count_logs(factory) -> int:
+    async with factory() as session:
+        return await session.scalar(select(func.count()).select_from(ReminderLog))
+
+
+@pytest.mark.asyncio
+async def test_log_writer_flushes_by_size_and_on_close(factory):
+    writer = ReminderLogWriter(factory, max_batch=3, flush_interval=60)
+    writer.start()
+    for _ in range(3):
+        await writer.add(make_log())
+    await asyncio.sleep(0.1)
+    assert await count_logs(factory) == 3
+    await writer.add(make_log())
+    assert writer.pending == 1
+    await writer.close()
+    assert await count_logs(factory) == 4
+    with pytest.raises(RuntimeError):
+        await writer.add(make_log())
+
+
+@pytest.mark.asyncio
+async def test_log_writer_applies_backpressure_and_flushes_by_time(factory):
+    writer = ReminderLogWriter(factory, max_batch=100, flush_interval=0.05, max_pending=2)
+    writer.start()
+    await writer.add(make_log())
+    await writer.add(make_log())
+    blocked = asyncio.create_task(writer.add(make_log()))
+    await asyncio.sleep(0)
+    assert not blocked.done()
+    await asyncio.wait_for(blocked, timeout=1)
+    await writer.close()
+    assert await count_logs(factory) == 3
+
+
+@pytest.mark.asyncio
+async def test_log_writer_keeps_failed_batch(factory, monkeypatch):
+    writer = ReminderLogWriter(factory, max_batch=100, flush_interval=60, max_pending=2)
+    original = ReminderLogRepository.add_many
+    calls = 0
+
+    async def flaky(self, rows):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise OperationalError("INSERT", {}, Exception("database is locked"))
+        await original(self, rows)
+
+    monkeypatch.setattr(ReminderLogRepository, "add_many", flaky)
+    await writer.add(make_log())
+    await writer.add(make_log())
+    await writer.flush()
+    assert writer.pending == 2
+    # Пачка по-прежнему занимает места в буфере
+    blocked = asyncio.create_task(writer.add(make_log()))
+    await asyncio.sleep(0)
+    assert not blocked.done()
+    await writer.flush()
+    await asyncio.wait_for(blocked, timeout=1)
+    await writer.close()
+    assert await count_logs(factory) == 3
@@ -0,0 +1,67 @@
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from reminderbot.app.middlewares.db import DatabaseSessionMiddleware
+from reminderbot.app.middlewares.services import ServiceMiddleware
+from reminderbot.domain.profile_cache import ProfileCache
+from reminderbot.infrastructure.db.models import User
+from tests.db import create_test_engine
+
+
+@pytest.fixture
+async def factory():
+    engine = await create_test_engine()
+    inner = async_sessionmaker(engine, expire_on_commit=False)
+    opened: list[object] = []
+
+    def counting_factory():
+        opened.append(inner())
+        return opened[-1]
+
+    counting_factory.opened = opened
+    counting_factory.inner = inner
+    yield counting_factory
+    await engine.dispose()
+
+
+async def run_update(factory, handler, cache=None):
+    """Прогоняет апдейт через DB- и сервисный middleware, как это делает диспетчер."""
+
+    services = ServiceMiddleware(settings=None, renderer=None, scheduler=None, profile_cache=cache)
+    database = DatabaseSessionMiddleware(factory)
+
+    async def with_services(event, data):
+        return await services(handler, event, data)
+
+    return await database(with_services, SimpleNamespace(), {"bot": None})
+
+
+@pytest.mark.asyncio
+async def test_idle_update_opens_no_session(factory):
+    async def noop(event, data):
+        return "ok"
+
+    assert await run_update(factory, noop) == "ok"
+    assert factory.opened == []
+
+
+@pytest.mark.asyncio
+async def test_cached_profile_read_opens_no_session(factory):
+    cache = ProfileCache()
+
+    async def start(event, data):
+        return await data["user_service"].get_or_create_user(5, "Eve", None, "en")
+
+    async def read_locale(event, data):
+        return (await data["user_service"].get_profile(5)).language
+
+    await run_update(factory, start, cache)
+    assert len(factory.opened) == 1
+    assert await run_update(factory, read_locale, cache) == "en"
+    assert len(factory.opened) == 1
+    # Запись из первого апдейта зафиксирована
+    async with factory.inner() as session:
+        assert (await session.execute(select(User.full_name))).scalar_one() == "Eve"
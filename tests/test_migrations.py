@@ -0,0 +1,96 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from reminderbot.config import get_settings
+from reminderbot.infrastructure.db.base import Base
+from tests.db import database_url
+
+ALEMBIC_DIR = Path(__file__).resolve().parents[1] / "alembic"
+
+
+async def _inspect(url: str, drop: bool = False) -> dict[str, set[str]]:
+    """Таблицы и индексы схемы; ``drop`` сначала очищает общую БД."""
+
+    engine = create_async_engine(url)
+    try:
+        async with engine.begin() as conn:
+            if drop:
+                await conn.run_sync(Base.metadata.drop_all)
+                await conn.execute(text("DROP TABLE IF EXISTS alembic_version"))
+
+            def collect(sync_conn) -> dict[str, set[str]]:
+                inspector = inspect(sync_conn)
+                return {
+                    table: {index["name"] for index in inspector.get_indexes(table)}
+                    for table in inspector.get_table_names()
+                }
+
+            return await conn.run_sync(collect)
+    finally:
+        await engine.dispose()
+
+
+@pytest.fixture
+def alembic_config(tmp_path, monkeypatch):
+    url = database_url(f"sqlite+aiosqlite:///{tmp_path / 'migrations.db'}")
+    monkeypatch.setenv("BOT_TOKEN", "test")
+    monkeypatch.setenv("DATABASE_URL", url)
+    get_settings.cache_clear()
+    asyncio.run(_inspect(url, drop=True))
+    config = Config()
+    config.set_main_option("script_location", str(ALEMBIC_DIR))
+    yield config, url
+    get_settings.cache_clear()
+
+
+def test_migrations_upgrade_and_downgrade(alembic_config):
+    # Синхронный тест: env.py сам запускает event loop через asyncio.run
+    config, url = alembic_config
+    command.upgrade(config, "head")
+    schema = asyncio.run(_inspect(url))
+    assert {"user", "reminder", "reminderrule", "reminderlog", "reminderdelivery"} <= set(schema)
+    assert {"ix_reminder_next_run_at", "ix_reminder_user_id_scheduled_at"} <= schema["reminder"]
+    assert not {"ix_reminder_active_scheduled_at", "ix_reminder_status_scheduled_at"} & schema["reminder"]
+    assert "ix_reminderdelivery_occurrence_at" in schema["reminderdelivery"]
+
+    command.downgrade(config, "base")
+    assert set(asyncio.run(_inspect(url))) == {"alembic_version"}
+
+
+def test_next_run_at_backfill(alembic_config):
+    config, url = alembic_config
+    command.upgrade(config, "0003_hot_query_indexes")
+
+    async def fill() -> None:
+        engine = create_async_engine(url)
+        async with engine.begin() as conn:
+            await conn.execute(text("INSERT INTO \"user\" (id, telegram_id, timezone) VALUES (1, 1, 'Europe/Moscow')"))
+            await conn.execute(text("INSERT INTO reminderrule (id, kind, interval) VALUES (1, 'DAILY', 1)"))
+            await conn.execute(
+                text(
+                    "INSERT INTO reminder (id, user_id, rule_id, title, scheduled_at, status) VALUES "
+                    "(1, 1, 1, 'daily', '2020-01-01 06:00:00', 'ACTIVE'), "
+                    "(2, 1, NULL, 'past', '2020-01-01 06:00:00', 'ACTIVE'), "
+                    "(3, 1, 1, 'closed', '2020-01-01 06:00:00', 'CLOSED')"
+                )
+            )
+        await engine.dispose()
+
+    async def next_runs() -> dict[int, object]:
+        engine = create_async_engine(url)
+        async with engine.connect() as conn:
+            rows = (await conn.execute(text("SELECT id, next_run_at FROM reminder ORDER BY id"))).all()
+        await engine.dispose()
+        return dict(rows)
+
+    asyncio.run(fill())
+    command.upgrade(config, "0004_next_run_at")
+    runs = asyncio.run(next_runs())
+    # Ежедневное получает ближайшее будущее срабатывание, прошедшее разовое и закрытое — ничего
+    assert runs[1] is not None and runs[2] is None and runs[3] is None
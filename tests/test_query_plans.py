@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from reminderbot.infrastructure.db.base import Base
+from reminderbot.infrastructure.db.models import Reminder, ReminderRule, RepeatKind, User
+from reminderbot.infrastructure.repos.reminders import ReminderLogRepository, ReminderRepository
+from reminderbot.infrastructure.repos.users import UserRepository
+
+
+@pytest.fixture
+async def captured():
+    """Сессия, которая запоминает все выполненные SELECT вместе с параметрами."""
+
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    statements: list[tuple[str, tuple]] = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def remember(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with factory() as session:
+        user = User(telegram_id=7)
+        rule = ReminderRule(kind=RepeatKind.DAILY)
+        session.add_all([user, rule])
+        await session.flush()
+        session.add(Reminder(user_id=user.id, rule_id=rule.id, title="T", scheduled_at=datetime.now(timezone.utc)))
+        await session.commit()
+        statements.clear()
+        yield session, statements
+    await engine.dispose()
+
+
+async def explain(session, statements) -> list[str]:
+    connection = await session.connection()
+    plans = []
+    for statement, parameters in statements:
+        result = await connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        plans.extend(f"{row[-1]}  <- {statement.split(chr(10))[0]}" for row in result)
+    return plans
+
+
+def assert_no_scans(plans: list[str]) -> None:
+    scans = [plan for plan in plans if plan.startswith("SCAN")]
+    assert plans and not scans, "\n".join(scans)
+
+
+async def collect_plans(session, statements, call) -> list[str]:
+    statements.clear()
+    await call
+    return await explain(session, list(statements))
+
+
+@pytest.mark.asyncio
+async def test_reminder_hot_queries_use_indexes(captured):
+    session, statements = captured
+    reminders = ReminderRepository(session)
+    assert_no_scans(await collect_plans(session, statements, reminders.get_by_id(1)))
+    assert_no_scans(await collect_plans(session, statements, reminders.list_for_user(1)))
+    assert_no_scans(await collect_plans(session, statements, reminders.page_for_user(1, limit=10)))
+    assert_no_scans(await collect_plans(session, statements, reminders.page_for_user(1, after=1, limit=10)))
+    assert_no_scans(await collect_plans(session, statements, reminders.list_due([1, 2, 3])))
+
+    now = datetime.now(timezone.utc)
+
+    async def stream_next_runs() -> None:
+        async for _ in reminders.iter_next_runs(now, batch_size=10):
+            pass
+
+    assert_no_scans(await collect_plans(session, statements, stream_next_runs()))
+    assert_no_scans(await collect_plans(session, statements, reminders.list_upcoming(now, now + timedelta(hours=1))))
+
+
+@pytest.mark.asyncio
+async def test_log_and_user_lookups_use_indexes(captured):
+    session, statements = captured
+    assert_no_scans(await collect_plans(session, statements, ReminderLogRepository(session).list_for_reminder(1)))
+    assert_no_scans(await collect_plans(session, statements, UserRepository(session).get_by_telegram_id(7)))
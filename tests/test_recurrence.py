@@ -0,0 +1,194 @@
+import itertools
+import random
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from reminderbot.domain.models import ReminderRuleDTO
+from reminderbot.domain.recurrence import RecurrenceRule, iter_occurrences, last_occurrence, next_occurrence
+from reminderbot.infrastructure.db.models import RepeatKind
+
+TIMEZONES = ["UTC", "Europe/Moscow", "Europe/Berlin", "America/New_York", "Asia/Kolkata", "Australia/Lord_Howe"]
+
+
+# --- Эталон: пошаговая реализация из ReminderService до перехода на арифметику ---
+
+
+def legacy_next(base, reference, kind, interval, custom_minutes, weekday_mask, monthday):
+    if kind == RepeatKind.DAILY:
+        next_time = base
+        while next_time <= reference:
+            next_time += timedelta(days=interval)
+        return next_time
+    if kind == RepeatKind.WEEKLY:
+        weekdays = weekday_mask or [base.weekday()]
+        return legacy_next_weekly(reference, base, weekdays, interval)
+    if kind == RepeatKind.MONTHLY:
+        return legacy_next_monthly(reference, base, monthday or base.day, interval)
+    if kind == RepeatKind.CUSTOM and custom_minutes:
+        next_time = base
+        delta = timedelta(minutes=custom_minutes)
+        while next_time <= reference:
+            next_time += delta
+        return next_time
+    return None
+
+
+def legacy_next_weekly(reference, base, weekdays, interval):
+    weekdays = sorted(set(weekdays))
+    candidate = base
+    while candidate <= reference:
+        for weekday in weekdays:
+            delta_days = (weekday - candidate.weekday()) % 7
+            test = candidate + timedelta(days=delta_days)
+            test = test.replace(hour=base.hour, minute=base.minute, second=base.second, microsecond=0)
+            if test > reference:
+                return test
+        candidate += timedelta(days=7 * interval)
+    return candidate
+
+
+def legacy_next_monthly(reference, base, monthday, interval):
+    year = base.year
+    month = base.month
+    candidate = base
+    while candidate <= reference:
+        month += interval
+        year += (month - 1) // 12
+        month = ((month - 1) % 12) + 1
+        day = min(monthday, legacy_days_in_month(year, month))
+        candidate = candidate.replace(year=year, month=month, day=day)
+    return candidate
+
+
+def legacy_days_in_month(year, month):
+    if month == 2:
+        if year % 4 == 0 and (year % 100 != 0 or year % 400 == 0):
+            return 29
+        return 28
+    if month in {4, 6, 9, 11}:
+        return 30
+    return 31
+
+
+# --- Генерация случаев ---
+
+
+def random_case(rng: random.Random):
+    tz = ZoneInfo(rng.choice(TIMEZONES))
+    kind = rng.choice([RepeatKind.NONE, RepeatKind.DAILY, RepeatKind.WEEKLY, RepeatKind.MONTHLY, RepeatKind.CUSTOM])
+    base = datetime(
+        rng.randint(2016, 2025),
+        rng.randint(1, 12),
+        rng.randint(1, 28),
+        rng.randint(0, 23),
+        rng.choice([0, 15, 30, 45, rng.randint(0, 59)]),
+        rng.choice([0, 0, rng.randint(0, 59)]),
+        rng.choice([0, 0, rng.randint(0, 999_999)]),
+        tzinfo=tz,
+        fold=rng.randint(0, 1),
+    )
+    interval = rng.randint(1, 4)
+    custom_minutes = rng.choice([None, 1, 5, 7, 30, 90, 1440, 10_000])
+    weekday_mask = rng.choice([None, [], [base.weekday()], rng.sample(range(7), rng.randint(1, 7))])
+    monthday = rng.choice([None, 1, 15, 28, 29, 30, 31])
+    # Для минутного шага держим горизонт небольшим, чтобы эталон не считал вечно
+    if kind == RepeatKind.CUSTOM and custom_minutes and custom_minutes < 60:
+        span = timedelta(days=rng.randint(0, 20))
+    else:
+        span = timedelta(days=rng.randint(0, 3 * 365))
+    reference = base - timedelta(hours=rng.randint(0, 48)) if rng.random() < 0.1 else base + span
+    reference += timedelta(seconds=rng.randint(-3600, 3600), microseconds=rng.randint(0, 999_999))
+    return base, reference, kind, interval, custom_minutes, weekday_mask, monthday
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_matches_legacy_stepping(seed):
+    rng = random.Random(seed)
+    for _ in range(400):
+        case = random_case(rng)
+        expected = legacy_next(*case)
+        actual = next_occurrence(*case)
+        assert actual == expected, case
+        if expected is not None:
+            assert (actual.tzinfo, actual.fold) == (expected.tzinfo, expected.fold), case
+            assert actual.utcoffset() == expected.utcoffset(), case
+
+
+def test_exact_boundaries():
+    tz = ZoneInfo("Europe/Moscow")
+    base = datetime(2024, 1, 31, 9, 0, tzinfo=tz)
+    for reference in (base, base + timedelta(days=10), base + timedelta(days=10, microseconds=1)):
+        for kind in (RepeatKind.DAILY, RepeatKind.WEEKLY, RepeatKind.MONTHLY):
+            case = (base, reference, kind, 1, None, [0, 2, 4], 31)
+            assert next_occurrence(*case) == legacy_next(*case)
+
+
+def test_old_minute_rule_is_constant_time():
+    tz = ZoneInfo("UTC")
+    base = datetime(2000, 1, 1, tzinfo=tz)
+    reference = datetime(2025, 6, 1, 12, 3, tzinfo=tz)
+    assert next_occurrence(base, reference, RepeatKind.CUSTOM, 1, 5) == datetime(2025, 6, 1, 12, 5, tzinfo=tz)
+
+
+def test_non_positive_interval_yields_none():
+    tz = ZoneInfo("UTC")
+    base = datetime(2024, 1, 1, tzinfo=tz)
+    reference = base + timedelta(days=3)
+    for kind in (RepeatKind.DAILY, RepeatKind.WEEKLY, RepeatKind.MONTHLY):
+        assert next_occurrence(base, reference, kind, 0) is None
+
+
+def test_iter_occurrences_from_dto_is_lazy_and_bounded():
+    rule = ReminderRuleDTO(
+        id=1,
+        kind="weekly",
+        interval=1,
+        custom_interval_minutes=None,
+        weekday_mask=[0, 2],
+        monthday=None,
+    )
+    start = datetime(2024, 3, 4, 10, 0)  # понедельник, наивное время трактуется в зоне пользователя
+    occurrences = iter_occurrences(datetime(2024, 3, 4, 9, 0), rule, "Europe/Moscow", start=start)
+    first = list(itertools.islice(occurrences, 3))
+    tz = ZoneInfo("Europe/Moscow")
+    assert first == [
+        datetime(2024, 3, 6, 9, 0, tzinfo=tz),
+        datetime(2024, 3, 11, 9, 0, tzinfo=tz),
+        datetime(2024, 3, 13, 9, 0, tzinfo=tz),
+    ]
+    bounded = iter_occurrences(
+        datetime(2024, 3, 4, 9, 0),
+        RecurrenceRule.from_rule(rule),
+        tz,
+        start=start,
+        end=datetime(2024, 3, 11, 9, 0, tzinfo=tz),
+    )
+    assert len(list(bounded)) == 2
+    naive_end = iter_occurrences(datetime(2024, 3, 4, 9, 0), rule, tz, start=start, end=datetime(2024, 3, 11, 9, 0))
+    assert list(naive_end) == first[:2]
+
+
+def test_iter_occurrences_one_shot_and_limit():
+    tz = ZoneInfo("UTC")
+    start = datetime(2024, 1, 1, tzinfo=tz)
+    assert list(iter_occurrences(start + timedelta(hours=1), None, tz, start=start)) == [start + timedelta(hours=1)]
+    assert list(iter_occurrences(start - timedelta(hours=1), None, tz, start=start)) == []
+    daily = RecurrenceRule(RepeatKind.DAILY)
+    assert len(list(iter_occurrences(start, daily, tz, start=start, limit=5))) == 5
+
+
+@pytest.mark.parametrize("seed", range(2))
+def test_last_occurrence_matches_enumeration(seed):
+    rng = random.Random(seed)
+    for _ in range(300):
+        base, reference, kind, interval, custom_minutes, weekday_mask, monthday = random_case(rng)
+        reference = min(reference, base + timedelta(days=120))
+        rule = RecurrenceRule(kind, interval, custom_minutes, tuple(weekday_mask or ()), monthday)
+        expected = None
+        if base <= reference:
+            expected = base
+            for expected in iter_occurrences(base, rule, base.tzinfo, start=base, end=reference):
+                pass
+        assert last_occurrence(base, rule, base.tzinfo, reference) == expected
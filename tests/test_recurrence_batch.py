@@ -0,0 +1,80 @@
+import random
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from reminderbot.domain.recurrence import RecurrenceRule, next_occurrence
+from reminderbot.domain.recurrence_batch import KIND_CODES, RuleArrays, compute_next_runs, next_fire_epochs
+from reminderbot.infrastructure.db.models import RepeatKind
+from tests.test_recurrence import random_case
+
+
+def scalar_next_run(item, now):
+    scheduled, snoozed, rule, tz_name = item
+    tz = ZoneInfo(tz_name)
+    reference = now.astimezone(tz)
+    if snoozed is not None and snoozed > reference:
+        return snoozed.astimezone(tz)
+    if scheduled > reference:
+        return scheduled
+    return rule.next_after(scheduled, reference) if rule is not None else None
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_compute_next_runs_matches_scalar_path(seed):
+    rng = random.Random(seed)
+    now = datetime(2019 + seed * 2, rng.randint(1, 12), rng.randint(1, 28), rng.randint(0, 23), tzinfo=timezone.utc)
+    items = []
+    for _ in range(2000):
+        base, _, kind, interval, custom_minutes, weekday_mask, monthday = random_case(rng)
+        rule = RecurrenceRule(kind, interval, custom_minutes, tuple(weekday_mask or ()), monthday)
+        snoozed = now + timedelta(minutes=rng.randint(-90, 90)) if rng.random() < 0.2 else None
+        items.append((base, snoozed, None if kind == RepeatKind.NONE else rule, base.tzinfo.key))
+    for item, actual in zip(items, compute_next_runs(items, now)):
+        expected = scalar_next_run(item, now)
+        assert actual == expected, item
+        if expected is not None:
+            assert (actual.fold, actual.utcoffset()) == (expected.fold, expected.utcoffset()), item
+
+
+def test_odd_rules_fall_back_to_scalar_path():
+    tz = ZoneInfo("Europe/Moscow")
+    now = datetime(2024, 5, 1, 12, 0, tzinfo=tz)
+    base = datetime(2024, 1, 1, 9, 0, tzinfo=tz)
+    odd_weekday = RecurrenceRule(RepeatKind.WEEKLY, weekday_mask=(0, 9))
+    bad_monthday = RecurrenceRule(RepeatKind.MONTHLY, monthday=-1)
+    result = compute_next_runs([(base, None, odd_weekday, "Europe/Moscow")], now)
+    assert result == [odd_weekday.next_after(base, now)]
+    with pytest.raises(ValueError):
+        compute_next_runs([(base, None, bad_monthday, "Europe/Moscow")], now)
+
+
+def test_next_fire_epochs_with_fixed_offsets():
+    now = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+    rules = [
+        (datetime(2024, 4, 1, 9, 0), RecurrenceRule(RepeatKind.DAILY, 2), 3 * 3600),
+        (datetime(2024, 4, 1, 9, 0), RecurrenceRule(RepeatKind.WEEKLY, 1, weekday_mask=(1, 4)), 19800),
+        (datetime(2024, 1, 31, 23, 30), RecurrenceRule(RepeatKind.MONTHLY, 1), -5 * 3600),
+        (datetime(2024, 4, 30, 0, 0), RecurrenceRule(RepeatKind.CUSTOM, custom_interval_minutes=45), 0),
+        (datetime(2024, 4, 30, 0, 0), RecurrenceRule(RepeatKind.NONE), 0),
+    ]
+    arrays = RuleArrays(
+        base=np.array([(wall - timedelta(seconds=offset)).replace(tzinfo=timezone.utc).timestamp() for wall, _, offset in rules]),
+        kind=np.array([KIND_CODES[rule.kind] for _, rule, _ in rules]),
+        interval=np.array([rule.interval for _, rule, _ in rules]),
+        custom_minutes=np.array([rule.custom_interval_minutes or 0 for _, rule, _ in rules]),
+        weekday_mask=np.array([sum(1 << day for day in rule.weekday_mask) for _, rule, _ in rules]),
+        monthday=np.zeros(len(rules), dtype=np.int64),
+        tz_offset=np.array([offset for *_, offset in rules]),
+        snooze=np.array([np.nan, np.nan, np.nan, now.timestamp() + 60, np.nan]),
+    )
+    epochs = next_fire_epochs(arrays, now.timestamp())
+    for (wall, rule, offset), epoch in zip(rules[:3], epochs[:3]):
+        tz = timezone(timedelta(seconds=offset))
+        expected = next_occurrence(wall.replace(tzinfo=tz), now.astimezone(tz), rule.kind, rule.interval, None, rule.weekday_mask)
+        assert epoch == expected.timestamp()
+    assert epochs[3] == now.timestamp() + 60
+    assert np.isnan(epochs[4])
@@ -4,17 +4,28 @@ from pathlib import Path
 from zoneinfo import ZoneInfo
 
 import pytest
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from reminderbot.domain.models import ReminderCreate
-from reminderbot.infrastructure.db.base import Base
-from reminderbot.infrastructure.db.models import ReminderStatus, RepeatKind, User
+from reminderbot.infrastructure.db.models import (
+    DeliveryStatus,
+    Reminder,
+    ReminderDelivery,
+    ReminderEventStatus,
+    ReminderLog,
+    ReminderStatus,
+    RepeatKind,
+    User,
+)
+from reminderbot.infrastructure.repos.deliveries import DeliveryLedgerRepository
 from reminderbot.infrastructure.repos.reminders import ReminderLogRepository, ReminderRepository
 from reminderbot.infrastructure.repos.rules import ReminderRuleRepository
 from reminderbot.infrastructure.repos.users import UserRepository
 from reminderbot.presentation.localization import Localizer
 from reminderbot.presentation.messages import ReminderRenderer
 from reminderbot.domain.services.reminders import ReminderService
+from tests.db import create_test_engine, database_url, is_postgres
 
 
 class DummyScheduler:
@@ -30,9 +41,7 @@ class DummyScheduler:
 
 @pytest.fixture(scope="module")
 async def engine():
-    eng = create_async_engine("sqlite+aiosqlite:///:memory:", future=True)
-    async with eng.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    eng = await create_test_engine()
     yield eng
     await eng.dispose()
 
@@ -109,3 +118,245 @@ async def test_quiet_hours_delays(reminder_service: ReminderService, scheduler:
     await reminder_service.process_and_reschedule(reminder.id)
     assert reminder.snooze_until is not None
     assert reminder.snooze_until.hour == 7
+
+
+@pytest.mark.asyncio
+async def test_process_due_loads_batch_and_skips_closed(reminder_service: ReminderService):
+    user = await reminder_service.users.get_by_telegram_id(1)
+    assert user is not None
+    sent: list[tuple[int, str]] = []
+
+    async def sender(chat_id: int, text: str) -> None:
+        sent.append((chat_id, text))
+
+    reminder_service.sender = sender
+    past = datetime.now(tz=ZoneInfo("UTC")) - timedelta(minutes=1)
+    first = await reminder_service.create_reminder(user.id, ReminderCreate(title="A", scheduled_at=past))
+    second = await reminder_service.create_reminder(user.id, ReminderCreate(title="B", scheduled_at=past))
+    await reminder_service.close(second.id)
+    processed = await reminder_service.process_due([first.id, second.id, 10_000])
+    assert processed == 1
+    assert [chat_id for chat_id, _ in sent] == [1]
+
+
+def build_service(session: AsyncSession, renderer: ReminderRenderer, sent: list[int]) -> ReminderService:
+    async def sender(chat_id: int, text: str) -> None:
+        await asyncio.sleep(0.01)
+        sent.append(chat_id)
+
+    return ReminderService(
+        ReminderRepository(session),
+        ReminderRuleRepository(session),
+        ReminderLogRepository(session),
+        UserRepository(session),
+        renderer,
+        sender,
+        DeliveryLedgerRepository(session),
+    )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_dispatchers_send_occurrence_once(tmp_path, renderer: ReminderRenderer):
+    # Два движка на один файл — как два процесса с общей БД
+    url = database_url(f"sqlite+aiosqlite:///{tmp_path / 'shared.db'}")
+    engines = [await create_test_engine(url, reset=False), create_async_engine(url)]
+    factories = [async_sessionmaker(engine, expire_on_commit=False) for engine in engines]
+    occurrence = datetime.now(tz=ZoneInfo("UTC")).replace(microsecond=0) - timedelta(minutes=1)
+    async with factories[0]() as session:
+        user = User(telegram_id=42, timezone="Europe/Moscow")
+        session.add(user)
+        await session.flush()
+        reminders = [
+            Reminder(user_id=user.id, title=f"R{index}", scheduled_at=occurrence, status=ReminderStatus.ACTIVE)
+            for index in range(3)
+        ]
+        session.add_all(reminders)
+        await session.commit()
+    due = {reminder.id: occurrence for reminder in reminders}
+
+    sent: list[int] = []
+
+    async def dispatch(factory) -> None:
+        async with factory() as session:
+            await build_service(session, renderer, sent).process_due(due)
+            await session.commit()
+
+    await asyncio.gather(*(dispatch(factory) for factory in factories))
+    # Повторный прогон того же окна (например, после рестарта) тоже ничего не шлёт
+    await dispatch(factories[1])
+    assert sent == [42, 42, 42]
+
+    async with factories[0]() as session:
+        stmt = select(ReminderDelivery).where(ReminderDelivery.reminder_id.in_(due))
+        deliveries = (await session.execute(stmt)).scalars().all()
+    assert sorted(delivery.reminder_id for delivery in deliveries) == sorted(due)
+    assert {delivery.status for delivery in deliveries} == {DeliveryStatus.SENT}
+    for engine in engines:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_failed_delivery_is_logged_and_retried(
+    reminder_service: ReminderService, scheduler: DummyScheduler, session: AsyncSession
+):
+    user = await reminder_service.users.get_by_telegram_id(1)
+    loop = asyncio.get_running_loop()
+
+    async def sender(chat_id: int, text: str) -> asyncio.Future:
+        # Как очередь доставки: постановка удалась, а отправка — нет
+        receipt = loop.create_future()
+        loop.call_soon(receipt.set_exception, RuntimeError("chat not found"))
+        return receipt
+
+    reminder_service.sender = sender
+    past = datetime.now(tz=ZoneInfo("UTC")) - timedelta(minutes=1)
+    created = await reminder_service.create_reminder(user.id, ReminderCreate(title="F", scheduled_at=past))
+    await reminder_service.process_due([created.id])
+    # Пачка не ждёт квитанцию: итог записывается, когда она придёт
+    [pending] = reminder_service.pending_deliveries
+    assert (await session.execute(select(ReminderLog).where(ReminderLog.reminder_id == created.id))).first() is None
+    await reminder_service.settle_delivery(pending, await pending.outcome())
+    log = (await session.execute(select(ReminderLog).where(ReminderLog.reminder_id == created.id))).scalar_one()
+    assert log.status == ReminderEventStatus.FAILED
+    assert log.error_message == "chat not found"
+    # Неотправленное повторяется через 5 минут
+    assert scheduler.jobs[created.id] > datetime.now(tz=ZoneInfo("UTC")) + timedelta(minutes=4)
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not is_postgres(), reason="блокировки строк есть только в PostgreSQL")
+async def test_list_due_skips_rows_locked_by_another_dispatcher(engine):
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with factory() as session:
+        user = User(telegram_id=43, timezone="UTC")
+        session.add(user)
+        await session.flush()
+        reminders = [
+            Reminder(user_id=user.id, title=f"L{index}", scheduled_at=datetime.now(tz=ZoneInfo("UTC")))
+            for index in range(2)
+        ]
+        session.add_all(reminders)
+        await session.commit()
+    ids = [reminder.id for reminder in reminders]
+
+    async with factory() as first, factory() as second:
+        locked = await ReminderRepository(first).list_due(ids[:1])
+        # Второй диспетчер не ждёт блокировку, а получает только свободные строки
+        free = await asyncio.wait_for(ReminderRepository(second).list_due(ids), timeout=5)
+        assert [reminder.id for reminder in locked] == ids[:1]
+        assert [reminder.id for reminder in free] == ids[1:]
+        await first.rollback()
+        await second.rollback()
+
+
+@pytest.mark.asyncio
+async def test_next_run_at_follows_schedule_snooze_and_close(reminder_service: ReminderService, scheduler: DummyScheduler):
+    user = await reminder_service.users.get_by_telegram_id(1)
+    assert user is not None
+    base_time = datetime.now(tz=ZoneInfo("UTC")) - timedelta(days=1, minutes=-10)
+    created = await reminder_service.create_reminder(
+        user.id, ReminderCreate(title="Daily", scheduled_at=base_time, repeat_kind=RepeatKind.DAILY.value)
+    )
+    reminder = await reminder_service.reminders.get_by_id(created.id)
+    # SQLite возвращает DateTime без зоны; в колонке хранится UTC
+    assert reminder.next_run_at.replace(tzinfo=ZoneInfo("UTC")) == base_time + timedelta(days=1)
+    assert scheduler.jobs[created.id] == base_time + timedelta(days=1)
+
+    await reminder_service.snooze(created.id, 3)
+    assert reminder.status == ReminderStatus.SNOOZED
+    assert reminder.next_run_at == reminder.snooze_until == scheduler.jobs[created.id]
+
+    upcoming = await reminder_service.list_upcoming(timedelta(minutes=5))
+    assert created.id in [item.id for item in upcoming]
+
+    await reminder_service.close(created.id)
+    assert reminder.next_run_at is None
+    assert created.id not in scheduler.jobs
+
+
+@pytest.mark.asyncio
+async def test_snoozed_reminder_runs_at_snooze_time(reminder_service: ReminderService, scheduler: DummyScheduler):
+    user = await reminder_service.users.get_by_telegram_id(1)
+    now = datetime.now(tz=ZoneInfo("UTC"))
+    created = await reminder_service.create_reminder(
+        user.id, ReminderCreate(title="Snooze", scheduled_at=now - timedelta(hours=1), repeat_kind=RepeatKind.DAILY.value)
+    )
+    reminder = await reminder_service.reminders.get_by_id(created.id)
+    reminder.status = ReminderStatus.SNOOZED
+    reminder.snooze_until = now + timedelta(minutes=10)
+    # Раньше SNOOZED давал None: отложенное и перенесённое тихими часами не срабатывало
+    assert await reminder_service.compute_next_run(reminder) == reminder.snooze_until
+    # Истёкшая пауза уступает правилу повтора
+    reminder.snooze_until = now - timedelta(minutes=10)
+    assert await reminder_service.compute_next_run(reminder) == now - timedelta(hours=1) + timedelta(days=1)
+    reminder.status = ReminderStatus.CLOSED
+    assert await reminder_service.compute_next_run(reminder) is None
+
+
+@pytest.mark.asyncio
+async def test_list_page_renders_as_one_message(reminder_service: ReminderService, renderer: ReminderRenderer):
+    user = await reminder_service.users.get_by_telegram_id(1)
+    start = datetime(2030, 5, 1, 9, 0, tzinfo=ZoneInfo("UTC"))
+    for index in range(3):
+        await reminder_service.create_reminder(
+            user.id, ReminderCreate(title=f"Пункт {index}", scheduled_at=start + timedelta(days=index))
+        )
+    page = await reminder_service.list_user_page(user.id, limit=2)
+    assert page.has_next and not page.has_prev
+    text = renderer.render_list_page(page.items, "ru", "UTC")
+    lines = text.split("\n")
+    assert lines[0] == "Ваши активные напоминания:"
+    assert lines[1] == f"#{page.items[0].id}: Пункт 0 — активно (01.05.2030 09:00)"
+    assert len(lines) == 3
+    # Курсор удалённого напоминания возвращает к первой странице
+    stale = await reminder_service.list_user_page(user.id, after=10**9, limit=2)
+    assert [r.id for r in stale.items] == [r.id for r in page.items]
+
+
+@pytest.mark.asyncio
+async def test_list_page_shows_wall_time_in_user_zone(
+    reminder_service: ReminderService, renderer: ReminderRenderer, session: AsyncSession
+):
+    user = await reminder_service.users.add(User(telegram_id=3, timezone="Asia/Tokyo", language="ru"))
+    created = await reminder_service.create_reminder(
+        user.id, ReminderCreate(title="Токио", scheduled_at=datetime(2030, 5, 1, 9, 0, tzinfo=ZoneInfo("Asia/Tokyo")))
+    )
+    reminder = await reminder_service.reminders.get_by_id(created.id)
+    # Перечитываем из базы: на SQLite время возвращается без зоны
+    await session.refresh(reminder, ["scheduled_at"])
+    text = renderer.render_list_page([reminder], "ru", "Asia/Tokyo")
+    assert text.split("\n")[1].endswith("(01.05.2030 09:00)")
+
+
+@pytest.mark.asyncio
+async def test_digest_merges_reminders_firing_together(
+    reminder_service: ReminderService, scheduler: DummyScheduler, session: AsyncSession
+):
+    owner = await reminder_service.users.get_by_telegram_id(1)
+    other = await reminder_service.users.add(User(telegram_id=2, timezone="UTC", language="en"))
+    messages: list[tuple[int, str, dict]] = []
+
+    async def sender(chat_id: int, text: str, **kwargs) -> None:
+        messages.append((chat_id, text, kwargs))
+
+    reminder_service.sender = sender
+    reminder_service.enable_digest(lambda user, items: [item.id for item in items])
+    now = datetime.now(tz=ZoneInfo("UTC"))
+    soon = now + timedelta(seconds=30)
+    due = {}
+    for title, user, when in (("A", owner, now), ("B", owner, now), ("C", owner, soon), ("D", other, soon)):
+        created = await reminder_service.create_reminder(user.id, ReminderCreate(title=title, scheduled_at=when))
+        due[created.id] = when
+    ids = list(due)
+
+    await reminder_service.process_due(due)
+    assert len(messages) == 1
+    chat_id, text, kwargs = messages[0]
+    assert chat_id == 1 and text.startswith("🔔 Напоминания (3):")
+    assert kwargs["reply_markup"] == ids[:3]
+    logs = (await session.execute(select(ReminderLog.reminder_id).order_by(ReminderLog.reminder_id))).scalars().all()
+    assert logs == ids[:3]
+    # Срабатывание из будущего без пары не отправлено раньше срока, а возвращено в очередь
+    assert scheduler.jobs[ids[3]] == soon
+    # Подтянутое раньше срока разовое напоминание не срабатывает повторно
+    assert ids[2] not in scheduler.jobs
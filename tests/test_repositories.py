@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from reminderbot.infrastructure.db.models import Reminder, User
+from reminderbot.infrastructure.repos.reminders import ReminderRepository
+from reminderbot.infrastructure.repos.users import UserRepository
+from tests.db import create_test_engine
+
+
+@pytest.fixture
+async def session():
+    engine = await create_test_engine()
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        yield session
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_add_many_and_bulk_update(session):
+    users = UserRepository(session)
+    ids = await users.add_many([{"telegram_id": 300 + index, "timezone": "UTC"} for index in range(5)])
+    assert len(ids) == 5
+    await users.bulk_update([{"id": ids[0], "timezone": "Europe/Moscow"}, {"id": ids[1], "is_active": False}])
+    rows = (await session.execute(select(User.id, User.timezone, User.is_active).where(User.id.in_(ids[:2])).order_by(User.id))).all()
+    assert [tuple(row) for row in rows] == [(ids[0], "Europe/Moscow", True), (ids[1], "UTC", False)]
+
+
+@pytest.mark.asyncio
+async def test_upsert_inserts_and_updates_in_one_statement(session):
+    users = UserRepository(session)
+    existing = await users.add(User(telegram_id=1, timezone="UTC", username="old"))
+    result = await users.upsert(
+        [{"telegram_id": 1, "username": "new"}, {"telegram_id": 2, "username": "fresh"}],
+        index_elements=["telegram_id"],
+    )
+    assert sorted((user.telegram_id, user.username) for user in result) == [(1, "new"), (2, "fresh")]
+    # Объект в сессии обновлён данными из RETURNING, а не остался со старыми
+    assert existing.username == "new"
+    skipped = await users.upsert([{"telegram_id": 1, "username": "ignored"}], ["telegram_id"], update_columns=[])
+    assert skipped == []
+    assert (await users.get_by_telegram_id(1)).username == "new"
+
+
+@pytest.mark.asyncio
+async def test_delete_where_and_iter_where(session):
+    users = UserRepository(session)
+    await users.add_many([{"telegram_id": 500 + index, "is_active": index % 2 == 0} for index in range(7)])
+    batches = [
+        [user.telegram_id for user in batch]
+        async for batch in users.iter_where(User.telegram_id >= 500, batch_size=3, order_by=[User.telegram_id])
+    ]
+    assert batches == [[500, 501, 502], [503, 504, 505], [506]]
+    assert await users.delete_where(User.telegram_id >= 500, is_active=False) == 3
+    assert [user.telegram_id for user in await users.list(is_active=False)] == []
+
+
+@pytest.mark.asyncio
+async def test_reminder_pages_follow_schedule_order(session):
+    users = UserRepository(session)
+    owner = await users.add(User(telegram_id=900))
+    other = await users.add(User(telegram_id=901))
+    start = datetime(2030, 1, 1, tzinfo=timezone.utc)
+    # Два напоминания на одно время: порядок внутри него задаёт id
+    times = [start + timedelta(hours=hours) for hours in (5, 1, 3, 3, 0, 4, 2)]
+    reminders = ReminderRepository(session)
+    await reminders.add_many([{"user_id": owner.id, "title": f"r{index}", "scheduled_at": at} for index, at in enumerate(times)])
+    await reminders.add(Reminder(user_id=other.id, title="foreign", scheduled_at=start))
+
+    first = await reminders.page_for_user(owner.id, limit=3)
+    assert [r.title for r in first.items] == ["r4", "r1", "r6"]
+    assert (first.has_prev, first.has_next) == (False, True)
+    second = await reminders.page_for_user(owner.id, after=first.items[-1].id, limit=3)
+    assert [r.title for r in second.items] == ["r2", "r3", "r5"]
+    last = await reminders.page_for_user(owner.id, after=second.items[-1].id, limit=3)
+    assert [r.title for r in last.items] == ["r0"]
+    assert (last.has_prev, last.has_next) == (True, False)
+    back = await reminders.page_for_user(owner.id, before=last.items[0].id, limit=3)
+    assert [r.title for r in back.items] == ["r2", "r3", "r5"]
+    assert (back.has_prev, back.has_next) == (True, True)
+    assert (await reminders.page_for_user(owner.id, before=first.items[0].id, limit=3)).items == []
@@ -0,0 +1,211 @@
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from reminderbot.domain.services.reminders import PendingDelivery
+from reminderbot.infrastructure.db.models import (
+    DeliveryStatus,
+    Reminder,
+    ReminderDelivery,
+    ReminderRule,
+    ReminderStatus,
+    RepeatKind,
+    User,
+)
+from reminderbot.infrastructure.scheduler import service as scheduler_module
+from reminderbot.infrastructure.scheduler.service import ReminderScheduler
+from reminderbot.infrastructure.scheduler.timers import TimerQueue
+from tests.db import create_test_engine
+
+
+def make_settings(**overrides) -> SimpleNamespace:
+    values = dict(
+        timezone="UTC",
+        scheduler_horizon_hours=0.0,
+        scheduler_sweep_minutes=30.0,
+        scheduler_batch_size=100,
+        scheduler_tick_seconds=0.02,
+        scheduler_dispatch_batch_size=2,
+        digest_enabled=False,
+        digest_window_seconds=60.0,
+        delivery_ledger_retention_days=0.0,
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def test_timer_queue_orders_and_replaces():
+    queue = TimerQueue()
+    queue.push(1, 30.0)
+    queue.push(2, 10.0)
+    queue.push(3, 20.0)
+    queue.push(2, 40.0)  # перепланирование вытесняет старый срок
+    assert queue.next_deadline() == 20.0
+    assert queue.pop_due(35.0) == [3, 1]
+    assert len(queue) == 1
+    assert queue.deadline(2) == 40.0
+
+
+def test_timer_queue_discard_is_lazy():
+    queue = TimerQueue()
+    for key in range(5):
+        queue.push(key, float(key))
+    assert queue.discard(0)
+    assert not queue.discard(0)
+    assert queue.next_deadline() == 1.0
+    assert queue.pop_due(10.0) == [1, 2, 3, 4]
+    assert queue.next_deadline() is None
+
+
+@pytest.mark.asyncio
+async def test_scheduler_dispatches_due_reminders_in_batches(monkeypatch):
+    batches: list[list[int]] = []
+
+    async def fake_dispatch(reminder_ids) -> list:
+        batches.append(list(reminder_ids))
+        return []
+
+    monkeypatch.setattr(scheduler_module, "run_due_reminders", fake_dispatch)
+    scheduler = ReminderScheduler(make_settings(), session_factory=None, bot=None, renderer=None)
+    scheduler.start()
+    now = datetime.now(tz=ZoneInfo("UTC"))
+    for reminder_id in (1, 4, 5):
+        scheduler.schedule_reminder(reminder_id, now - timedelta(seconds=reminder_id))
+    scheduler.schedule_reminder(2, now + timedelta(hours=1))
+    scheduler.schedule_reminder(3, now)
+    scheduler.remove_reminder(3)
+    await asyncio.sleep(0.1)
+    await scheduler.shutdown()
+    assert batches == [[5, 4], [1]]
+    assert 2 in scheduler.queue
+
+
+@pytest.mark.asyncio
+async def test_dispatch_does_not_wait_for_delivery_receipts(monkeypatch):
+    loop = asyncio.get_running_loop()
+    receipts = {1: loop.create_future(), 2: loop.create_future()}
+    batches: list[list[int]] = []
+    settled: list[tuple[int, object]] = []
+
+    async def fake_dispatch(due) -> list:
+        batches.append(list(due))
+        return [PendingDelivery([reminder_id], [], receipts[reminder_id]) for reminder_id in due]
+
+    async def fake_settle(pending: PendingDelivery) -> None:
+        settled.append((pending.reminder_ids[0], await pending.outcome()))
+
+    monkeypatch.setattr(scheduler_module, "run_due_reminders", fake_dispatch)
+    monkeypatch.setattr(scheduler_module, "settle_delivery", fake_settle)
+    scheduler = ReminderScheduler(make_settings(scheduler_dispatch_batch_size=1), session_factory=None, bot=None, renderer=None)
+    now = datetime.now(tz=ZoneInfo("UTC"))
+    scheduler.schedule_reminder(1, now - timedelta(seconds=2))
+    scheduler.schedule_reminder(2, now - timedelta(seconds=1))
+    scheduler.start()
+    await asyncio.sleep(0.1)
+    # Вторая пачка ушла, хотя квитанция первой ещё не пришла
+    assert batches == [[1], [2]]
+    receipts[1].set_result(None)
+    await asyncio.sleep(0)
+    await scheduler.stop()
+    started = loop.time()
+    # Квитанция второй так и не пришла: остановка ждёт не дольше таймаута
+    await scheduler.shutdown(timeout=0.1)
+    assert loop.time() - started < 1
+    assert settled == [(1, None)]
+
+
+@pytest.mark.asyncio
+async def test_digest_window_pulls_timers_due_soon(monkeypatch):
+    batches: list[list[int]] = []
+
+    async def fake_dispatch(due) -> list:
+        batches.append(list(due))
+        return []
+
+    monkeypatch.setattr(scheduler_module, "run_due_reminders", fake_dispatch)
+    settings = make_settings(digest_enabled=True, scheduler_dispatch_batch_size=10)
+    scheduler = ReminderScheduler(settings, session_factory=None, bot=None, renderer=None)
+    now = datetime.now(tz=ZoneInfo("UTC"))
+    scheduler.schedule_reminder(1, now - timedelta(seconds=1))
+    scheduler.schedule_reminder(2, now + timedelta(seconds=30))
+    scheduler.schedule_reminder(3, now + timedelta(minutes=5))
+    scheduler.start()
+    await asyncio.sleep(0.1)
+    await scheduler.shutdown()
+    assert batches == [[1, 2]]
+    assert list(scheduler.queue) == [3]
+
+
+@pytest.mark.asyncio
+async def test_resync_streams_only_horizon():
+    engine = await create_test_engine()
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+    now = datetime.now(tz=ZoneInfo("UTC"))
+    async with factory() as session:
+        user = User(telegram_id=1, timezone="UTC", language="ru")
+        session.add(user)
+        session.add_all(
+            [
+                Reminder(user=user, title="soon", scheduled_at=now + timedelta(hours=1), next_run_at=now + timedelta(hours=1)),
+                Reminder(user=user, title="later", scheduled_at=now + timedelta(days=2), next_run_at=now + timedelta(days=2)),
+                Reminder(
+                    user=user,
+                    title="daily",
+                    scheduled_at=now - timedelta(days=3) + timedelta(minutes=30),
+                    rule=ReminderRule(kind=RepeatKind.DAILY, interval=1),
+                    next_run_at=now + timedelta(minutes=30),
+                ),
+                Reminder(
+                    user=user,
+                    title="closed",
+                    scheduled_at=now + timedelta(minutes=5),
+                    status=ReminderStatus.CLOSED,
+                    next_run_at=now + timedelta(minutes=5),
+                ),
+                # Пропущенное за время простоя срабатывание уходит диспетчеру сразу
+                Reminder(user=user, title="missed", scheduled_at=now - timedelta(minutes=10), next_run_at=now - timedelta(minutes=10)),
+            ]
+        )
+        await session.commit()
+
+    scheduler = ReminderScheduler(
+        make_settings(scheduler_horizon_hours=6.0, scheduler_batch_size=2),
+        session_factory=factory,
+        bot=None,
+        renderer=None,
+    )
+    await scheduler.resync()
+    await engine.dispose()
+    assert sorted(scheduler.queue) == [1, 3, 5]
+    assert scheduler.queue.deadline(5) == pytest.approx((now - timedelta(minutes=10)).timestamp())
+
+
+@pytest.mark.asyncio
+async def test_prune_deliveries_drops_rows_past_retention():
+    engine = await create_test_engine()
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+    now = datetime.now(tz=ZoneInfo("UTC"))
+    async with factory() as session:
+        reminder = Reminder(user=User(telegram_id=1), title="r", scheduled_at=now)
+        session.add(reminder)
+        await session.flush()
+        session.add_all(
+            ReminderDelivery(reminder_id=reminder.id, occurrence_at=now - timedelta(days=days), status=DeliveryStatus.SENT)
+            for days in (1, 6, 8, 30)
+        )
+        await session.commit()
+
+    scheduler = ReminderScheduler(
+        make_settings(delivery_ledger_retention_days=7.0), session_factory=factory, bot=None, renderer=None
+    )
+    assert scheduler.prune_interval == 30 * 60
+    assert await scheduler.prune_deliveries() == 2
+    async with factory() as session:
+        kept = (await session.execute(select(ReminderDelivery.occurrence_at))).scalars().all()
+    await engine.dispose()
+    assert len(kept) == 2
@@ -0,0 +1,112 @@
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from reminderbot.domain.models import QuietHours, UserProfile
+from reminderbot.domain.profile_cache import ProfileCache
+from reminderbot.domain.services.users import UserService
+from reminderbot.infrastructure.repos.users import UserRepository
+from tests.db import create_test_engine
+
+
+@pytest.fixture
+async def engine():
+    engine = await create_test_engine()
+    yield engine
+    await engine.dispose()
+
+
+async def _run_scenario(engine) -> tuple[set[int], list[tuple]]:
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        service = UserService(UserRepository(session))
+        created = await service.get_or_create_user(7, "Ann", "ann", None)
+        renamed = await service.get_or_create_user(7, "Ann B", "", "en")
+        kept = await service.get_or_create_user(7, None, None, None)
+        await session.commit()
+        stored = await UserRepository(session).get_by_telegram_id(7)
+        profiles = (created, renamed, kept)
+        rows = [(profile.full_name, profile.language) for profile in profiles] + [(stored.username,)]
+        return {profile.id for profile in profiles}, rows
+
+
+@pytest.mark.asyncio
+async def test_get_or_create_user_is_one_statement(engine):
+    statements: list[str] = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        await UserService(UserRepository(session)).get_or_create_user(1, "Bob", "bob", "uk")
+    assert len(statements) == 1 and "ON CONFLICT" in statements[0]
+
+
+@pytest.mark.asyncio
+async def test_upsert_and_fallback_agree(engine, monkeypatch):
+    ids, upserted = await _run_scenario(engine)
+    # Пустые имя и username не затирают сохранённые, язык меняется только если передан
+    assert upserted == [("Ann", "ru"), ("Ann B", "en"), ("Ann B", "en"), ("ann",)]
+    assert len(ids) == 1
+
+    fallback_engine = await create_test_engine()
+    monkeypatch.setattr(UserRepository, "supports_upsert", property(lambda self: False))
+    assert (await _run_scenario(fallback_engine))[1] == upserted
+    await fallback_engine.dispose()
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_profile(telegram_id: int) -> UserProfile:
+    return UserProfile(
+        id=telegram_id,
+        telegram_id=telegram_id,
+        full_name=None,
+        username=None,
+        timezone="UTC",
+        language="ru",
+        is_active=True,
+        quiet_hours=QuietHours(start=None, end=None),
+    )
+
+
+def test_profile_cache_expires_and_evicts_least_recent():
+    clock = FakeClock()
+    cache = ProfileCache(max_size=2, ttl=10.0, clock=clock)
+    for telegram_id in (1, 2):
+        cache.put(make_profile(telegram_id))
+    assert cache.get(1) is not None  # 1 становится самым свежим
+    cache.put(make_profile(3))
+    assert cache.get(2) is None
+    clock.now = 11.0
+    assert cache.get(1) is None and len(cache) == 1
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+
+
+@pytest.mark.asyncio
+async def test_profile_cache_saves_queries_and_is_invalidated_on_update(engine):
+    cache = ProfileCache()
+    statements: list[str] = []
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        service = UserService(UserRepository(session), cache)
+        profile = await service.get_or_create_user(9, "Cat", None, "ru")
+        # Незафиксированный профиль в кэш не попадает
+        assert len(cache) == 0
+        await session.commit()
+        event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+        assert (await service.get_profile(9)).language == "ru"
+        assert statements == []
+
+        await service.update_language(profile.id, "en")
+        # До коммита кэш отдаёт зафиксированное, а своя транзакция читает мимо него
+        assert cache.get(9).language == "ru"
+        assert (await service.get_profile(9)).language == "en"
+        await session.commit()
+        assert cache.get(9).language == "en"
+
+        await service.update_language(profile.id, "uk")
+        await session.rollback()
+        assert cache.get(9).language == "en"
+    assert cache.stats()["hits"] == 4 and cache.stats()["misses"] == 0
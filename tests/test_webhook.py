@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+from aiogram.types import Update
+from aiohttp.test_utils import TestClient, TestServer
+
+from reminderbot.app.webhook import SECRET_HEADER, UpdatePipeline, create_webhook_app
+
+
+def message_update(update_id: int, chat_id: int) -> Update:
+    return Update.model_validate(
+        {
+            "update_id": update_id,
+            "message": {
+                "message_id": update_id,
+                "date": 0,
+                "chat": {"id": chat_id, "type": "private"},
+                "from": {"id": chat_id, "is_bot": False, "first_name": "U"},
+                "text": str(update_id),
+            },
+        }
+    )
+
+
+class RecordingDispatcher:
+    def __init__(self, delay: float = 0.01) -> None:
+        self.delay = delay
+        self.handled: list[tuple[int, int]] = []
+        self.active = 0
+        self.max_active = 0
+
+    async def feed_update(self, bot, update: Update) -> None:
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(self.delay)
+        self.handled.append((update.message.chat.id, update.update_id))
+        self.active -= 1
+
+
+@pytest.mark.asyncio
+async def test_pipeline_keeps_chat_order_and_runs_chats_in_parallel():
+    dispatcher = RecordingDispatcher()
+    pipeline = UpdatePipeline(dispatcher, bot=None, workers=4)
+    pipeline.start()
+    for update_id in range(12):
+        assert await pipeline.submit(message_update(update_id, chat_id=update_id % 3))
+    await pipeline.close()
+    for chat in range(3):
+        assert [update for handled_chat, update in dispatcher.handled if handled_chat == chat] == list(range(chat, 12, 3))
+    # Воркеров больше, чем чатов, но один чат не занимает двух воркеров сразу
+    assert dispatcher.max_active == 3
+    assert pipeline.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_pipeline_applies_backpressure():
+    dispatcher = RecordingDispatcher(delay=0.2)
+    pipeline = UpdatePipeline(dispatcher, bot=None, workers=1, max_pending=2)
+    pipeline.start()
+    assert await pipeline.submit(message_update(1, 1))
+    assert await pipeline.submit(message_update(2, 2))
+    assert not await pipeline.submit(message_update(3, 3), timeout=0.01)
+    await pipeline.close()
+    assert not await pipeline.submit(message_update(4, 4))
+    assert [update for _, update in dispatcher.handled] == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_webhook_endpoint_checks_secret_and_rejects_when_full():
+    dispatcher = RecordingDispatcher(delay=0.2)
+    pipeline = UpdatePipeline(dispatcher, bot=None, workers=1, max_pending=1)
+    app = create_webhook_app(pipeline, "/hook", secret="s3cret", submit_timeout=0.01)
+    pipeline.start()
+    async with TestClient(TestServer(app)) as client:
+        payload = message_update(1, 1).model_dump(mode="json", by_alias=True, exclude_none=True)
+        assert (await client.post("/hook", json=payload)).status == 401
+        headers = {SECRET_HEADER: "s3cret"}
+        assert (await client.post("/hook", json=payload, headers=headers)).status == 200
+        # Очередь занята первым апдейтом: Telegram получит 503 и повторит доставку
+        assert (await client.post("/hook", json=payload, headers=headers)).status == 503
+    await pipeline.close()
+    assert dispatcher.handled == [(1, 1)]
+
+
+@pytest.mark.asyncio
+async def test_webhook_drops_malformed_updates():
+    dispatcher = RecordingDispatcher()
+    pipeline = UpdatePipeline(dispatcher, bot=None, workers=1)
+    app = create_webhook_app(pipeline, "/hook")
+    pipeline.start()
+    async with TestClient(TestServer(app)) as client:
+        # Ответ 200, иначе Telegram будет присылать тот же апдейт снова
+        assert (await client.post("/hook", data=b"{not json")).status == 200
+        assert (await client.post("/hook", json={"update_id": "x"})).status == 200
+    await pipeline.close()
+    assert dispatcher.handled == []